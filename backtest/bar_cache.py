@@ -0,0 +1,156 @@
+# backtest/bar_cache.py
+import json
+import os
+import shutil
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from backtest.dataloader import OHLCV_COLUMNS, read_ohlcv_columns
+from config.settings import DATA_PATH
+
+CACHE_VERSION = 1
+INDEX_STRIDE = 4096  # one sparse index entry per this many bars
+
+
+class CachedBars:
+    """
+    Memory-mapped, fixed-width OHLCV columns for one symbol/timeframe.
+
+    Every column is a read-only `np.memmap` over a `.npy` file, so concurrent
+    backtest processes share the same pages through the OS page cache.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "index.json")) as f:
+            self.index = json.load(f)
+        self.price_scale = self.index["price_scale"]
+        self._columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in ("timestamp", *OHLCV_COLUMNS)
+        }
+
+    def __len__(self):
+        return self.index["rows"]
+
+    def columns(self) -> dict:
+        """
+        Return all columns as float64 prices, decoding scaled ints if needed.
+        """
+        if not self.price_scale:
+            return dict(self._columns)
+        columns = {"timestamp": self._columns["timestamp"]}
+        for name in OHLCV_COLUMNS:
+            columns[name] = self._columns[name] / self.price_scale
+        return columns
+
+    def raw_columns(self) -> dict:
+        """
+        Return the stored columns as-is (scaled int64 when `price_scale` is set).
+        """
+        return dict(self._columns)
+
+    def window_bounds(self, start_ms=None, end_ms=None):
+        """
+        Row range [lo, hi) covering `start_ms <= timestamp <= end_ms`.
+
+        The sparse sidecar index narrows the search to one stride, so only a
+        couple of pages of the timestamp column are ever touched.
+        """
+        lo, hi = 0, len(self)
+        if start_ms is not None:
+            lo = self._locate(start_ms, side="left")
+        if end_ms is not None:
+            hi = self._locate(end_ms, side="right")
+        return lo, max(lo, hi)
+
+    def window(self, start_ms=None, end_ms=None, raw=False) -> dict:
+        """
+        Zero-copy slice of every column between `start_ms` and `end_ms`.
+        """
+        lo, hi = self.window_bounds(start_ms, end_ms)
+        if raw or not self.price_scale:
+            return {name: col[lo:hi] for name, col in self._columns.items()}
+        columns = {"timestamp": self._columns["timestamp"][lo:hi]}
+        for name in OHLCV_COLUMNS:
+            columns[name] = self._columns[name][lo:hi] / self.price_scale
+        return columns
+
+    def _locate(self, ts_ms: int, side: str) -> int:
+        sparse = self.index["sparse"]
+        bisect = bisect_left if side == "left" else bisect_right
+        block = max(bisect(sparse, ts_ms) - 1, 0)
+        lo = block * INDEX_STRIDE
+        hi = min(lo + 2 * INDEX_STRIDE, len(self))
+        return lo + int(np.searchsorted(self._columns["timestamp"][lo:hi], ts_ms, side=side))
+
+
+class BarCache:
+    """
+    Converts OHLCV parquet files once into memory-mapped column files.
+
+    Layout: `<root>/<symbol>/<timeframe>-<signature>/{timestamp,open,...}.npy`
+    plus an `index.json` sidecar. The signature is derived from the source
+    parquet's mtime and size, so a rewritten source gets a fresh cache entry
+    automatically and stale entries are removed after the rebuild.
+    """
+
+    def __init__(self, root=None, price_scale=None):
+        self.root = str(root or os.path.join(DATA_PATH, ".bar_cache"))
+        # price_scale=None stores float64; an int (e.g. 100) stores scaled int64
+        self.price_scale = price_scale
+
+    def get(self, symbol: str, timeframe: str, source_path: str) -> CachedBars:
+        stat = os.stat(source_path)
+        signature = f"{stat.st_mtime_ns:x}-{stat.st_size:x}-{self.price_scale or 0}"
+        directory = os.path.join(self.root, symbol, f"{timeframe}-{signature}")
+
+        if not os.path.exists(os.path.join(directory, "index.json")):
+            self._build(source_path, directory, stat)
+            self._remove_stale(symbol, timeframe, keep=directory)
+        return CachedBars(directory)
+
+    def _build(self, source_path: str, directory: str, stat):
+        columns = read_ohlcv_columns(source_path)
+        tmp_dir = f"{directory}.tmp-{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        np.save(os.path.join(tmp_dir, "timestamp.npy"), columns["timestamp"])
+        for name in OHLCV_COLUMNS:
+            values = columns[name]
+            if self.price_scale:
+                values = np.rint(values * self.price_scale).astype("int64")
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+
+        ts = columns["timestamp"]
+        index = {
+            "version": CACHE_VERSION,
+            "source": os.path.abspath(source_path),
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_size": stat.st_size,
+            "rows": int(len(ts)),
+            "first_ts": int(ts[0]) if len(ts) else None,
+            "last_ts": int(ts[-1]) if len(ts) else None,
+            "price_scale": self.price_scale,
+            "stride": INDEX_STRIDE,
+            "sparse": ts[::INDEX_STRIDE].tolist(),
+        }
+        with open(os.path.join(tmp_dir, "index.json"), "w") as f:
+            json.dump(index, f)
+
+        # Publish atomically; if another process got there first keep theirs
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _remove_stale(self, symbol: str, timeframe: str, keep: str):
+        symbol_dir = os.path.join(self.root, symbol)
+        for name in os.listdir(symbol_dir):
+            path = os.path.join(symbol_dir, name)
+            if path != keep and name.startswith(f"{timeframe}-") and ".tmp-" not in name:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
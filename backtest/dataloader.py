@@ -1,20 +1,72 @@
-from pyspark.sql import SparkSession
 from backtest.snapshot import MarketSnapshot
 from config.settings import DATA_PATH
 import os
 from datetime import datetime
 
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def parse_time(time_str):
+    # Support both "YYYY-MM-DD" and "YYYY-MM-DD HH:MM"
+    formats = ["%Y-%m-%d", "%Y-%m-%d %H:%M"]
+    for fmt in formats:
+        try:
+            return datetime.strptime(time_str, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date format: {time_str}")
+
+
+def ohlcv_path(symbol: str, timeframe: str, data_path=None) -> str:
+    return os.path.join(data_path or DATA_PATH, symbol, f"{symbol}_{timeframe}.parquet")
+
+
+def resolve_ohlcv_path(symbol: str, timeframe: str, data_path=None) -> str:
+    """
+    Path of the stored parquet for `timeframe`, or, when that timeframe was
+    never downloaded, of one resampled from the 1m base data (built once
+    and cached by `ResampleCache`).
+    """
+    path = ohlcv_path(symbol, timeframe, data_path)
+    if os.path.exists(path):
+        return path
+
+    from backtest.resample import BASE_TIMEFRAME, ResampleCache
+
+    if timeframe == BASE_TIMEFRAME:
+        return path
+    if not (os.path.exists(ohlcv_path(symbol, BASE_TIMEFRAME, data_path))
+            or _partitions(symbol, BASE_TIMEFRAME, data_path)):
+        return path
+    return ResampleCache(data_path=data_path).path(symbol, timeframe)
+
+
 class SparkOHLCVLoader:
     def __init__(self, symbol: str, timeframe: str, start=None, end=None):
+        from pyspark.sql import SparkSession
+
         self.symbol = symbol
         self.timeframe = timeframe
-        self.path = os.path.join(DATA_PATH, symbol, f"{symbol}_{timeframe}.parquet")
+        self.partitions = _partitions(symbol, timeframe)
+        self.path = ohlcv_path(symbol, timeframe) if self.partitions else resolve_ohlcv_path(symbol, timeframe)
         self.spark = SparkSession.builder.appName("OHLCVLoader").getOrCreate()
         self.start = start
         self.end = end
 
     def load_data(self):
-        df = self.spark.read.parquet(self.path)
+        if self.partitions is None:
+            df = self.spark.read.parquet(self.path)
+        else:
+            # Filters on the year/month partition columns prune whole directories
+            # before the scan; the timestamp filters are pushed into row groups
+            df = self.spark.read.option("basePath", self.partitions.root).parquet(self.partitions.root)
+            if self.start:
+                start = self._parse_time(self.start)
+                df = df.filter((df.year > start.year) | ((df.year == start.year) & (df.month >= start.month)))
+            if self.end:
+                end = self._parse_time(self.end)
+                df = df.filter((df.year < end.year) | ((df.year == end.year) & (df.month <= end.month)))
+            df = df.drop("year", "month")
 
         if self.start:
             df = df.filter(df.timestamp >= self._parse_time(self.start))
@@ -37,11 +89,204 @@ class SparkOHLCVLoader:
             )
 
     def _parse_time(self, time_str):
-        # Support both "YYYY-MM-DD" and "YYYY-MM-DD HH:MM"
-        formats = ["%Y-%m-%d", "%Y-%m-%d %H:%M"]
-        for fmt in formats:
-            try:
-                return datetime.strptime(time_str, fmt)
-            except ValueError:
+        return parse_time(time_str)
+
+
+class ColumnarOHLCVLoader:
+    """
+    Spark-free loader for single-node backtests.
+
+    Reads the parquet file straight into contiguous NumPy columns
+    (int64 epoch-ms timestamps, float64 OHLCV), applies `start`/`end`
+    as a binary search on the sorted timestamp column and only builds
+    `MarketSnapshot` objects while streaming. With a `BarCache` the columns
+    are memory-mapped from the cache instead of decoded from parquet.
+    When the symbol/timeframe is stored as a `PartitionedDataset`, only the
+    months and row groups overlapping `start`/`end` are read (the
+    `BarCache` applies to single-file datasets only).
+    """
+    chunk_size = 65536
+    supports_reuse = True
+
+    def __init__(self, symbol: str, timeframe: str, start=None, end=None, data_path=None, cache=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.partitions = _partitions(symbol, timeframe, data_path)
+        self.path = (ohlcv_path(symbol, timeframe, data_path) if self.partitions
+                     else resolve_ohlcv_path(symbol, timeframe, data_path))
+        self.start = start
+        self.end = end
+        # cache=True uses the default BarCache; pass a BarCache to choose its root
+        if cache is True:
+            from backtest.bar_cache import BarCache
+            cache = BarCache(os.path.join(data_path, ".bar_cache") if data_path else None)
+        self.cache = cache or None
+        self._arrays = None
+
+    def load_arrays(self) -> dict:
+        """
+        Return the filtered columns as a dict of NumPy arrays:
+        `timestamp` (int64 epoch ms) plus `open`/`high`/`low`/`close`/`volume`
+        (float64). Loaded once and cached on the loader.
+        """
+        if self._arrays is None:
+            if self.partitions is not None:
+                self._arrays = self.partitions.read(*self._bounds_ms())
+            elif self.cache is not None:
+                cached = self.cache.get(self.symbol, self.timeframe, self.path)
+                self._arrays = cached.window(*self._bounds_ms())
+            else:
+                self._arrays = self._window(read_ohlcv_columns(self.path))
+        return self._arrays
+
+    def _bounds_ms(self):
+        start_ms = _to_epoch_ms(parse_time(self.start)) if self.start else None
+        end_ms = _to_epoch_ms(parse_time(self.end)) if self.end else None
+        return start_ms, end_ms
+
+    def _window(self, columns: dict) -> dict:
+        import numpy as np
+
+        start_ms, end_ms = self._bounds_ms()
+        ts = columns["timestamp"]
+        lo, hi = 0, len(ts)
+        if start_ms is not None:
+            lo = int(np.searchsorted(ts, start_ms, side="left"))
+        if end_ms is not None:
+            hi = int(np.searchsorted(ts, end_ms, side="right"))
+        # Basic slices are views, so the window costs no copy
+        return {name: col[lo:hi] for name, col in columns.items()}
+
+    def __len__(self):
+        return len(self.load_arrays()["timestamp"])
+
+    def snapshot_at(self, i: int) -> MarketSnapshot:
+        """
+        Build the snapshot for a single bar on demand.
+        """
+        arrays = self.load_arrays()
+        return MarketSnapshot(
+            symbol=self.symbol,
+            timestamp=arrays["timestamp"][i].astype("datetime64[ms]").item(),
+            open=float(arrays["open"][i]),
+            high=float(arrays["high"][i]),
+            low=float(arrays["low"][i]),
+            close=float(arrays["close"][i]),
+            volume=float(arrays["volume"][i])
+        )
+
+    def stream_snapshots(self, reuse=False):
+        """
+        Yield one MarketSnapshot per bar. With `reuse=True` the same object
+        is updated in place for every bar, so consumers must not hold on to
+        it across iterations.
+        """
+        arrays = self.load_arrays()
+        n = len(arrays["timestamp"])
+        shared = MarketSnapshot(self.symbol, None, 0.0, 0.0, 0.0, 0.0, 0.0) if reuse else None
+
+        # Convert column slices to Python objects a chunk at a time so a
+        # multi-million bar run never materialises every row at once
+        for lo in range(0, n, self.chunk_size):
+            hi = min(lo + self.chunk_size, n)
+            timestamps = arrays["timestamp"][lo:hi].astype("datetime64[ms]").tolist()
+            opens = arrays["open"][lo:hi].tolist()
+            highs = arrays["high"][lo:hi].tolist()
+            lows = arrays["low"][lo:hi].tolist()
+            closes = arrays["close"][lo:hi].tolist()
+            volumes = arrays["volume"][lo:hi].tolist()
+
+            if shared is not None:
+                for j in range(hi - lo):
+                    shared.timestamp = timestamps[j]
+                    shared.open = opens[j]
+                    shared.high = highs[j]
+                    shared.low = lows[j]
+                    shared.close = closes[j]
+                    shared.volume = volumes[j]
+                    yield shared
                 continue
-        raise ValueError(f"Invalid date format: {time_str}")
+
+            for j in range(hi - lo):
+                yield MarketSnapshot(
+                    symbol=self.symbol,
+                    timestamp=timestamps[j],
+                    open=opens[j],
+                    high=highs[j],
+                    low=lows[j],
+                    close=closes[j],
+                    volume=volumes[j]
+                )
+
+
+class CachedOHLCVLoader(ColumnarOHLCVLoader):
+    """
+    `ColumnarOHLCVLoader` reading through the default `BarCache`: after the
+    first run a backtest starts from memory-mapped columns without
+    importing pyarrow or starting Spark.
+    """
+
+    def __init__(self, symbol: str, timeframe: str, start=None, end=None, data_path=None):
+        super().__init__(symbol, timeframe, start=start, end=end, data_path=data_path, cache=True)
+
+
+LOADERS = {
+    "spark": SparkOHLCVLoader,
+    "columnar": ColumnarOHLCVLoader,
+    "cached": CachedOHLCVLoader,
+}
+
+
+def make_loader(loader, symbol, timeframe, start=None, end=None):
+    """
+    `loader` may be a name from LOADERS, a loader class, or an already
+    constructed loader exposing `stream_snapshots()`.
+    """
+    if isinstance(loader, str):
+        if loader not in LOADERS:
+            raise ValueError(f"Unknown loader: {loader}")
+        loader = LOADERS[loader]
+    if isinstance(loader, type):
+        return loader(symbol=symbol, timeframe=timeframe, start=start, end=end)
+    return loader
+
+
+def read_ohlcv_columns(path) -> dict:
+    """
+    Read an OHLCV parquet file into contiguous, timestamp-sorted NumPy columns.
+    """
+    import pyarrow.parquet as pq
+
+    return columns_from_table(pq.read_table(path, columns=["timestamp", *OHLCV_COLUMNS]))
+
+
+def columns_from_table(table) -> dict:
+    """
+    Convert an Arrow OHLCV table into contiguous, timestamp-sorted NumPy columns.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    ts = table.column("timestamp")
+    if pa.types.is_timestamp(ts.type):
+        ts = ts.cast(pa.timestamp("ms"))
+    columns = {"timestamp": np.ascontiguousarray(ts.to_numpy().astype("datetime64[ms]").view("int64"))}
+    for name in OHLCV_COLUMNS:
+        columns[name] = np.ascontiguousarray(table.column(name).to_numpy(), dtype="float64")
+
+    # Data is written in time order; only pay for a sort when it is not
+    if len(columns["timestamp"]) > 1 and (np.diff(columns["timestamp"]) < 0).any():
+        order = np.argsort(columns["timestamp"], kind="stable")
+        columns = {name: col[order] for name, col in columns.items()}
+    return columns
+
+
+def _partitions(symbol, timeframe, data_path=None):
+    from backtest.partitions import PartitionedDataset
+
+    dataset = PartitionedDataset.for_symbol(symbol, timeframe, data_path)
+    return dataset if dataset.exists() else None
+
+
+def _to_epoch_ms(dt: datetime) -> int:
+    return int((dt - datetime(1970, 1, 1)).total_seconds() * 1000)
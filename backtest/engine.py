@@ -1,59 +1,124 @@
 from typing import Type
 from services.mock_executor import MockExecutor
-from services.broker import Broker
-from backtest.dataloader import SparkOHLCVLoader
+from services.broker import Broker, FixedPointBroker
+from backtest.dataloader import make_loader
 from backtest.snapshot import MarketSnapshot
 from backtest.enriched_snapshot import EnrichedSnapshot
+from backtest.equity import EquityCurve
+from backtest.metrics import performance_report
+from backtest.profiler import make_profiler
 from services.trade_logger import TradeLogger
 from core.models import Order, Trade
-from core.enums import OrderStatus
 from domain.strategy_base import Strategy
-import matplotlib.pyplot as plt
+from core.enums import Side
 
 class BacktestEngine:
     def __init__(self, strategy_cls: Type[Strategy], symbol: str, timeframe: str, account_balance=10000,
-                 plot=False, indicators=None, start=None, end=None):
+                 plot=False, indicators=None, start=None, end=None, loader="spark",
+                 accounting="decimal", instruments=None, reuse_snapshots=False, logger=None,
+                 equity_every=None, profile=None):
         self.strategy = strategy_cls()
         self.symbol = symbol
         self.timeframe = timeframe
         self.executor = MockExecutor()
-        self.broker = Broker(account_balance=account_balance)
+        if accounting == "fixed":
+            self.broker = FixedPointBroker(account_balance=account_balance, instruments=instruments)
+        elif accounting == "decimal":
+            self.broker = Broker(account_balance=account_balance)
+        else:
+            raise ValueError(f"Unknown accounting mode: {accounting}")
         self.executor.broker = self.broker 
         self.strategy.broker = self.broker
-        self.loader = SparkOHLCVLoader(symbol=symbol, timeframe=timeframe, start=start, end=end)
-        self.logger = TradeLogger()
+        self.loader = make_loader(loader, symbol, timeframe, start, end)
+        self.logger = logger or TradeLogger()
         self.broker.logger = self.logger
+        # True renders to "<symbol>_<timeframe>_backtest.png", a string to that path (.png/.svg/.html)
         self.plot = plot
         self.indicators = indicators or {}
+        # Reuse one snapshot/enriched object per run; strategies must not keep references to `data`
+        self.reuse_snapshots = reuse_snapshots
+        # Mark-to-market curve recorded every `equity_every` bars (needed by report()); None, the default, is off
+        self.equity = EquityCurve(every=equity_every) if equity_every else None
+        # Per-stage timings (backtest.profiler): True, a sampling interval or a StageProfiler
+        self.profiler = make_profiler(profile)
 
     def run(self):
         self.logger.log_start(self.broker.account_balance)
 
-        for snapshot in self.loader.stream_snapshots():
-            for ind in self.indicators.values():
-                ind.update(snapshot)
-
-            enriched = EnrichedSnapshot(
-                snapshot,
-                {name: ind.get() for name, ind in self.indicators.items()}
-            )
+        batch = self._precompute_indicators()
+        if self.equity is not None and hasattr(self.loader, "__len__"):
+            self.equity.reserve(len(self.loader) // self.equity.every + 2)
+
+        reuse = self.reuse_snapshots
+        if reuse and getattr(self.loader, "supports_reuse", False):
+            snapshots = self.loader.stream_snapshots(reuse=True)
+        else:
+            snapshots = self.loader.stream_snapshots()
+        enriched = None
+        values = {}
+        # Loaders without NumPy columns get their closes kept here for plotting
+        bars = ([], []) if self.plot and not hasattr(self.loader, "load_arrays") else None
+        self._bars = bars
+
+        profiler = self.profiler
+
+        for i, snapshot in enumerate(snapshots):
+            # Set on the bars the profiler samples; every lap below is skipped otherwise
+            t = started = profiler.start_bar(i) if profiler is not None else None
+            if bars is not None:
+                bars[0].append(snapshot.timestamp)
+                bars[1].append(snapshot.close)
+            if not reuse:
+                values = {}
+            if batch is not None:
+                for name, series in batch.items():
+                    values[name] = series[i]
+            else:
+                for name, ind in self.indicators.items():
+                    ind.update(snapshot)
+                    values[name] = ind.get()
+            if t is not None:
+                t = profiler.lap("indicators", t)
+
+            if reuse and enriched is not None:
+                enriched.reset(snapshot, values)
+            else:
+                enriched = EnrichedSnapshot(snapshot, values)
+            if t is not None:
+                t = profiler.lap("snapshot", t)
 
             self.executor.check_exit_triggers(enriched)
+            if t is not None:
+                t = profiler.lap("exit_triggers", t)
             self.executor.check_pending_limits(enriched)
+            if t is not None:
+                t = profiler.lap("pending_limits", t)
 
             orders = self.strategy.on_data(enriched)
+            if t is not None:
+                t = profiler.lap("strategy", t)
 
             for order in orders:
                 order_id = self.executor.submit_order(order)
 
                 # Only record/log trade if a trade actually happened
-                if self.executor.orders[order_id].status == OrderStatus.FILLED:
-                    # Find the trade that corresponds to this order
-                    related_trades = [t for t in self.executor.trades if t.order == self.executor.orders[order_id]]
-                    if related_trades:
-                        trade = related_trades[-1]
-                        self.broker.record_trade(trade)
-                        self.logger.log_trade(trade, self.broker)
+                trade = self.executor.get_trade(order_id)
+                if t is not None:
+                    t = profiler.lap("submit", t)
+                if trade is not None:
+                    self.broker.record_trade(trade)
+                    if t is not None:
+                        t = profiler.lap("broker", t)
+                    self.logger.log_trade(trade, self.broker)
+                    if t is not None:
+                        t = profiler.lap("logging", t)
+
+            if self.equity is not None:
+                self.equity.update(self.broker, snapshot.symbol, snapshot.close, snapshot.timestamp)
+                if t is not None:
+                    t = profiler.lap("equity", t)
+            if t is not None:
+                profiler.end_bar(started)
 
         # Handle any final closing logic
         if hasattr(self.strategy, "finalize"):
@@ -63,77 +128,86 @@ class BacktestEngine:
                 order.timestamp = snapshot.timestamp
 
                 order_id = self.executor.submit_order(order)
-                trade = self.executor.trades[-1]
+                trade = self.executor.get_trade(order_id)
+                if trade is None:
+                    continue
 
                 self.broker.record_trade(trade)
                 self.logger.log_trade(trade, self.broker)
 
         self.broker.last_price = snapshot.close
-        self.logger.log_end(self.broker)
-
-        # Optional indicator plot
-        if hasattr(self, "plot") and self.plot:
-            self.plot_trades(
-                overlay_indicators={},
-                subplot_indicators={k: v for k, v in self.indicators.items()}
-            )
-
-            
-
-
-    def plot_trades(self, overlay_indicators=None, subplot_indicators=None):
-        closes = []
-        timestamps = []
-        buy_times, buy_prices = [], []
-        sell_times, sell_prices = [], []
-
-        for snapshot in self.loader.stream_snapshots():
-            closes.append(snapshot.close)
-            timestamps.append(snapshot.timestamp)
-
-        for trade in self.executor.trades:
-            if trade.order.side.name == "BUY":
-                buy_times.append(trade.timestamp)
-                buy_prices.append(float(trade.execution_price))
-            elif trade.order.side.name == "SELL":
-                sell_times.append(trade.timestamp)
-                sell_prices.append(float(trade.execution_price))
-
-        # Handle figure and subplots
-        n_subplots = 2 if subplot_indicators else 1
-        fig, axs = plt.subplots(n_subplots, 1, figsize=(12, 6), sharex=True, gridspec_kw={'height_ratios': [3, 1] if n_subplots == 2 else [1]})
-
-        price_ax = axs[0] if n_subplots == 2 else axs
-        price_ax.plot(timestamps, closes, label="Close Price", color="black")
-        price_ax.scatter(buy_times, buy_prices, color="green", marker="^", label="BUY", zorder=5)
-        price_ax.scatter(sell_times, sell_prices, color="red", marker="v", label="SELL", zorder=5)
-
-        if overlay_indicators:
-            for name, indicator in overlay_indicators.items():
-                series = indicator.get_series()
-                if series:
-                    ts, values = series
-                    price_ax.plot(ts, values, label=name)
-
-        price_ax.set_title(f"{self.symbol} — {self.timeframe} Backtest")
-        price_ax.set_ylabel("Price")
-        price_ax.legend()
-        price_ax.grid(True)
-
-        if subplot_indicators:
-            sub_ax = axs[1]
-            for name, indicator in subplot_indicators.items():
-                series = indicator.get_series()
-                if series:
-                    ts, values = series
-                    sub_ax.plot(ts, values, label=name)
-            sub_ax.set_ylabel("Indicator")
-            sub_ax.set_xlabel("Time")
-            sub_ax.legend()
-            sub_ax.grid(True)
-
-        plt.tight_layout()
-        plt.show()
+        if self.equity is not None:
+            self.equity.finish(self.broker, snapshot.symbol, snapshot.close, snapshot.timestamp)
+        self.logger.log_end(self.broker, profile=self.profiler)
+
+        if self.plot:
+            path = self.plot if isinstance(self.plot, str) else f"{self.symbol}_{self.timeframe}_backtest.png"
+            self.plot_trades(path, subplot_indicators=self.indicators)
+
+    def report(self, periods_per_year=None) -> dict:
+        """
+        Performance metrics for the finished run (see backtest.metrics).
+        """
+        if self.equity is None:
+            raise ValueError("Equity recording is disabled: pass equity_every=n to the engine")
+        return performance_report(self.equity, self.broker.trades, self.broker.realized_pnl, periods_per_year)
+
+    def _precompute_indicators(self):
+        """
+        Compute every indicator series up front when the loader exposes
+        NumPy columns and all indicators implement `compute_batch`.
+        Returns name -> per-bar list (None where not ready), or None to
+        fall back to streaming `update()` calls.
+        """
+        if not self.indicators or not hasattr(self.loader, "load_arrays"):
+            return None
+        if not all(ind.supports_batch for ind in self.indicators.values()):
+            return None
+
+        arrays = self.loader.load_arrays()
+        batch = {}
+        for name, ind in self.indicators.items():
+            series = ind.compute_batch(arrays).tolist()
+            # NaN marks warm-up bars; strategies expect None there
+            batch[name] = [None if v != v else v for v in series]
+        return batch
+
+    def plot_trades(self, path, overlay_indicators=None, subplot_indicators=None, max_points=None,
+                    method="minmax"):
+        """
+        Render the run headlessly to `path` (see backtest.plotting). Prices
+        come from the arrays the run already loaded, never a second pass
+        over the data source.
+        """
+        from backtest import plotting
+
+        if hasattr(self.loader, "load_arrays"):
+            arrays = self.loader.load_arrays()
+            timestamps, closes = arrays["timestamp"], arrays["close"]
+        elif getattr(self, "_bars", None) is not None:
+            timestamps, closes = self._bars
+        else:
+            raise ValueError("No bars to plot: run the engine with plot enabled first")
+
+        trades = [(t.timestamp, t.execution_price, t.order.side == Side.BUY) for t in self.executor.trades]
+
+        def series(indicators):
+            return {name: ind.get_series() for name, ind in (indicators or {}).items() if ind.get_series()}
+
+        equity = None
+        if self.equity is not None and len(self.equity):
+            eq = self.equity.arrays()
+            equity = (eq["timestamp"], eq["equity"])
+
+        return plotting.render_backtest(
+            path, timestamps, closes, trades,
+            overlays=series(overlay_indicators),
+            subplots=series(subplot_indicators),
+            equity=equity,
+            title=f"{self.symbol} — {self.timeframe} Backtest",
+            max_points=max_points or plotting.DEFAULT_MAX_POINTS,
+            method=method,
+        )
 
     def _was_position_closed(self, trade: Trade) -> bool:
         """Check if this trade closed the position."""
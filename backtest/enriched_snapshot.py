@@ -1,9 +1,32 @@
 # backtest/enriched_snapshot.py
 class EnrichedSnapshot:
+    """
+    A market snapshot plus the indicator values for the same bar.
+
+    OHLCV fields are copied onto real slots so strategies read
+    `data.close` without a `__getattr__` round trip. `reset()` repoints an
+    existing instance at the next bar, letting the engine reuse one object
+    for the whole run.
+    """
+    __slots__ = ("snapshot", "indicators", "symbol", "timestamp", "open", "high", "low", "close", "volume")
+
     def __init__(self, snapshot, indicators: dict):
+        self.reset(snapshot, indicators)
+
+    def reset(self, snapshot, indicators: dict):
         self.snapshot = snapshot
         self.indicators = indicators
+        self.symbol = snapshot.symbol
+        self.timestamp = snapshot.timestamp
+        self.open = snapshot.open
+        self.high = snapshot.high
+        self.low = snapshot.low
+        self.close = snapshot.close
+        self.volume = snapshot.volume
+        return self
 
     def __getattr__(self, item):
-        # So we can access snapshot.open etc directly
+        # Anything beyond OHLCV still falls through to the wrapped snapshot
+        if item == "snapshot":
+            raise AttributeError(item)
         return getattr(self.snapshot, item)
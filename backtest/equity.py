@@ -0,0 +1,132 @@
+# backtest/equity.py
+import numpy as np
+
+from core.enums import Side
+
+COLUMNS = ("timestamp", "equity", "balance", "margin", "unrealized")
+
+
+class EquityCurve:
+    """
+    Mark-to-market account series, one row per recorded bar.
+
+    `update()` marks the broker's open positions at the latest price of
+    each symbol; positions are cached as floats and only re-read when the
+    broker swaps the Position object, so a bar costs O(open positions).
+    Rows go into NumPy arrays allocated on the first row (or by
+    `reserve()`) and doubled when full; bar timestamps are kept as given
+    and converted to epoch ms in one pass when `arrays()` is read. With
+    `every=n` only every n-th bar is stored; `finish()` always stores the
+    last one so end-of-run numbers are exact.
+    """
+
+    def __init__(self, every=1, capacity=1024):
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.every = every
+        self.size = 0
+        self.capacity = max(capacity, 1)
+        self._bars = 0
+        self._marks = {}      # symbol -> last price
+        self._positions = {}  # symbol -> (Position, signed qty, entry, margin)
+        self._data = None     # value columns, allocated on the first row
+        self._timestamps = []
+        self._ms = None       # converted timestamps, until the next row
+
+    def reserve(self, capacity: int):
+        """
+        Make room for `capacity` rows up front, e.g. the run's bar count.
+        """
+        self.capacity = max(capacity, 1)
+        if self._data is None:
+            self._data = {name: np.empty(self.capacity) for name in COLUMNS[1:]}
+        elif len(self._data["equity"]) < capacity:
+            self._grow(capacity)
+
+    def update(self, broker, symbol, price, timestamp):
+        self._marks[symbol] = float(price)
+        self._bars += 1
+        if (self._bars - 1) % self.every == 0:
+            self._append(broker, timestamp)
+
+    def finish(self, broker, symbol, price, timestamp):
+        """
+        Record the final bar, replacing the last row if it is the same bar.
+        """
+        self._marks[symbol] = float(price)
+        if self.size and self._timestamps[-1] == timestamp:
+            self.size -= 1
+            self._timestamps.pop()
+        self._append(broker, timestamp)
+
+    def _append(self, broker, timestamp):
+        unrealized = margin = 0.0
+        positions = broker.positions
+        cache = self._positions
+        for symbol, pos in positions.items():
+            cached = cache.get(symbol)
+            if cached is None or cached[0] is not pos:
+                sign = 1.0 if pos.side == Side.BUY else -1.0
+                cached = cache[symbol] = (pos, sign * float(pos.quantity),
+                                          float(pos.average_entry_price), float(pos.margin))
+            mark = self._marks.get(symbol)
+            if mark is not None:
+                unrealized += (mark - cached[2]) * cached[1]
+            margin += cached[3]
+        if len(cache) > len(positions):
+            for symbol in [s for s in cache if s not in positions]:
+                del cache[symbol]
+
+        data = self._data
+        if data is None:
+            self.reserve(self.capacity)
+            data = self._data
+        elif self.size == len(data["equity"]):
+            self._grow(2 * self.size)
+        balance = float(broker.account_balance)
+        i = self.size
+        self._timestamps.append(timestamp)
+        self._ms = None
+        data["equity"][i] = balance + unrealized
+        data["balance"][i] = balance
+        data["margin"][i] = margin
+        data["unrealized"][i] = unrealized
+        self.size += 1
+
+    def _grow(self, capacity):
+        for name, arr in self._data.items():
+            grown = np.empty(capacity, dtype=arr.dtype)
+            grown[:len(arr)] = arr
+            self._data[name] = grown
+
+    def __len__(self):
+        return self.size
+
+    def arrays(self) -> dict:
+        """
+        Views of the recorded rows; `timestamp` is epoch milliseconds.
+        """
+        if self._ms is None:
+            self._ms = _to_ms(self._timestamps)
+        if self._data is None:
+            return {name: np.empty(0, dtype="int64" if name == "timestamp" else "float64") for name in COLUMNS}
+        return {"timestamp": self._ms, **{name: arr[:self.size] for name, arr in self._data.items()}}
+
+    def to_frame(self):
+        import pandas as pd
+
+        arrays = self.arrays()
+        df = pd.DataFrame({name: arrays[name] for name in COLUMNS[1:]})
+        df.index = pd.to_datetime(arrays["timestamp"], unit="ms")
+        return df
+
+
+def _to_ms(timestamps: list) -> np.ndarray:
+    """
+    Bar timestamps (epoch ms ints, datetimes or datetime64) as int64 ms.
+    """
+    if not timestamps:
+        return np.empty(0, dtype="int64")
+    if isinstance(timestamps[0], (int, np.integer)):
+        return np.asarray(timestamps, dtype="int64")
+    return np.asarray(timestamps, dtype="datetime64[ms]").astype("int64")
@@ -0,0 +1,91 @@
+# backtest/metrics.py
+import numpy as np
+
+YEAR_MS = 365 * 24 * 3600 * 1000  # crypto trades around the clock
+
+REPORT_FIELDS = [
+    "final_equity", "total_return", "cagr", "sharpe", "sortino", "max_drawdown",
+    "max_drawdown_duration_s", "exposure", "trade_count", "closed_trades", "win_rate",
+    "profit_factor", "turnover",
+]
+
+
+def max_drawdown(equity) -> float:
+    """
+    Largest peak-to-trough loss as a fraction of the peak.
+    """
+    equity = np.asarray(equity, dtype="float64")
+    if not len(equity):
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    return float(dd.max())
+
+
+def max_drawdown_duration(timestamps, equity) -> float:
+    """
+    Longest time spent below a previous equity high, in the units of
+    `timestamps` (the still-open drawdown at the end counts too).
+    """
+    equity = np.asarray(equity, dtype="float64")
+    timestamps = np.asarray(timestamps)
+    if len(equity) < 2:
+        return 0.0
+    highs = np.flatnonzero(equity >= np.maximum.accumulate(equity))
+    recovered = np.append(timestamps[highs[1:]], timestamps[-1])
+    return float((recovered - timestamps[highs]).max())
+
+
+def performance_report(curve, trades=(), realized_pnl=(), periods_per_year=None) -> dict:
+    """
+    Summary statistics for an `EquityCurve`.
+
+    `trades` are the broker's Trade objects (for turnover) and
+    `realized_pnl` the PnL of every closing fill (for win rate and profit
+    factor). Sharpe and Sortino use per-row simple returns, annualized
+    with `periods_per_year` or, by default, the median row spacing.
+    """
+    arrays = curve.arrays()
+    ts, equity, margin = arrays["timestamp"], arrays["equity"], arrays["margin"]
+    report = dict.fromkeys(REPORT_FIELDS, 0.0)
+    report["trade_count"] = len(trades)
+    report["closed_trades"] = len(realized_pnl)
+    if not len(equity):
+        return report
+
+    start, end = equity[0], equity[-1]
+    report["final_equity"] = float(end)
+    report["total_return"] = float(end / start - 1) if start else 0.0
+    span_years = (ts[-1] - ts[0]) / YEAR_MS
+    if span_years > 0 and start > 0 and end > 0:
+        report["cagr"] = float((end / start) ** (1 / span_years) - 1)
+
+    if len(equity) > 1:
+        if periods_per_year is None:
+            step = np.median(np.diff(ts))
+            periods_per_year = YEAR_MS / step if step > 0 else 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(equity) / equity[:-1]
+        returns = returns[np.isfinite(returns)]
+        if len(returns):
+            scale = np.sqrt(periods_per_year)
+            std = returns.std()
+            downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+            report["sharpe"] = float(returns.mean() / std * scale) if std > 0 else 0.0
+            report["sortino"] = float(returns.mean() / downside * scale) if downside > 0 else 0.0
+
+    report["max_drawdown"] = max_drawdown(equity)
+    report["max_drawdown_duration_s"] = max_drawdown_duration(ts, equity) / 1000
+    report["exposure"] = float(np.mean(margin > 0))
+
+    pnl = np.array([float(p) for p in realized_pnl], dtype="float64")
+    if len(pnl):
+        wins, losses = pnl[pnl > 0].sum(), -pnl[pnl < 0].sum()
+        report["win_rate"] = float(np.mean(pnl > 0))
+        report["profit_factor"] = float(wins / losses) if losses > 0 else float("inf") if wins > 0 else 0.0
+
+    if len(trades):
+        notional = np.array([float(t.quantity * t.execution_price) for t in trades], dtype="float64")
+        report["turnover"] = float(np.abs(notional).sum() / equity.mean()) if equity.mean() else 0.0
+    return report
@@ -0,0 +1,233 @@
+# backtest/partitions.py
+import os
+import shutil
+
+import numpy as np
+
+from backtest.dataloader import OHLCV_COLUMNS, _to_epoch_ms, columns_from_table
+from config.settings import DATA_PATH
+
+ROW_GROUP_ROWS = 8192  # ~5.7 days of 1m bars, a few hundred KB per group
+COMPACT_FILE = "data.parquet"
+
+
+def partition_root(symbol: str, timeframe: str, data_path=None) -> str:
+    return os.path.join(data_path or DATA_PATH, symbol, timeframe)
+
+
+class PartitionedDataset:
+    """
+    OHLCV bars for one symbol/timeframe stored as hive-style month
+    partitions:
+
+        <data_path>/<symbol>/<timeframe>/year=2021/month=03/<file>.parquet
+
+    Appends write a new `part-<first>-<last>.parquet` into each month they
+    touch instead of rewriting history; `compact()` merges a month's parts
+    into one sorted, deduplicated `data.parquet` with `ROW_GROUP_ROWS`
+    row groups. Reads open only the months overlapping the requested
+    window and, inside them, only row groups whose timestamp min/max
+    statistics overlap it. `last_scan` reports what the latest read touched.
+    """
+
+    def __init__(self, root: str):
+        self.root = str(root)
+        self.last_scan = {"files": 0, "row_groups": 0, "bytes": 0}
+
+    @classmethod
+    def for_symbol(cls, symbol: str, timeframe: str, data_path=None):
+        return cls(partition_root(symbol, timeframe, data_path))
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.root) and bool(self.months())
+
+    # --- layout ---
+    def months(self) -> list:
+        """
+        Sorted (year, month) partitions present on disk.
+        """
+        months = []
+        if not os.path.isdir(self.root):
+            return months
+        for year_dir in os.listdir(self.root):
+            if not year_dir.startswith("year="):
+                continue
+            for month_dir in os.listdir(os.path.join(self.root, year_dir)):
+                if month_dir.startswith("month="):
+                    months.append((int(year_dir[5:]), int(month_dir[6:])))
+        return sorted(months)
+
+    def month_dir(self, year: int, month: int) -> str:
+        return os.path.join(self.root, f"year={year}", f"month={month:02d}")
+
+    def files(self, start_ms=None, end_ms=None) -> list:
+        """
+        Parquet files of the months overlapping [start_ms, end_ms].
+        """
+        first = _month_of(start_ms) if start_ms is not None else None
+        last = _month_of(end_ms) if end_ms is not None else None
+        paths = []
+        for year, month in self.months():
+            if (first and (year, month) < first) or (last and (year, month) > last):
+                continue
+            directory = self.month_dir(year, month)
+            paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                         if name.endswith(".parquet"))
+        return paths
+
+    # --- reads ---
+    def read(self, start_ms=None, end_ms=None) -> dict:
+        """
+        Columns with `start_ms <= timestamp <= end_ms`, sorted and
+        deduplicated on timestamp, in the `read_ohlcv_columns` layout.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tables = []
+        scan = {"files": 0, "row_groups": 0, "bytes": 0}
+        paths = self.files(start_ms, end_ms)
+        for path in paths:
+            parquet = pq.ParquetFile(path)
+            meta = parquet.metadata
+            ts_col = meta.schema.names.index("timestamp")
+            groups = []
+            for i in range(meta.num_row_groups):
+                stats = meta.row_group(i).column(ts_col).statistics
+                if stats is not None and stats.has_min_max:
+                    if end_ms is not None and _to_epoch_ms(stats.min) > end_ms:
+                        continue
+                    if start_ms is not None and _to_epoch_ms(stats.max) < start_ms:
+                        continue
+                groups.append(i)
+            if not groups:
+                continue
+            scan["files"] += 1
+            scan["row_groups"] += len(groups)
+            scan["bytes"] += sum(meta.row_group(i).total_byte_size for i in groups)
+            tables.append(parquet.read_row_groups(groups, columns=["timestamp", *OHLCV_COLUMNS]))
+        self.last_scan = scan
+
+        if not tables:
+            return {"timestamp": np.empty(0, dtype="int64"),
+                    **{name: np.empty(0, dtype="float64") for name in OHLCV_COLUMNS}}
+
+        columns = columns_from_table(pa.concat_tables(tables))
+        if len(tables) > 1:
+            columns = _dedupe(columns)
+        ts = columns["timestamp"]
+        lo = int(np.searchsorted(ts, start_ms, side="left")) if start_ms is not None else 0
+        hi = int(np.searchsorted(ts, end_ms, side="right")) if end_ms is not None else len(ts)
+        return {name: col[lo:hi] for name, col in columns.items()}
+
+    def last_timestamp(self):
+        """
+        Open time of the newest bar, read from the last month's statistics.
+        """
+        months = self.months()
+        if not months:
+            return None
+        import pyarrow.parquet as pq
+
+        newest = None
+        for path in self.files(*(_month_bounds(*months[-1]))):
+            meta = pq.ParquetFile(path).metadata
+            ts_col = meta.schema.names.index("timestamp")
+            for i in range(meta.num_row_groups):
+                stats = meta.row_group(i).column(ts_col).statistics
+                if stats is not None and stats.has_min_max:
+                    newest = max(newest or 0, _to_epoch_ms(stats.max))
+        return newest
+
+    def num_rows(self) -> int:
+        """
+        Rows across every file, from the parquet footers alone. Parts not
+        yet compacted may overlap, so this can overcount until `compact()`.
+        """
+        import pyarrow.parquet as pq
+
+        return sum(pq.ParquetFile(path).metadata.num_rows for path in self.files())
+
+    # --- writes ---
+    def append(self, columns: dict) -> list:
+        """
+        Write `columns` as one new part file per month touched. Returns the
+        files written.
+        """
+        ts = columns["timestamp"]
+        if not len(ts):
+            return []
+        order = np.argsort(ts, kind="stable")
+        columns = {name: np.asarray(col)[order] for name, col in columns.items()}
+        ts = columns["timestamp"]
+
+        months = ts.astype("datetime64[ms]").astype("datetime64[M]")
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        ends = np.r_[starts[1:], len(ts)]
+        written = []
+        for lo, hi in zip(starts, ends):
+            year, month = divmod(int(months[lo].astype("int64")), 12)
+            directory = self.month_dir(1970 + year, month + 1)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{int(ts[lo])}-{int(ts[hi - 1])}.parquet")
+            _write(path, {name: col[lo:hi] for name, col in columns.items()})
+            written.append(path)
+        return written
+
+    def compact(self, force=False) -> int:
+        """
+        Merge every month holding more than one file (or, with `force`,
+        every month) into a single `data.parquet`. Returns months rewritten.
+        """
+        rewritten = 0
+        for year, month in self.months():
+            directory = self.month_dir(year, month)
+            names = [name for name in os.listdir(directory) if name.endswith(".parquet")]
+            if not names or (len(names) == 1 and names[0] == COMPACT_FILE and not force):
+                continue
+            lo, hi = _month_bounds(year, month)
+            columns = self.read(lo, hi)
+            _write(os.path.join(directory, COMPACT_FILE), columns)
+            for name in names:
+                if name != COMPACT_FILE:
+                    os.remove(os.path.join(directory, name))
+            rewritten += 1
+        return rewritten
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _write(path: str, columns: dict):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "timestamp": pa.array(np.asarray(columns["timestamp"]).astype("datetime64[ms]"), pa.timestamp("ms")),
+        **{name: pa.array(np.asarray(columns[name], dtype="float64")) for name in OHLCV_COLUMNS},
+    })
+    tmp = f"{path}.tmp-{os.getpid()}"
+    # Sorted input plus small row groups gives tight timestamp min/max per group
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_ROWS, write_statistics=["timestamp"])
+    os.replace(tmp, path)
+
+
+def _dedupe(columns: dict) -> dict:
+    ts = columns["timestamp"]
+    order = np.argsort(ts, kind="stable")
+    ts = ts[order]
+    # Keep the last copy of each timestamp: later parts win
+    keep = np.r_[ts[1:] != ts[:-1], True]
+    return {name: col[order][keep] for name, col in columns.items()}
+
+
+def _month_of(ms: int):
+    month = int(np.datetime64(int(ms), "ms").astype("datetime64[M]").astype("int64"))
+    return 1970 + month // 12, month % 12 + 1
+
+
+def _month_bounds(year: int, month: int):
+    first = np.datetime64(f"{year:04d}-{month:02d}", "M")
+    lo = int(first.astype("datetime64[ms]").astype("int64"))
+    hi = int((first + 1).astype("datetime64[ms]").astype("int64")) - 1
+    return lo, hi
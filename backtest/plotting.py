@@ -0,0 +1,157 @@
+# backtest/plotting.py
+import html
+import io
+import os
+
+import numpy as np
+
+DEFAULT_MAX_POINTS = 4000  # ~2 points per pixel column of a 12in @ 150dpi figure
+
+
+def minmax_indices(y, n_buckets: int):
+    """
+    Indices of the min and max of `y` in each of `n_buckets` equal-width
+    buckets, plus the endpoints. Keeps every spike a line plot would show
+    at that resolution.
+    """
+    n = len(y)
+    if n_buckets < 1 or 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+    width = -(-n // n_buckets)
+    rows = -(-n // width)
+    # Pad the last bucket with its final value so the array reshapes cleanly
+    padded = np.concatenate([y, np.repeat(y[-1], rows * width - n)]).reshape(rows, width)
+    base = np.arange(rows) * width
+    idx = np.concatenate([[0, n - 1], base + padded.argmin(axis=1), base + padded.argmax(axis=1)])
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def lttb_indices(x, y, n_out: int):
+    """
+    Largest-Triangle-Three-Buckets: keep the point in each bucket that
+    spans the largest triangle with the previously kept point and the
+    next bucket's average. `x` must be increasing.
+    """
+    n = len(x)
+    if n_out < 3 or n_out >= n:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, n_out - 1).astype("int64")
+    idx = np.empty(n_out, dtype="int64")
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nxt = slice(edges[b + 1], edges[b + 2])
+        else:
+            nxt = slice(n - 1, n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx[b + 1] = a
+    return idx
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method="minmax"):
+    """
+    Reduce a series to about `max_points` points. NaN (warm-up) values
+    are dropped first.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype="float64")
+    keep = ~np.isnan(y)
+    if not keep.all():
+        x, y = x[keep], y[keep]
+    if method == "minmax":
+        idx = minmax_indices(y, max_points // 2)
+    elif method == "lttb":
+        idx = lttb_indices(x.astype("int64"), y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return x[idx], y[idx]
+
+
+def to_epoch_ms(timestamps):
+    """
+    Epoch-ms int64 array from ms ints, datetime64 values or datetimes.
+    """
+    arr = np.asarray(timestamps)
+    if arr.dtype.kind in "iu":
+        return arr.astype("int64")
+    return arr.astype("datetime64[ms]").astype("int64")
+
+
+def render_backtest(path, timestamps, close, trades=(), overlays=None, subplots=None, equity=None,
+                    title="", max_points=DEFAULT_MAX_POINTS, method="minmax", dpi=150):
+    """
+    Draw price, trade markers, indicators and equity to `path` without a
+    GUI backend. The format follows the extension: .png/.svg/.pdf via
+    matplotlib's Agg canvas, .html as a standalone page with an inline SVG.
+
+    `timestamps`/`close` are the run's arrays; `overlays`/`subplots` map a
+    name to `(timestamps, values)`; `trades` is an iterable of
+    `(timestamp, price, is_buy)`; `equity` is an optional
+    `(timestamps, values)` drawn in its own panel. Every line series is
+    downsampled to about `max_points` points.
+    """
+    from matplotlib.figure import Figure
+
+    panels = ["price"] + (["indicators"] if subplots else []) + (["equity"] if equity is not None else [])
+    ratios = {"price": 3, "indicators": 1, "equity": 1}
+    fig = Figure(figsize=(12, 3 + 1.5 * (len(panels) - 1)))
+    axs = fig.subplots(len(panels), 1, sharex=True, squeeze=False,
+                       gridspec_kw={"height_ratios": [ratios[p] for p in panels]})[:, 0]
+    ax = dict(zip(panels, axs))
+
+    def line(axis, ts, values, **kwargs):
+        xs, ys = downsample(to_epoch_ms(ts), values, max_points, method)
+        axis.plot(xs.astype("datetime64[ms]"), ys, **kwargs)
+
+    price_ax = ax["price"]
+    line(price_ax, timestamps, close, label="Close Price", color="black", linewidth=0.8)
+
+    trades = list(trades)
+    if trades:
+        ts = to_epoch_ms([t[0] for t in trades]).astype("datetime64[ms]")
+        prices = np.array([float(t[1]) for t in trades])
+        buys = np.array([bool(t[2]) for t in trades])
+        price_ax.scatter(ts[buys], prices[buys], color="green", marker="^", label="BUY", zorder=5, s=12)
+        price_ax.scatter(ts[~buys], prices[~buys], color="red", marker="v", label="SELL", zorder=5, s=12)
+
+    for name, (ts, values) in (overlays or {}).items():
+        line(price_ax, ts, values, label=name, linewidth=0.8)
+
+    price_ax.set_title(title)
+    price_ax.set_ylabel("Price")
+    price_ax.legend(loc="upper left")
+    price_ax.grid(True)
+
+    if subplots:
+        sub_ax = ax["indicators"]
+        for name, (ts, values) in subplots.items():
+            line(sub_ax, ts, values, label=name, linewidth=0.8)
+        sub_ax.set_ylabel("Indicator")
+        sub_ax.legend(loc="upper left")
+        sub_ax.grid(True)
+
+    if equity is not None:
+        eq_ax = ax["equity"]
+        line(eq_ax, *equity, label="Equity", color="tab:blue", linewidth=0.8)
+        eq_ax.set_ylabel("Equity")
+        eq_ax.grid(True)
+
+    axs[-1].set_xlabel("Time")
+    fig.tight_layout()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if str(path).lower().endswith(".html"):
+        buf = io.StringIO()
+        fig.savefig(buf, format="svg")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+                    f"</head>\n<body>\n{buf.getvalue()}\n</body></html>\n")
+    else:
+        fig.savefig(path, dpi=dpi)
+    return path
@@ -0,0 +1,165 @@
+# backtest/profiler.py
+from array import array
+from collections import Counter
+from time import perf_counter_ns
+
+# Stage -> frames below the bar in the collapsed-stack export
+STAGES = {
+    "indicators": "indicators",
+    "snapshot": "snapshot",
+    "exit_triggers": "executor;check_exit_triggers",
+    "pending_limits": "executor;check_pending_limits",
+    "strategy": "strategy.on_data",
+    "submit": "orders;executor.submit_order",
+    "broker": "orders;broker.record_trade",
+    "logging": "orders;logger.log_trade",
+    "equity": "equity.update",
+    "tick_log": "logger.tick",
+}
+PERCENTILES = (50, 90, 99)
+
+
+class StageProfiler:
+    """
+    Opt-in per-stage timings for the engine loops.
+
+    Only every `every`-th bar is timed, with `perf_counter_ns` laps between
+    stages, so the untimed bars cost one branch per stage. Each lap is kept
+    (as int64 ns) for percentiles; `summary()` also scales the sampled
+    totals up to the whole run. Bars in `flame_bars` (a `(first, last)`
+    index range, inclusive) are always timed and folded into collapsed
+    stacks for `write_collapsed()`, the format read by flamegraph.pl and
+    speedscope.
+
+        profiler = StageProfiler(every=100, flame_bars=(50_000, 60_000))
+        engine = BacktestEngine(..., profile=profiler)
+    """
+
+    def __init__(self, every=100, flame_bars=None, root="backtest"):
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.every = every
+        self.flame_bars = flame_bars
+        self.root = root
+        self.bars = 0          # bars seen
+        self.sampled_bars = 0  # bars timed
+        self.samples = {}      # stage -> array of ns per call
+        self.totals = Counter()
+        self.stacks = Counter()
+        self._current = None   # stage -> ns within the bar being folded
+        self._open = False     # inside a timed bar
+        self._bar_stages = set()
+        self._calls = Counter()
+
+    # --- recording ---
+    def start_bar(self, i: int):
+        """
+        Called once per bar. Returns the start time (ns) when bar `i` is
+        timed, else None.
+        """
+        self.bars += 1
+        flame = self.flame_bars is not None and self.flame_bars[0] <= i <= self.flame_bars[1]
+        if i % self.every and not flame:
+            self._current = None
+            return None
+        self.sampled_bars += 1
+        self._current = {} if flame else None
+        self._open = True
+        return perf_counter_ns()
+
+    def lap(self, stage: str, started: int) -> int:
+        """
+        Record the time since `started` against `stage`; returns now, the
+        start of the next lap.
+        """
+        now = perf_counter_ns()
+        self.add(stage, now - started)
+        return now
+
+    def add(self, stage: str, ns: int):
+        samples = self.samples.get(stage)
+        if samples is None:
+            samples = self.samples[stage] = array("q")
+        samples.append(ns)
+        self.totals[stage] += ns
+        if self._open:
+            self._bar_stages.add(stage)
+        if self._current is not None:
+            self._current[stage] = self._current.get(stage, 0) + ns
+
+    def end_bar(self, started: int):
+        """
+        Close a timed bar opened by `start_bar`, recording its total.
+        """
+        ns = perf_counter_ns() - started
+        current, self._current = self._current, None
+        self._open = False
+        self.add("bar", ns)
+        if current is not None:
+            for stage, value in current.items():
+                self.stacks[f"{self.root};bar;{STAGES.get(stage, stage)}"] += value
+            # Whatever the stages did not cover is the loop's own time
+            self.stacks[f"{self.root};bar"] += max(ns - sum(current.values()), 0)
+
+    def sample(self, stage: str) -> bool:
+        """
+        For stages outside the bar loop (live order tasks): True on every
+        `every`-th call for `stage`.
+        """
+        calls = self._calls[stage]
+        self._calls[stage] = calls + 1
+        return calls % self.every == 0
+
+    # --- reporting ---
+    def summary(self) -> list:
+        """
+        One row per stage, slowest first: calls timed, total/mean/percentile
+        milliseconds over the timed calls, the total estimated for the
+        whole run and the share of the timed bar time.
+        """
+        import numpy as np
+
+        bar_total = self.totals.get("bar") or 0
+        scale = self.bars / self.sampled_bars if self.sampled_bars else 1
+        rows = []
+        for stage, samples in self.samples.items():
+            values = np.frombuffer(samples, dtype="int64") / 1e6
+            row = {
+                "stage": stage,
+                "calls": len(values),
+                "total_ms": round(float(values.sum()), 3),
+                "est_total_ms": round(float(values.sum()) * scale, 3),
+                "mean_ms": round(float(values.mean()), 6),
+                **{f"p{p}_ms": round(float(v), 6) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+                # Only stages timed inside the bar are a fraction of it
+                "share": round(self.totals[stage] / bar_total, 4) if bar_total and stage in self._bar_stages
+                else None,
+            }
+            rows.append(row)
+        rows.sort(key=lambda r: (r["stage"] != "bar", -r["total_ms"]))
+        return rows
+
+    def write_collapsed(self, path) -> int:
+        """
+        Write the folded stacks of the `flame_bars` range, one
+        `frame;frame;... <ns>` line each. Returns the lines written.
+        """
+        with open(path, "w") as f:
+            for stack, ns in sorted(self.stacks.items()):
+                if ns > 0:
+                    f.write(f"{stack} {ns}\n")
+        return sum(1 for ns in self.stacks.values() if ns > 0)
+
+
+def make_profiler(profile, root="backtest"):
+    """
+    Engine `profile=` argument: None/False, True (every 100th bar), an int
+    sampling interval or a ready `StageProfiler`.
+    """
+    if profile is None or profile is False:
+        return None
+    if isinstance(profile, StageProfiler):
+        return profile
+    if profile is True:
+        return StageProfiler(root=root)
+    return StageProfiler(every=int(profile), root=root)
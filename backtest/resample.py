@@ -0,0 +1,118 @@
+# backtest/resample.py
+import os
+import shutil
+
+import numpy as np
+
+from backtest.dataloader import OHLCV_COLUMNS, ohlcv_path, read_ohlcv_columns
+from backtest.partitions import PartitionedDataset
+from config.settings import DATA_PATH
+from core.timeframes import UNIT_MS, timeframe_to_ms
+
+BASE_TIMEFRAME = "1m"
+# Epoch day 0 was a Thursday; exchanges open weekly candles on Monday
+WEEK_OFFSET_MS = 4 * UNIT_MS["d"]
+
+
+def resample_columns(columns: dict, timeframe: str, base_timeframe: str = BASE_TIMEFRAME) -> dict:
+    """
+    Aggregate sorted OHLCV columns (int64 epoch-ms open times) to
+    `timeframe` with one vectorized group-by: buckets are epoch-aligned
+    (weeks start on Monday, as on exchanges), open/close take the first
+    and last bar, high/low the extremes and volume the sum. Buckets with
+    missing base bars are kept; a trailing bucket that is still forming
+    is dropped.
+    """
+    tf = timeframe_to_ms(timeframe)
+    base = timeframe_to_ms(base_timeframe)
+    if tf % base:
+        raise ValueError(f"{timeframe} is not a multiple of {base_timeframe}")
+
+    ts = columns["timestamp"]
+    if not len(ts):
+        return {name: col[:0] for name, col in columns.items()}
+
+    offset = WEEK_OFFSET_MS if timeframe.endswith("w") else 0
+    buckets = (ts - offset) // tf * tf + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    out = {
+        "timestamp": buckets[starts],
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+    if ts[-1] + base < out["timestamp"][-1] + tf:
+        out = {name: col[:-1] for name, col in out.items()}
+    return {name: np.ascontiguousarray(col) for name, col in out.items()}
+
+
+def write_ohlcv_columns(columns: dict, path: str):
+    """
+    Write columns as an OHLCV parquet file with a `timestamp[ms]` column,
+    the same layout the downloader produces.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "timestamp": pa.array(columns["timestamp"].astype("datetime64[ms]"), pa.timestamp("ms")),
+        **{name: pa.array(columns[name], pa.float64()) for name in OHLCV_COLUMNS},
+    })
+    tmp = f"{path}.tmp-{os.getpid()}"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+class ResampleCache:
+    """
+    Derived timeframes built from the stored base (1m) parquet and cached
+    as parquet files, so any loader can read them like downloaded data.
+
+    Layout: `<root>/<symbol>/<symbol>_<timeframe>-<signature>.parquet`,
+    where the signature comes from the base file's mtime and size (or
+    those of its month partitions, see `PartitionedDataset`). An
+    updated base file therefore yields a fresh derived file on next use,
+    and the stale one is removed.
+    """
+
+    def __init__(self, root=None, data_path=None, base_timeframe=BASE_TIMEFRAME):
+        self.data_path = data_path or DATA_PATH
+        self.root = str(root or os.path.join(self.data_path, ".resampled"))
+        self.base_timeframe = base_timeframe
+
+    def path(self, symbol: str, timeframe: str) -> str:
+        """
+        Path of the derived parquet file, building it if it is missing or stale.
+        """
+        source = ohlcv_path(symbol, self.base_timeframe, self.data_path)
+        partitions = None
+        if os.path.exists(source):
+            stat = os.stat(source)
+            mtime, size = stat.st_mtime_ns, stat.st_size
+        else:
+            # Month-partitioned base data: sign with the newest part and the total size
+            partitions = PartitionedDataset.for_symbol(symbol, self.base_timeframe, self.data_path)
+            stats = [os.stat(f) for f in partitions.files()]
+            if not stats:
+                raise FileNotFoundError(source)
+            mtime, size = max(st.st_mtime_ns for st in stats), sum(st.st_size for st in stats)
+        directory = os.path.join(self.root, symbol)
+        prefix = f"{symbol}_{timeframe}-"
+        path = os.path.join(directory, f"{prefix}{mtime:x}-{size:x}.parquet")
+
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            base = read_ohlcv_columns(source) if partitions is None else partitions.read()
+            columns = resample_columns(base, timeframe, self.base_timeframe)
+            write_ohlcv_columns(columns, path)
+            for name in os.listdir(directory):
+                if name.startswith(prefix) and os.path.join(directory, name) != path and ".tmp-" not in name:
+                    os.remove(os.path.join(directory, name))
+        return path
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
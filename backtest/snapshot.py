@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 
-@dataclass
+@dataclass(slots=True)
 class MarketSnapshot:
     symbol: str
     timestamp: datetime
@@ -0,0 +1,190 @@
+# backtest/sweep.py
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backtest.dataloader import ColumnarOHLCVLoader
+from services.event_sink import SilentSink
+from services.trade_logger import TradeLogger
+
+SUMMARY_FIELDS = ["final_balance", "final_equity", "trade_count", "cagr", "sharpe", "sortino",
+                  "max_drawdown", "win_rate", "profit_factor", "turnover", "elapsed_s"]
+REPORTED = SUMMARY_FIELDS[1:-1]
+
+
+def param_grid(grid: dict) -> list:
+    """
+    Expand {"name": [values...]} into one dict per combination.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_key(params: dict, dataset: dict = None) -> str:
+    """
+    Stable id of one run: its params plus the dataset it ran on (symbol,
+    timeframe, window, starting balance), so a results file reused for
+    other data never passes its rows off as done.
+    """
+    encoded = json.dumps({"params": params, "dataset": dataset or {}}, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+def simple_rsi_engine(params: dict, loader, account_balance, logger=None):
+    """
+    Default engine factory: `period` goes to RSIIndicator, everything else
+    to SimpleRSIStrategy. Factories get the worker's silent `logger` and
+    pass it on to the engine, and must record equity for the report.
+    """
+    from backtest.engine import BacktestEngine
+    from domain.simple_rsi_strategy import SimpleRSIStrategy
+    from indicators.rsi import RSIIndicator
+
+    strategy_params = {k: v for k, v in params.items() if k != "period"}
+    return BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol=loader.symbol, **strategy_params),
+        symbol=loader.symbol,
+        timeframe=loader.timeframe,
+        account_balance=account_balance,
+        indicators={"rsi": RSIIndicator(period=params.get("period", 14))},
+        loader=loader,
+        logger=logger,
+        equity_every=1,
+    )
+
+
+# --- worker process state: bar data is loaded once per worker ---
+_worker = {}
+
+
+def _init_worker(loader_kwargs, engine_factory, account_balance, plot_dir=None, dataset=None):
+    loader = ColumnarOHLCVLoader(**loader_kwargs)
+    loader.load_arrays()
+    _worker.update(loader=loader, engine_factory=engine_factory, account_balance=account_balance, plot_dir=plot_dir,
+                   dataset=dataset, logger=TradeLogger(SilentSink()))
+
+
+def _run_one(params: dict) -> dict:
+    started = time.perf_counter()
+    engine = _worker["engine_factory"](params, _worker["loader"], _worker["account_balance"], logger=_worker["logger"])
+    engine.run()
+    report = engine.report()
+    elapsed = round(time.perf_counter() - started, 3)
+    key = run_key(params, _worker["dataset"])
+    if _worker.get("plot_dir"):
+        engine.plot_trades(os.path.join(_worker["plot_dir"], f"{key}.png"),
+                           subplot_indicators=engine.indicators)
+
+    return {
+        "key": key,
+        **params,
+        "final_balance": float(engine.broker.account_balance),
+        **{name: report[name] for name in REPORTED},
+        "elapsed_s": elapsed,
+    }
+
+
+class SweepRunner:
+    """
+    Fans a parameter grid out over a process pool.
+
+    Each worker loads the bars once (optionally through the memory-mapped
+    BarCache) and reuses them for every run it is handed. Summaries are
+    appended to `results_path` as runs finish; rerunning the same sweep
+    on the same data skips every combination already in the file, and
+    rows left incomplete by an interrupted run are dropped first. Engines
+    log through a `SilentSink`. With `plot_dir` set, each run is also
+    rendered headlessly to `<plot_dir>/<key>.png`.
+    """
+
+    def __init__(self, symbol: str, timeframe: str, grid: dict, results_path: str, start=None, end=None,
+                 account_balance=10000, workers=None, data_path=None, cache=None,
+                 engine_factory=simple_rsi_engine, plot_dir=None):
+        self.grid = grid
+        self.results_path = results_path
+        self.account_balance = account_balance
+        self.workers = workers or os.cpu_count()
+        self.engine_factory = engine_factory
+        self.plot_dir = plot_dir
+        self.loader_kwargs = dict(symbol=symbol, timeframe=timeframe, start=start, end=end,
+                                  data_path=data_path, cache=cache)
+        self.dataset = dict(symbol=symbol, timeframe=timeframe, start=start, end=end,
+                            account_balance=account_balance)
+
+    def pending(self) -> list:
+        done = self.completed_keys()
+        return [p for p in param_grid(self.grid) if run_key(p, self.dataset) not in done]
+
+    def completed_keys(self) -> set:
+        if not os.path.exists(self.results_path):
+            return set()
+        with open(self.results_path, newline="") as f:
+            return {row["key"] for row in csv.DictReader(f) if _complete(row)}
+
+    def drop_partial_rows(self) -> int:
+        """
+        Rewrite the results file without rows cut short by an interrupted
+        run. Returns the number of rows dropped.
+        """
+        if not os.path.exists(self.results_path):
+            return 0
+        with open(self.results_path, newline="") as f:
+            text = f.read()
+        reader = csv.DictReader(text.splitlines())
+        rows = list(reader)
+        fields = reader.fieldnames
+        kept = [row for row in rows if _complete(row)]
+        if rows and kept and kept[-1] is rows[-1] and not text.endswith("\n"):
+            kept.pop()  # the last write stopped before its line ending
+        if len(kept) == len(rows):
+            return 0
+        tmp = f"{self.results_path}.tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(kept)
+        os.replace(tmp, self.results_path)
+        return len(rows) - len(kept)
+
+    def run(self, on_result=None) -> int:
+        self.drop_partial_rows()
+        pending = self.pending()
+        if not pending:
+            return 0
+
+        fields = ["key", *self.grid, *SUMMARY_FIELDS]
+        new_file = not os.path.exists(self.results_path) or os.path.getsize(self.results_path) == 0
+        if not new_file:
+            with open(self.results_path, newline="") as f:
+                header = next(csv.reader(f), [])
+            if header != fields:
+                raise ValueError(f"{self.results_path} has columns {header}, this sweep writes {fields}; "
+                                 f"use another results file")
+        with open(self.results_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file:
+                writer.writeheader()
+
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)),
+                initializer=_init_worker,
+                initargs=(self.loader_kwargs, self.engine_factory, self.account_balance, self.plot_dir,
+                          self.dataset),
+            ) as pool:
+                futures = [pool.submit(_run_one, params) for params in pending]
+                for future in as_completed(futures):
+                    row = future.result()
+                    writer.writerow(row)
+                    f.flush()
+                    if on_result:
+                        on_result(row)
+        return len(pending)
+
+
+def _complete(row: dict) -> bool:
+    # A truncated row is short of columns (None) or stops before the last one
+    return None not in row.values() and bool(row.get("elapsed_s"))
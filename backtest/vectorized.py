@@ -0,0 +1,205 @@
+# backtest/vectorized.py
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from backtest.dataloader import make_loader
+
+TAGS = ("entry", "close", "reentry", "sl_exit", "tp_exit", "exit")
+ENTRY, CLOSE, REENTRY, SL_EXIT, TP_EXIT, EXIT = range(len(TAGS))
+
+TRADE_DTYPE = np.dtype([
+    ("bar", "int64"),
+    ("timestamp", "int64"),   # epoch ms
+    ("side", "int8"),         # +1 BUY, -1 SELL
+    ("quantity", "float64"),
+    ("price", "float64"),
+    ("tag", "int8"),          # index into TAGS
+    ("pnl", "float64"),       # realized PnL, 0 for opening trades
+    ("balance", "float64"),   # account balance after the trade
+    ("margin", "float64"),    # margin held after the trade
+])
+
+
+@dataclass
+class VectorizedResult:
+    trades: np.ndarray          # structured array with TRADE_DTYPE
+    account_balance: float
+    margin: float
+    position_side: int          # +1 long, -1 short, 0 flat
+    position_quantity: float
+    bars: int
+
+    @property
+    def trade_count(self) -> int:
+        return len(self.trades)
+
+    def tags(self):
+        return [TAGS[t] for t in self.trades["tag"]]
+
+
+def rsi_signals(rsi, rsi_low=30, rsi_high=70):
+    """
+    Long/short entry arrays for a SimpleRSIStrategy-style threshold rule.
+    NaN (warm-up) bars never signal.
+    """
+    rsi = np.asarray(rsi, dtype="float64")
+    with np.errstate(invalid="ignore"):
+        return rsi < rsi_low, rsi > rsi_high
+
+
+class VectorizedBacktestEngine:
+    """
+    Signal-array backtester for threshold strategies with fixed SL/TP.
+
+    Mirrors the event loop in `BacktestEngine` + `MockExecutor` + `Broker`:
+    exits are checked against the bar's high/low before the strategy sees
+    it and fill at the close; a signal while flat enters at the close; an
+    opposite signal while in a position closes and re-enters (flip).
+    Instead of visiting every bar, the engine jumps between events using
+    precomputed signal indices and vectorized SL/TP scans, so Python work
+    scales with the number of trades rather than the number of bars.
+    """
+    scan_block = 256
+
+    def __init__(self, symbol: str, timeframe: str, account_balance=10000, size_fraction=0.3,
+                 leverage=1.0, sl_pct=None, tp_pct=None, start=None, end=None, loader="columnar"):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.starting_balance = float(account_balance)
+        self.size_fraction = float(size_fraction)
+        self.leverage = float(leverage)
+        self.sl_pct = sl_pct
+        self.tp_pct = tp_pct
+        self.loader = make_loader(loader, symbol, timeframe, start, end)
+
+    def run(self, long_entries, short_entries, exits=None) -> VectorizedResult:
+        arrays = self.loader.load_arrays()
+        ts, high, low, close = arrays["timestamp"], arrays["high"], arrays["low"], arrays["close"]
+        n = len(close)
+
+        long_idx = np.flatnonzero(long_entries)
+        short_idx = np.flatnonzero(short_entries)
+        any_idx = np.flatnonzero(np.asarray(long_entries) | np.asarray(short_entries))
+        exit_idx = np.flatnonzero(exits) if exits is not None else np.empty(0, dtype="int64")
+        is_long = np.asarray(long_entries, dtype=bool)
+
+        records = []
+        balance = self.starting_balance
+        side = 0
+        qty = entry = margin = 0.0
+        sl = tp = None
+        i = 0
+
+        def record(bar, trade_side, trade_qty, price, tag, pnl=0.0):
+            records.append((bar, ts[bar], trade_side, trade_qty, price, tag, pnl, balance, margin))
+
+        while i < n:
+            if side == 0:
+                j = _next(any_idx, i)
+                if j >= n:
+                    break
+                side = 1 if is_long[j] else -1
+                qty, entry, margin, sl, tp = self._open(balance, close[j], side)
+                record(j, side, qty, entry, ENTRY)
+                i = j + 1
+                continue
+
+            opposite = short_idx if side == 1 else long_idx
+            k_flip = _next(opposite, i)
+            k_exit = _next(exit_idx, i)
+            k_hit, tp_hit = self._scan_exits(high, low, i, min(k_flip, k_exit, n), side, sl, tp)
+            k = min(k_hit, k_flip, k_exit)
+            if k >= n:
+                break
+
+            price = close[k]
+            pnl = (price - entry) * qty if side == 1 else (entry - price) * qty
+
+            if k == k_hit:
+                # MockExecutor.check_exit_triggers: close at the bar's close,
+                # then the strategy sees a flat book on the same bar
+                balance += pnl
+                margin = 0.0
+                record(k, -side, qty, price, TP_EXIT if tp_hit else SL_EXIT, pnl)
+                side = 0
+                if _next(any_idx, k) == k:
+                    side = 1 if is_long[k] else -1
+                    qty, entry, margin, sl, tp = self._open(balance, price, side)
+                    record(k, side, qty, entry, ENTRY)
+            elif k == k_flip:
+                # SimpleRSIStrategy sizes the re-entry before the close is booked
+                projected = balance + pnl + margin
+                balance += pnl
+                margin = 0.0
+                record(k, -side, qty, price, CLOSE, pnl)
+                side = -side
+                qty, entry, margin, sl, tp = self._open(projected, price, side)
+                record(k, side, qty, entry, REENTRY)
+            else:
+                balance += pnl
+                margin = 0.0
+                record(k, -side, qty, price, EXIT, pnl)
+                side = 0
+            i = k + 1
+
+        trades = np.array(records, dtype=TRADE_DTYPE)
+        return VectorizedResult(
+            trades=trades,
+            account_balance=balance,
+            margin=margin if side else 0.0,
+            position_side=side,
+            position_quantity=qty if side else 0.0,
+            bars=n,
+        )
+
+    def _open(self, balance, price, side):
+        # Strategy.compute_quantity: notional / price, rounded down to 4 dp
+        raw = balance * self.size_fraction * self.leverage / price
+        qty = math.floor(raw * 1e4 + 1e-9) / 1e4
+        margin = qty * price / self.leverage
+        sl = tp = None
+        if self.sl_pct is not None:
+            move = self.sl_pct / self.leverage
+            sl = price * (1 - move) if side == 1 else price * (1 + move)
+        if self.tp_pct is not None:
+            move = self.tp_pct / self.leverage
+            tp = price * (1 + move) if side == 1 else price * (1 - move)
+        return qty, price, margin, sl, tp
+
+    def _scan_exits(self, high, low, start, stop, side, sl, tp):
+        """
+        First bar in [start, stop) whose range hits SL or TP, scanned in
+        growing vectorized blocks. Returns (bar, tp_hit) or (len, False).
+        """
+        n = len(high)
+        if sl is None and tp is None:
+            return n, False
+
+        block = self.scan_block
+        lo = start
+        while lo < stop:
+            hi = min(lo + block, stop)
+            h, l = high[lo:hi], low[lo:hi]
+            if side == 1:
+                sl_hit = l <= sl if sl is not None else np.zeros(hi - lo, bool)
+                tp_hit = h >= tp if tp is not None else np.zeros(hi - lo, bool)
+            else:
+                sl_hit = h >= sl if sl is not None else np.zeros(hi - lo, bool)
+                tp_hit = l <= tp if tp is not None else np.zeros(hi - lo, bool)
+            hit = sl_hit | tp_hit
+            if hit.any():
+                j = int(hit.argmax())
+                return lo + j, bool(tp_hit[j])
+            lo = hi
+            block *= 2
+        return n, False
+
+
+def _next(indices, i):
+    """
+    First index >= i in a sorted index array, or a sentinel past the end.
+    """
+    pos = np.searchsorted(indices, i)
+    return int(indices[pos]) if pos < len(indices) else np.iinfo(np.int64).max
@@ -0,0 +1,77 @@
+"""
+Compare two `benchmarks.suite` JSON reports and flag regressions.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.10
+
+A result regresses when its throughput drops by more than `threshold`
+(a fraction) against the base. Exits with status 1 if anything regressed,
+so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(base: dict, head: dict, threshold: float = 0.10) -> list:
+    """
+    Rows of (name, base_value, head_value, ratio, status) for every result
+    in either report; `status` is "regressed", "improved", "ok", "new" or
+    "missing".
+    """
+    rows = []
+    old, new = base["results"], head["results"]
+    for name in sorted(set(old) | set(new)):
+        if name not in new:
+            rows.append((name, old[name]["value"], None, None, "missing"))
+            continue
+        if name not in old:
+            rows.append((name, None, new[name]["value"], None, "new"))
+            continue
+        ratio = new[name]["value"] / old[name]["value"]
+        if ratio < 1 - threshold:
+            status = "regressed"
+        elif ratio > 1 + threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, old[name]["value"], new[name]["value"], ratio, status))
+    return rows
+
+
+def _fmt(value):
+    return "-" if value is None else f"{value:,.0f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Flag throughput regressions between two benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    for report in (base, head):
+        meta = report.get("meta", {})
+        print(f"# {meta.get('commit') or '?'}  bars={meta.get('bars')}  seed={meta.get('seed')}  "
+              f"python={meta.get('python')}  {meta.get('machine')}")
+    if base.get("meta", {}).get("bars") != head.get("meta", {}).get("bars"):
+        print("⚠️ reports used different bar counts; ratios may not be comparable")
+
+    rows = compare(base, head, args.threshold)
+    print(f"{'benchmark':<34} {'base':>16} {'head':>16} {'ratio':>7}  status")
+    for name, old, new, ratio, status in rows:
+        print(f"{name:<34} {_fmt(old):>16} {_fmt(new):>16} {'-' if ratio is None else f'{ratio:.2f}':>7}  {status}")
+
+    regressed = [row[0] for row in rows if row[4] == "regressed"]
+    if regressed:
+        print(f"❌ {len(regressed)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    print("✅ no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
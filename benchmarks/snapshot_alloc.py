@@ -0,0 +1,117 @@
+"""
+Allocation cost of the per-bar objects BacktestEngine.run creates: the
+MarketSnapshot from the loader and the EnrichedSnapshot handed to the
+strategy.
+
+Three variants are measured with tracemalloc over the same bars:
+
+    legacy   dict-backed dataclass + __getattr__ wrapper (the old models)
+    slotted  current slotted MarketSnapshot / EnrichedSnapshot, fresh per bar
+    reuse    slotted objects updated in place (engine reuse_snapshots=True)
+
+Each variant keeps every bar alive, as a strategy buffering history
+would, so the numbers are retained bytes per bar; `reuse` retains only
+one object by construction. Timing is measured separately without
+tracemalloc.
+
+    python -m benchmarks.snapshot_alloc --bars 200000
+"""
+import argparse
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from backtest.enriched_snapshot import EnrichedSnapshot
+from backtest.snapshot import MarketSnapshot
+
+
+@dataclass
+class LegacySnapshot:
+    symbol: str
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class LegacyEnriched:
+    def __init__(self, snapshot, indicators):
+        self.snapshot = snapshot
+        self.indicators = indicators
+
+    def __getattr__(self, item):
+        return getattr(self.snapshot, item)
+
+
+def bars(n):
+    start = datetime(2024, 1, 1)
+    step = timedelta(minutes=1)
+    return [(start + i * step, 100.0 + i % 7, 101.0, 99.0, 100.5, 12.0) for i in range(n)]
+
+
+def legacy(rows, keep):
+    for ts, o, h, l, c, v in rows:
+        data = LegacyEnriched(LegacySnapshot("BTCUSDT", ts, o, h, l, c, v), {"rsi": c})
+        keep.append(data)
+        data.close
+
+
+def slotted(rows, keep):
+    for ts, o, h, l, c, v in rows:
+        data = EnrichedSnapshot(MarketSnapshot("BTCUSDT", ts, o, h, l, c, v), {"rsi": c})
+        keep.append(data)
+        data.close
+
+
+def reuse(rows, keep):
+    snapshot = MarketSnapshot("BTCUSDT", None, 0.0, 0.0, 0.0, 0.0, 0.0)
+    values = {}
+    data = EnrichedSnapshot(snapshot, values)
+    for ts, o, h, l, c, v in rows:
+        snapshot.timestamp = ts
+        snapshot.open, snapshot.high, snapshot.low, snapshot.close, snapshot.volume = o, h, l, c, v
+        values["rsi"] = c
+        data.reset(snapshot, values)
+        data.close
+    keep.append(data)
+
+
+VARIANTS = {"legacy": legacy, "slotted": slotted, "reuse": reuse}
+
+
+def measure(fn, rows):
+    keep = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn(rows, keep)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(s.size_diff for s in stats)
+    count = sum(s.count_diff for s in stats)
+
+    keep.clear()
+    started = time.perf_counter()
+    fn(rows, [])
+    elapsed = time.perf_counter() - started
+    return size, count, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bars", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rows = bars(args.bars)
+    print(f"{'variant':<10}{'bytes/bar':>12}{'objs/bar':>10}{'us/bar':>10}")
+    for name, fn in VARIANTS.items():
+        size, count, elapsed = measure(fn, rows)
+        n = len(rows)
+        print(f"{name:<10}{size / n:>12.1f}{count / n:>10.2f}{elapsed / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Throughput benchmarks for the hot paths, on seeded synthetic bars
+(`benchmarks.synthetic`), written to JSON for `benchmarks.compare`:
+
+    engine     BacktestEngine.run, bars/s (RSI strategy, columnar loader)
+    vectorized VectorizedBacktestEngine vs the event loop on the same strategy, bars/s and ratio
+    indicator  update() and compute_batch() per indicator, bars/s
+    broker     Broker / FixedPointBroker.record_trade, trades/s, and the fixed/decimal ratio
+    executor   MockExecutor limit + exit checks with many resting orders, bars/s
+    loader     parquet -> columns, BarCache build / mmap, snapshot streaming, rows/s
+    startup    fresh-interpreter `import backtest.engine` and cached backtest run, starts/s
+
+    python -m benchmarks.suite --bars 1000000 --out bench.json
+    python -m benchmarks.suite --only engine broker --repeat 5
+
+Every figure is higher-is-better; with `--repeat` the best run is kept.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+
+from backtest.bar_cache import BarCache
+from backtest.dataloader import ColumnarOHLCVLoader
+from backtest.engine import BacktestEngine
+from backtest.snapshot import MarketSnapshot
+from backtest.vectorized import VectorizedBacktestEngine, rsi_signals
+from benchmarks.synthetic import write_dataset
+from core.enums import OrderType, Side
+from core.models import Order, Trade
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import CUTLER, WILDER, RSIIndicator
+from services.broker import Broker, FixedPointBroker
+from services.event_sink import SilentSink
+from services.mock_executor import MockExecutor
+from services.trade_logger import TradeLogger
+
+SYMBOL = "SYNTH"
+INDICATORS = {
+    "rsi_wilder": lambda: RSIIndicator(period=14, mode=WILDER),
+    "rsi_cutler": lambda: RSIIndicator(period=14, mode=CUTLER),
+}
+BROKERS = {"decimal": Broker, "fixed": FixedPointBroker}
+
+
+class Bench:
+    """
+    Shared fixture: the synthetic dataset on disk and its columns.
+    """
+
+    def __init__(self, bars: int, seed: int, data_path: str):
+        self.bars = bars
+        self.seed = seed
+        self.data_path = data_path
+        self.path = write_dataset(data_path, bars, seed, symbol=SYMBOL)
+        self.loader = ColumnarOHLCVLoader(SYMBOL, "1m", data_path=data_path)
+        self.columns = self.loader.load_arrays()
+
+    def snapshots(self, limit=None) -> list:
+        """
+        The first `limit` bars as MarketSnapshots, built outside any timing.
+        """
+        columns = [self.columns[name][:limit] for name in ("open", "high", "low", "close", "volume")]
+        timestamps = self.columns["timestamp"][:limit].astype("datetime64[ms]").tolist()
+        return [MarketSnapshot(SYMBOL, ts, *row) for ts, *row in zip(timestamps, *(c.tolist() for c in columns))]
+
+
+def result(n: int, seconds: float, unit: str, **extra) -> dict:
+    return {"value": n / seconds, "unit": unit, "n": n, "seconds": seconds, **extra}
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+# --- cases ---
+def bench_engine(bench: Bench) -> dict:
+    engine = BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol=SYMBOL, sl_pct=0.02, tp_pct=0.04),
+        symbol=SYMBOL, timeframe="1m", loader=ColumnarOHLCVLoader(SYMBOL, "1m", data_path=bench.data_path),
+        indicators={"rsi": RSIIndicator(period=14)}, logger=TradeLogger(SilentSink()), reuse_snapshots=True)
+    seconds = timed(engine.run)
+    return {"engine.run": result(bench.bars, seconds, "bars/s", trades=len(engine.broker.trades))}
+
+
+def bench_vectorized(bench: Bench) -> dict:
+    # Same strategy on both paths; each run loads its own columns, so loading is timed on both
+    params = dict(size_fraction=0.3, leverage=5, sl_pct=0.02, tp_pct=0.04)
+    event_loop = BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol=SYMBOL, **params), symbol=SYMBOL, timeframe="1m",
+        loader=ColumnarOHLCVLoader(SYMBOL, "1m", data_path=bench.data_path),
+        indicators={"rsi": RSIIndicator(period=14)}, logger=TradeLogger(SilentSink()), reuse_snapshots=True)
+    seconds = timed(event_loop.run)
+    out = {"vectorized.event_loop": result(bench.bars, seconds, "bars/s", trades=len(event_loop.broker.trades))}
+
+    engine = VectorizedBacktestEngine(SYMBOL, "1m", loader=ColumnarOHLCVLoader(SYMBOL, "1m", data_path=bench.data_path),
+                                      **params)
+    runs = []
+
+    def run():
+        rsi = RSIIndicator(period=14).compute_batch(engine.loader.load_arrays())
+        runs.append(engine.run(*rsi_signals(rsi)))
+    seconds = timed(run)
+    out["vectorized.vectorized"] = result(bench.bars, seconds, "bars/s", trades=runs[0].trade_count)
+    # Throughput of the vectorized engine relative to the event loop (>1 is faster)
+    out["vectorized.speedup"] = {"value": out["vectorized.vectorized"]["value"] / out["vectorized.event_loop"]["value"],
+                                 "unit": "x", "n": bench.bars, "seconds": seconds}
+    return out
+
+
+def bench_indicators(bench: Bench, limit=1_000_000) -> dict:
+    snapshots = bench.snapshots(limit)
+    out = {}
+    for name, make in INDICATORS.items():
+        ind = make()
+        out[f"indicator.{name}.update"] = result(len(snapshots), timed(lambda: [ind.update(s) for s in snapshots]),
+                                                 "bars/s")
+        ind = make()
+        if ind.supports_batch:
+            out[f"indicator.{name}.batch"] = result(bench.bars, timed(lambda: ind.compute_batch(bench.columns)),
+                                                    "bars/s")
+    return out
+
+
+def bench_broker(bench: Bench, limit=200_000) -> dict:
+    closes = bench.columns["close"][:limit].tolist()
+    out = {}
+    for name, cls in BROKERS.items():
+        broker = cls(account_balance=Decimal("1000000000"))
+        trades = []
+        for i, close in enumerate(closes):
+            # Open, add, then close: every branch of record_trade gets exercised
+            side = Side.BUY if i % 3 < 2 else Side.SELL
+            qty = Decimal("0.01") if i % 3 < 2 else Decimal("0.02")
+            order = Order(asset=SYMBOL, side=side, quantity=qty, order_type=OrderType.MARKET, leverage=5)
+            # Fill prices in each ledger's own representation, as the executors hand them over
+            price = broker.quote(SYMBOL, Decimal(f"{close:.2f}"))
+            trades.append(Trade(order=order, execution_price=price, quantity=qty))
+        seconds = timed(lambda: [broker.record_trade(t) for t in trades])
+        out[f"broker.{name}.record_trade"] = result(len(trades), seconds, "trades/s")
+    # Throughput of the integer ledger relative to the Decimal one (>1 is faster)
+    fixed, decimal = out["broker.fixed.record_trade"], out["broker.decimal.record_trade"]
+    out["broker.fixed_speedup"] = {"value": fixed["value"] / decimal["value"], "unit": "x", "n": fixed["n"],
+                                   "seconds": fixed["seconds"]}
+    return out
+
+
+def bench_executor(bench: Bench, resting=10_000, limit=200_000) -> dict:
+    snapshots = bench.snapshots(limit)
+    broker = Broker(account_balance=Decimal("1000000000"), logger=TradeLogger(SilentSink()))
+    executor = MockExecutor(broker)
+    rng = np.random.default_rng(bench.seed)
+    first = snapshots[0].close
+    # Resting buys below and sells above the start, out to +-30%: most never fill
+    for i, offset in enumerate(rng.uniform(0.01, 0.3, size=resting).tolist()):
+        side = Side.BUY if i % 2 else Side.SELL
+        below, above = Decimal(f"{first * (1 - offset):.2f}"), Decimal(f"{first * (1 + offset):.2f}")
+        executor.submit_order(Order(asset=SYMBOL, side=side, quantity=Decimal("0.001"), order_type=OrderType.LIMIT,
+                                    price=below if side == Side.BUY else above, leverage=1))
+        # Breakout stops on the far side exercise the trigger index
+        executor.submit_order(Order(asset=SYMBOL, side=side, quantity=Decimal("0.001"), order_type=OrderType.STOP,
+                                    stop_price=above if side == Side.BUY else below, leverage=1))
+
+    def run():
+        for snapshot in snapshots:
+            executor.check_exit_triggers(snapshot)
+            executor.check_pending_limits(snapshot)
+
+    seconds = timed(run)
+    return {"executor.checks": result(len(snapshots), seconds, "bars/s", resting=2 * resting,
+                                      fills=len(executor.trades))}
+
+
+def bench_loader(bench: Bench) -> dict:
+    out = {}
+    out["loader.parquet_columns"] = result(
+        bench.bars, timed(lambda: ColumnarOHLCVLoader(SYMBOL, "1m", data_path=bench.data_path).load_arrays()),
+        "rows/s")
+
+    cache = BarCache(os.path.join(bench.data_path, ".bar_cache"))
+    out["loader.bar_cache_build"] = result(bench.bars, timed(lambda: cache.get(SYMBOL, "1m", bench.path)), "rows/s")
+    out["loader.bar_cache_mmap"] = result(
+        bench.bars, timed(lambda: ColumnarOHLCVLoader(SYMBOL, "1m", data_path=bench.data_path,
+                                                      cache=cache).load_arrays()), "rows/s")
+
+    def stream():
+        for _ in bench.loader.stream_snapshots(reuse=True):
+            pass
+    out["loader.stream_snapshots"] = result(bench.bars, timed(stream), "rows/s")
+    return out
+
+
+STARTUP_SCRIPT = """
+from backtest.engine import BacktestEngine
+from backtest.dataloader import CachedOHLCVLoader
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+from services.event_sink import SilentSink
+from services.trade_logger import TradeLogger
+
+engine = BacktestEngine(strategy_cls=lambda: SimpleRSIStrategy(symbol={symbol!r}), symbol={symbol!r},
+                        timeframe="1m", loader=CachedOHLCVLoader({symbol!r}, "1m", data_path={data_path!r}),
+                        indicators={{"rsi": RSIIndicator(period=14)}}, logger=TradeLogger(SilentSink()))
+engine.run()
+"""
+
+
+def bench_startup(bench: Bench, runs=3) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def python(code):
+        # Best of `runs` fresh interpreters: the first pays for cold disk caches
+        return min(timed(lambda: subprocess.run([sys.executable, "-c", code], cwd=root, check=True))
+                   for _ in range(runs))
+
+    out = {"startup.import_engine": result(1, python("import backtest.engine"), "starts/s")}
+    script = STARTUP_SCRIPT.format(symbol=SYMBOL, data_path=bench.data_path)
+    python(script)  # builds the bar cache
+    out["startup.cached_backtest"] = result(1, python(script), "starts/s", bars=bench.bars)
+    return out
+
+
+CASES = {
+    "engine": bench_engine,
+    "vectorized": bench_vectorized,
+    "indicator": bench_indicators,
+    "broker": bench_broker,
+    "executor": bench_executor,
+    "loader": bench_loader,
+    "startup": bench_startup,
+}
+
+
+def run_suite(bars=200_000, seed=0, only=None, repeat=1, data_path=None) -> dict:
+    """
+    Run the selected cases and return the JSON-ready report.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        bench = Bench(bars, seed, data_path or tmp)
+        results = {}
+        for name in only or CASES:
+            for _ in range(repeat):
+                for key, value in CASES[name](bench).items():
+                    if key not in results or value["value"] > results[key]["value"]:
+                        results[key] = value
+    return {"meta": metadata(bars, seed, repeat), "results": results}
+
+
+def metadata(bars, seed, repeat) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "bars": bars,
+        "seed": seed,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the throughput benchmark suite")
+    parser.add_argument("--bars", type=int, default=200_000, help="synthetic 1m bars (up to 10M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = run_suite(args.bars, args.seed, args.only, args.repeat)
+    for key, r in report["results"].items():
+        print(f"{key:<34} {r['value']:>16,.{2 if r['value'] < 100 else 0}f} {r['unit']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
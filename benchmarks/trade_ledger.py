@@ -0,0 +1,119 @@
+"""
+Per-order cost of submit -> trade lookup -> Broker.record_trade as the
+trade ledger grows, i.e. the work BacktestEngine.run does for every fill.
+
+If the order -> trade lookup scans the ledger, later blocks get slower;
+with the order-id index the cost per order stays flat. `--legacy` also
+times the old list-comprehension scan for comparison, `--engine` runs the
+whole BacktestEngine loop with a strategy that fills on every bar.
+
+    python -m benchmarks.trade_ledger --trades 150000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from backtest.engine import BacktestEngine
+from backtest.snapshot import MarketSnapshot
+from core.enums import OrderType, Side
+from core.models import Order
+from domain.strategy_base import Strategy
+from services.broker import Broker
+from services.event_sink import SilentSink
+from services.mock_executor import MockExecutor
+from services.trade_logger import TradeLogger
+
+
+class FlipEveryBar(Strategy):
+    """
+    Alternates a 1-unit market BUY and SELL, one fill per bar.
+    """
+    def __init__(self):
+        self.side = Side.BUY
+
+    def on_data(self, data):
+        order = Order(
+            asset=data.symbol,
+            side=self.side,
+            quantity=Decimal("1"),
+            order_type=OrderType.MARKET,
+            execution_price=Decimal(str(data.close)),
+            timestamp=data.timestamp,
+        )
+        self.side = Side.SELL if self.side == Side.BUY else Side.BUY
+        return [order]
+
+
+class TimedBars:
+    """
+    Loader stand-in that yields synthetic bars and stamps the clock every `block` bars.
+    """
+    def __init__(self, bars: int, block: int):
+        self.bars = bars
+        self.block = block
+        self.marks = []
+
+    def stream_snapshots(self):
+        start = datetime(2021, 1, 1)
+        self.marks.append(time.perf_counter())
+        for i in range(self.bars):
+            price = 100.0 + (i % 50) * 0.1
+            yield MarketSnapshot("BENCH", start + timedelta(minutes=i), price, price + 0.5, price - 0.5, price, 1.0)
+            if (i + 1) % self.block == 0:
+                self.marks.append(time.perf_counter())
+
+
+def bench_order_path(trades: int, block: int, legacy=False):
+    executor = MockExecutor()
+    broker = Broker(account_balance=Decimal("10000"))
+    executor.broker = broker
+    strategy = FlipEveryBar()
+    bars = iter(TimedBars(trades, block).stream_snapshots())
+
+    marks = [time.perf_counter()]
+    for i in range(trades):
+        (order,) = strategy.on_data(next(bars))
+        order_id = executor.submit_order(order)
+        if legacy:
+            trade = [t for t in executor.trades if t.order == executor.orders[order_id]][-1]
+        else:
+            trade = executor.get_trade(order_id)
+        broker.record_trade(trade)
+        if (i + 1) % block == 0:
+            marks.append(time.perf_counter())
+    return marks
+
+
+def bench_engine(bars: int, block: int):
+    loader = TimedBars(bars, block)
+    engine = BacktestEngine(strategy_cls=FlipEveryBar, symbol="BENCH", timeframe="1m", loader=loader,
+                            logger=TradeLogger(SilentSink()))
+    engine.run()
+    return loader.marks
+
+
+def report(title, marks, block):
+    print(f"\n{title}")
+    print(f"{'trades so far':>14} | {'µs / bar':>9}")
+    for n, (a, b) in enumerate(zip(marks, marks[1:]), start=1):
+        print(f"{n * block:>14,} | {(b - a) / block * 1e6:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trades", type=int, default=150_000)
+    parser.add_argument("--block", type=int, default=10_000)
+    parser.add_argument("--legacy", action="store_true", help="also time the old linear trade scan")
+    parser.add_argument("--engine", action="store_true", help="also time the full BacktestEngine loop")
+    args = parser.parse_args()
+
+    report("order path (indexed)", bench_order_path(args.trades, args.block), args.block)
+    if args.legacy:
+        report("order path (linear scan)", bench_order_path(args.trades, args.block, legacy=True), args.block)
+    if args.engine:
+        report("BacktestEngine.run", bench_engine(args.trades, args.block), args.block)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_EVEN
 from core.enums import OrderType, OrderStatus, Side
 from typing import Optional, List
 
-@dataclass
+@dataclass(eq=False, slots=True)
 class Order:
     """
     Represents a single instruction to the broker/exchange.
@@ -18,6 +18,11 @@ class Order:
         iceberg: If set, only this much is revealed to the market at once
         time_in_force: Future addition for GTC, IOC, FOK, etc.
         client_tag: Optional user-defined metadata
+
+    Orders compare by identity: two orders with the same fields are still
+    different instructions, and identity checks stay O(1). `timestamp` is
+    left as None unless given; executors stamp it when the order is placed
+    or filled, so constructing an order never reads the clock.
     """
     asset: str
     side: Side
@@ -30,7 +35,7 @@ class Order:
     take_profit: Optional[Decimal] = None
     iceberg: Optional[Decimal] = None
     status: OrderStatus = OrderStatus.PENDING
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: Optional[datetime] = None
     client_tag: Optional[str] = None
 
 # @dataclass
@@ -43,7 +48,7 @@ class Order:
 #     filled: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """
     Represents an executed trade that results from an order.
@@ -51,9 +56,9 @@ class Trade:
     order: Order
     execution_price: Decimal
     quantity: Decimal
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    timestamp: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     symbol: str
     quantity: Decimal
@@ -68,3 +73,69 @@ class Position:
     @property
     def notional_value(self) -> Decimal:
         return self.quantity * self.average_entry_price * self.leverage
+
+
+@dataclass(frozen=True)
+class Instrument:
+    """
+    Exchange grid for a symbol, used by fixed-point accounting.
+
+    Prices are represented as integer ticks and quantities as integer lots;
+    values snap to the nearest tick/lot, ties to even.
+    """
+    symbol: str
+    tick_size: Decimal = Decimal("0.01")
+    lot_size: Decimal = Decimal("0.0001")
+
+    def __post_init__(self):
+        object.__setattr__(self, "_inv_tick", 1 / float(self.tick_size))
+        object.__setattr__(self, "_inv_lot", 1 / float(self.lot_size))
+        # Exact grid steps as num/den, so Decimal inputs snap with integer math only
+        object.__setattr__(self, "_tick_ratio", self.tick_size.as_integer_ratio())
+        object.__setattr__(self, "_lot_ratio", self.lot_size.as_integer_ratio())
+
+    def price_to_ticks(self, price) -> int:
+        if isinstance(price, float):
+            return round(price * self._inv_tick)
+        return _to_steps(price, self._tick_ratio)
+
+    def qty_to_lots(self, quantity) -> int:
+        if isinstance(quantity, float):
+            return round(quantity * self._inv_lot)
+        return _to_steps(quantity, self._lot_ratio)
+
+    def ticks_to_price(self, ticks: int) -> Decimal:
+        return ticks * self.tick_size
+
+    def ticks_to_float(self, ticks: int) -> float:
+        num, den = self._tick_ratio
+        return ticks * num / den
+
+    def lots_to_qty(self, lots: int) -> Decimal:
+        return lots * self.lot_size
+
+
+def _to_steps(value, step) -> int:
+    """
+    `value / step` rounded half to even, for an exact value (Decimal, int or str).
+    """
+    if not isinstance(value, (Decimal, int)):
+        value = Decimal(value)
+    num, den = value.as_integer_ratio()
+    step_num, step_den = step
+    if step_num == 1 and not step_den % den:
+        # On the grid of a 1/n step (0.01, 0.0001, ...): no rounding needed
+        return num * (step_den // den)
+    return div_round(num * step_den, den * step_num)
+
+
+def div_round(num: int, den: int) -> int:
+    """
+    Integer division rounded half to even (`den` > 0).
+    """
+    q, r = divmod(num, den)
+    if r:
+        twice = 2 * r
+        if twice > den or (twice == den and q % 2):
+            q += 1
+    return q
@@ -0,0 +1,14 @@
+import re
+
+# Candle lengths for "<n><unit>" timeframes, shared by the downloader, resampler and live feed
+UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    Length of any `<n><unit>` timeframe (m, h, d, w), e.g. "7m" or "3h".
+    """
+    match = re.fullmatch(r"(\d+)([mhdw])", timeframe)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)) * UNIT_MS[match.group(2)]
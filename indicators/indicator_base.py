@@ -16,3 +16,27 @@ class Indicator(ABC):
         Should return a tuple: (timestamps, values)
         """
         return None
+
+    def compute_batch(self, arrays: dict):
+        """
+        Optional: compute the whole series in one vectorized pass.
+
+        `arrays` holds NumPy columns as returned by a columnar loader
+        (`timestamp` in epoch ms plus `open`/`high`/`low`/`close`/`volume`).
+        Return an array aligned with the bars, NaN where the indicator is not
+        ready yet. Implementations should leave the indicator in the same
+        state as streaming every bar through `update()` would.
+        """
+        raise NotImplementedError
+
+    @property
+    def lookback(self) -> int:
+        """
+        Closed bars to stream through `update()` before `get()` is reliable.
+        Live engines fetch this much history on startup.
+        """
+        return 0
+
+    @property
+    def supports_batch(self) -> bool:
+        return type(self).compute_batch is not Indicator.compute_batch
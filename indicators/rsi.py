@@ -2,33 +2,175 @@
 from indicators.indicator_base import Indicator
 from collections import deque
 
+WILDER = "wilder"  # RMA smoothing, the standard RSI
+CUTLER = "cutler"  # SMA over the last `period` deltas
+
+
 class RSIIndicator(Indicator):
-    def __init__(self, period=14):
+    """
+    Incremental RSI, O(1) per bar.
+
+    Keeps running average gain/loss instead of re-deriving the deltas from
+    the close window on every update. `mode` selects Wilder (RMA) or
+    Cutler (SMA) smoothing; both are seeded with the SMA of the first
+    `period` deltas.
+    """
+    resum_interval = 4096  # Cutler: rebuild running sums to shed float drift
+
+    def __init__(self, period=14, mode=WILDER):
+        if mode not in (WILDER, CUTLER):
+            raise ValueError(f"Unknown RSI mode: {mode}")
         self.period = period
-        self.closes = deque(maxlen=period + 1)
+        self.mode = mode
+        self.prev_close = None
+        self.gains = deque(maxlen=period)
+        self.losses = deque(maxlen=period)
+        self.sum_gain = 0.0
+        self.sum_loss = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+        self._since_resum = 0
         self.timestamps = []
         self.values = []
         self.rsi = None
 
     def update(self, snapshot):
-        self.closes.append(float(snapshot.close))
-        if len(self.closes) < self.period + 1:
+        close = float(snapshot.close)
+        prev = self.prev_close
+        self.prev_close = close
+        if prev is None:
             return
 
-        deltas = [self.closes[i+1] - self.closes[i] for i in range(len(self.closes) - 1)]
-        gains = [max(d, 0) for d in deltas[-self.period:]]
-        losses = [max(-d, 0) for d in deltas[-self.period:]]
+        delta = close - prev
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
 
-        avg_gain = sum(gains) / self.period
-        avg_loss = sum(losses) / self.period or 1e-10
+        if self.avg_gain is not None and self.mode == WILDER:
+            p = self.period
+            self.avg_gain = (self.avg_gain * (p - 1) + gain) / p
+            self.avg_loss = (self.avg_loss * (p - 1) + loss) / p
+        else:
+            self._push_window(gain, loss)
+            if len(self.gains) < self.period:
+                return
+            self.avg_gain = self.sum_gain / self.period
+            self.avg_loss = self.sum_loss / self.period
 
-        rs = avg_gain / avg_loss
+        rs = self.avg_gain / (self.avg_loss or 1e-10)
         self.rsi = 100 - (100 / (1 + rs))
         self.timestamps.append(snapshot.timestamp)
         self.values.append(self.rsi)
 
+    def _push_window(self, gain, loss):
+        if len(self.gains) == self.period:
+            self.sum_gain -= self.gains[0]
+            self.sum_loss -= self.losses[0]
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.sum_gain += gain
+        self.sum_loss += loss
+
+        self._since_resum += 1
+        if self._since_resum >= self.resum_interval:
+            self._since_resum = 0
+            self.sum_gain = sum(self.gains)
+            self.sum_loss = sum(self.losses)
+        else:
+            # Subtracting can leave a tiny negative residue on a flat window
+            self.sum_gain = max(self.sum_gain, 0.0)
+            self.sum_loss = max(self.sum_loss, 0.0)
+
+    def compute_batch(self, arrays: dict):
+        import numpy as np
+
+        closes = np.asarray(arrays["close"], dtype="float64")
+        if len(arrays["timestamp"]) != len(closes):
+            raise ValueError(f"timestamp and close columns differ in length: "
+                             f"{len(arrays['timestamp'])} != {len(closes)}")
+        p = self.period
+        out = np.full(len(closes), np.nan)
+        if len(closes) <= p:
+            for ts, close in zip(arrays["timestamp"].astype("datetime64[ms]").tolist(), closes.tolist()):
+                self.update(_Bar(ts, close))
+            return out
+
+        delta = np.diff(closes)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+
+        if self.mode == CUTLER:
+            avg_gain = _rolling_mean(gains, p)
+            avg_loss = _rolling_mean(losses, p)
+        else:
+            avg_gain = _rma(gains, p)
+            avg_loss = _rma(losses, p)
+
+        rs = avg_gain / np.where(avg_loss == 0, 1e-10, avg_loss)
+        out[p:] = 100 - 100 / (1 + rs)
+
+        # Leave the streaming state where update() would have left it
+        self.prev_close = float(closes[-1])
+        self.gains = deque(gains[-p:].tolist(), maxlen=p)
+        self.losses = deque(losses[-p:].tolist(), maxlen=p)
+        self.sum_gain = float(sum(self.gains))
+        self.sum_loss = float(sum(self.losses))
+        self.avg_gain = float(avg_gain[-1])
+        self.avg_loss = float(avg_loss[-1])
+        self.rsi = float(out[-1])
+        self.timestamps = arrays["timestamp"][p:].astype("datetime64[ms]").tolist()
+        self.values = out[p:].tolist()
+        return out
+
+    @property
+    def lookback(self) -> int:
+        # Cutler is exact after one full window; Wilder's RMA remembers every
+        # bar, so give the seed ten periods to decay ((13/14)^140 ~ 3e-5)
+        if self.mode == CUTLER:
+            return self.period + 1
+        return 10 * self.period + 1
+
     def get(self):
         return self.rsi
-    
+
     def get_series(self):
         return self.timestamps, self.values
+
+
+class _Bar:
+    __slots__ = ("timestamp", "close")
+
+    def __init__(self, timestamp, close):
+        self.timestamp = timestamp
+        self.close = close
+
+
+def _rolling_mean(values, period):
+    import numpy as np
+
+    return np.lib.stride_tricks.sliding_window_view(values, period).mean(axis=1)
+
+
+def _rma(values, period):
+    import numpy as np
+
+    # Wilder smoothing seeded with the SMA of the first `period` values:
+    # y[i] = y[i-1] + (x[i] - y[i-1]) / period. The recursion is solved in
+    # closed form one block at a time; blocks are short enough that the
+    # decay factors stay well inside float64 range.
+    seeded = values[period - 1:].astype("float64")
+    seeded[0] = values[:period].mean()
+    decay = 1 - 1 / period
+    if decay == 0:
+        return seeded
+    block = max(1, int(12 / -np.log10(decay)))
+    powers = decay ** np.arange(block + 1)
+    out = np.empty_like(seeded)
+    out[0] = carry = seeded[0]
+    for lo in range(1, len(seeded), block):
+        x = seeded[lo:lo + block]
+        k = len(x)
+        # y[j] = decay^(j+1) * carry + (1 - decay) * sum_i decay^(j-i) * x[i]
+        acc = np.cumsum(x / powers[1:k + 1]) * powers[1:k + 1]
+        out[lo:lo + k] = powers[1:k + 1] * carry + (1 - decay) * acc
+        carry = out[lo + k - 1]
+    return out
@@ -1,6 +1,5 @@
 # live/data_feed.py
 
-import ccxt
 from datetime import datetime
 from decimal import Decimal
 from backtest.snapshot import MarketSnapshot
@@ -8,6 +7,8 @@ from backtest.snapshot import MarketSnapshot
 
 class BinanceDataFeed:
     def __init__(self, symbol="BTC/USDT", timeframe="1m"):
+        import ccxt
+
         self.exchange = ccxt.binance()
         self.symbol = symbol
         self.timeframe = timeframe
@@ -1,17 +1,64 @@
 # live/engine.py
 
+import asyncio
+import time
+from collections import Counter, defaultdict, deque
 from services.broker import Broker
 from services.trade_logger import TradeLogger
-from core.models import Order
+from services.event_sink import DEBUG, WARNING
+from core.models import Order, Trade
 from backtest.enriched_snapshot import EnrichedSnapshot
 from typing import Type
 from domain.strategy_base import Strategy
-from live.data_feed import BinanceDataFeed
+from live.ws_feed import BinanceKlineStream
+from live.warmup import load_history, required_history, warm_up
+from backtest.profiler import make_profiler
 
 
 class LiveEngine:
-    def __init__(self, strategy_cls, executor, indicators=None, symbol="BTC/USDT", timeframe="1m", poll_interval=60):
+    """
+    Runs a strategy against a live feed as a set of asyncio tasks joined by
+    queues:
+
+        ingest -> snapshots -> evaluate -> orders -> submit (xN) -> fills -> reconcile
+
+    Candles are pushed by `BinanceKlineStream` by default; a feed exposing
+    only `get_snapshot()` (the REST `BinanceDataFeed`) is polled every
+    `poll_interval` seconds in a worker thread, and ingestion never waits
+    on order I/O. Blocking executors have `submit_order` run in threads.
+
+    Trades are applied to the broker only by the reconcile task: order
+    results, simulated SL/TP fills of executors with an `on_trade` hook
+    and fills of resting orders reported by an optional `OrderReconciler`.
+    A candle's orders are split per symbol; each symbol's list is sent in
+    order by one of `order_workers` submitters, different symbols in
+    parallel, and one symbol's lists never overlap.
+
+    Order I/O only holds back what position state requires: while a
+    candle's orders are unbooked, later candles of the symbols they touch
+    wait (in arrival order) and run once the fills are booked, so the
+    strategy never acts on a stale position. Candles of other symbols are
+    evaluated at once. A call exceeding `order_timeout` frees its
+    submitter: the rest of that list is dropped, and the late result is
+    still booked when the exchange answers, which releases the symbol.
+    `latencies` keeps the recent tick-to-queue and queue-to-ack times per
+    order.
+
+    Before the first tick the indicators are warmed up with the last
+    `warmup_bars` closed candles (default: the largest indicator
+    `lookback`), read from the parquet archive under `archive` when given
+    and fetched from the exchange for the rest. `warmup=False` skips it.
+
+    `profile` (True, a sampling interval or a `StageProfiler`) times the
+    stages of sampled candles and order calls; the summary is logged when
+    the engine shuts down.
+    """
+
+    def __init__(self, strategy_cls, executor, indicators=None, symbol="BTC/USDT", timeframe="1m", poll_interval=60,
+                 feed=None, order_workers=4, order_timeout=10.0, reconciler=None, warmup=True, warmup_bars=None,
+                 archive=None, profile=None):
         self.symbol = symbol
+        self.timeframe = timeframe
         self.indicators = indicators or {}
         self.strategy = strategy_cls()
         self.executor = executor
@@ -19,36 +66,314 @@ class LiveEngine:
         self.strategy.broker = self.broker
         self.logger = self.broker.logger or TradeLogger()
         self.poll_interval = poll_interval
-        self.feed = BinanceDataFeed(symbol=symbol, timeframe=timeframe)
+        self.feed = feed if feed is not None else BinanceKlineStream(symbol=symbol, timeframe=timeframe,
+                                                                     logger=self.logger)
+        self.order_workers = order_workers
+        self.order_timeout = order_timeout
+        self.latencies = deque(maxlen=1000)  # (tick_to_queue_s, queue_to_ack_s) per order
+        self.reconciler = reconciler
+        if reconciler is not None and hasattr(executor, "reconciler"):
+            executor.reconciler = reconciler
+        self.warmup = warmup
+        self.warmup_bars = warmup_bars
+        self.archive = archive
+        self.profiler = make_profiler(profile, root="live")
+        self._ticks = 0
+        self._stopped = False
+        self._held = {}  # symbol -> candles waiting for its orders to be booked
+        self._holds = Counter()  # symbol -> candles with unbooked orders on it
+        self._symbol_locks = defaultdict(asyncio.Lock)
+        self._late = set()  # timed-out calls still running
 
     def run(self):
-        import time
-        print(f"🚀 Live engine started for {self.symbol}")
-        
+        asyncio.run(self.run_async())
+
+    def stop(self):
+        self._stopped = True
+        if hasattr(self.feed, "stop"):
+            self.feed.stop()
+
+    async def run_async(self):
+        self.logger.log_event("engine_started", symbol=self.symbol)
+        if self.warmup:
+            await self.warm_up()
+        snapshots, orders, fills = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
+        self._held, self._holds, self._symbol_locks, self._late = {}, Counter(), defaultdict(asyncio.Lock), set()
+        workers = [
+            asyncio.create_task(self._evaluate(snapshots, orders, fills)),
+            asyncio.create_task(self._reconcile(fills, snapshots)),
+            *(asyncio.create_task(self._submit(orders, fills)) for _ in range(self.order_workers)),
+        ]
+        hooks = []
+        if hasattr(self.executor, "on_trade"):
+            # Simulated SL/TP and stop fills are booked by the reconcile task too
+            hooks.append((self.executor, self.executor.on_trade))
+            self.executor.on_trade = fills.put_nowait
+        if self.reconciler is not None:
+            # Fills of resting orders join the same queue, so the broker keeps a single writer
+            hooks.append((self.reconciler, self.reconciler.on_trade))
+            self.reconciler.on_trade = fills.put_nowait
+            workers.append(asyncio.create_task(self.reconciler.run()))
+        try:
+            await self._ingest(snapshots)
+            # Feed finished: let in-flight work, including late order results, drain before shutting down
+            await snapshots.join()
+            await orders.join()
+            while self._late:
+                await asyncio.gather(*self._late, return_exceptions=True)
+            await fills.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for owner, hook in hooks:
+                owner.on_trade = hook
+            if self.profiler is not None:
+                self.logger.log_profile(self.profiler)
+            self.logger.flush()
+
+    async def warm_up(self) -> int:
+        """
+        Feed recent history through the indicators. Returns the number of
+        candles used.
+        """
+        bars = self.warmup_bars or required_history(self.indicators.values())
+        if not bars:
+            return 0
+        started = time.perf_counter()
+        try:
+            rows = await load_history(self.symbol, self.timeframe, bars, fetch=self._history_fetcher(),
+                                      data_path=self.archive)
+        except Exception as e:
+            self.logger.log_event("warmup_failed", WARNING, symbol=self.symbol, error=repr(e))
+            return 0
+        last_open_ms = warm_up(self.indicators.values(), self.symbol, rows)
+        # The stream resumes after the warm-up candles, backfilling any gap itself
+        if last_open_ms is not None and hasattr(self.feed, "last_open_ms"):
+            self.feed.last_open_ms = max(self.feed.last_open_ms or 0, last_open_ms)
+        self.logger.log_event("warmup_done", symbol=self.symbol, candles=len(rows), required=bars,
+                              elapsed_ms=round((time.perf_counter() - started) * 1000, 3))
+        return len(rows)
+
+    def _history_fetcher(self):
+        if hasattr(self.feed, "backfill"):
+            return self.feed.backfill
+        exchange = getattr(self.feed, "exchange", None)
+        if exchange is None:
+            return None
+
+        async def fetch(symbol, timeframe, since_ms):
+            return await asyncio.to_thread(exchange.fetch_ohlcv, symbol, timeframe=timeframe, since=since_ms)
+        return fetch
+
+    async def _ingest(self, snapshots):
+        if hasattr(self.feed, "snapshots"):
+            async for snapshot in self.feed.snapshots():
+                snapshots.put_nowait((snapshot, time.perf_counter()))
+                if self._stopped:
+                    return
+            return
+
+        while not self._stopped:
+            snapshot = await asyncio.to_thread(self.feed.get_snapshot)
+            snapshots.put_nowait((snapshot, time.perf_counter()))
+            await asyncio.sleep(self.poll_interval)
+
+    async def _evaluate(self, snapshots, orders, fills):
         while True:
-            snapshot = self.feed.get_snapshot()
+            item, received = await snapshots.get()
+            if isinstance(item, _Release):
+                # A candle's orders are booked: run what waited on the symbol, in order, until it is held again
+                symbol = item.symbol
+                self._holds[symbol] -= 1
+                held = self._held[symbol]
+                while held and not self._holds[symbol]:
+                    snapshot, received = held.popleft()
+                    await self._run_candle(snapshot, received, orders, fills)
+                    snapshots.task_done()
+                if not held and not self._holds[symbol]:
+                    del self._held[symbol], self._holds[symbol]
+                snapshots.task_done()
+            elif item.symbol in self._held:
+                # Its task_done comes when the candle runs, so draining waits for it
+                self._held[item.symbol].append((item, received))
+            else:
+                await self._run_candle(item, received, orders, fills)
+                snapshots.task_done()
+
+    async def _run_candle(self, snapshot, received, orders, fills):
+        try:
+            batch = await self.on_snapshot(snapshot, fills)
+            if not batch:
+                return
+            queued = time.perf_counter()
+            groups = _by_symbol(batch)
+            ticket = _Ticket({snapshot.symbol, *(group[0].asset for group in groups)}, len(groups))
+            for symbol in ticket.symbols:
+                # Later candles of these symbols wait until the orders are booked
+                self._holds[symbol] += 1
+                self._held.setdefault(symbol, deque())
+            for group in groups:
+                orders.put_nowait((group, received, queued, ticket))
+        except Exception as e:
+            self.logger.log_event("strategy_error", WARNING, symbol=self.symbol, error=repr(e))
 
-            for ind in self.indicators.values():
-                ind.update(snapshot)
+    async def on_snapshot(self, snapshot, fills):
+        """
+        Update indicators, fire simulated exits and return the strategy's
+        orders for this candle, stamped with its close and time. Exit fills
+        go through `fills` and are booked before the strategy runs.
+        """
+        profiler = self.profiler
+        t = started = profiler.start_bar(self._ticks) if profiler is not None else None
+        self._ticks += 1
+        for ind in self.indicators.values():
+            ind.update(snapshot)
+        if t is not None:
+            t = profiler.lap("indicators", t)
 
-            enriched = EnrichedSnapshot(
-                snapshot,
-                {name: ind.get() for name, ind in self.indicators.items()}
-            )
+        enriched = EnrichedSnapshot(
+            snapshot,
+            {name: ind.get() for name, ind in self.indicators.items()}
+        )
+        if t is not None:
+            t = profiler.lap("snapshot", t)
 
-            self.executor.check_exit_triggers(snapshot)
+        self.executor.check_exit_triggers(snapshot)
+        await fills.join()
+        if t is not None:
+            t = profiler.lap("exit_triggers", t)
 
-            print(f"📡 Tick @ {snapshot.timestamp} | Price: {snapshot.close} | RSI: {self.indicators['rsi'].get()}")
+        self.logger.log_event("tick", DEBUG, timestamp=snapshot.timestamp, symbol=self.symbol,
+                              price=snapshot.close, rsi=self.indicators["rsi"].get() if "rsi" in self.indicators else None)
+        if t is not None:
+            t = profiler.lap("tick_log", t)
 
-            orders = self.strategy.on_data(enriched)
-            for order in orders:
-                order.execution_price = snapshot.close
-                order.timestamp = snapshot.timestamp
+        orders = self.strategy.on_data(enriched)
+        for order in orders:
+            order.execution_price = snapshot.close
+            order.timestamp = snapshot.timestamp
+        if t is not None:
+            profiler.lap("strategy", t)
+            profiler.end_bar(started)
+        return orders
+
+    async def _submit(self, orders, fills):
+        while True:
+            batch, received, queued, ticket = await orders.get()
+            late = None
+            try:
+                # One candle's orders for a symbol go out in order, so a flip's close is booked before its re-entry
+                async with self._symbol_locks[batch[0].asset]:
+                    for i, order in enumerate(batch):
+                        late = await self._submit_one(order, received, queued, fills)
+                        if late is not None:
+                            if batch[i + 1:]:
+                                self.logger.log_event("orders_dropped", WARNING, symbol=order.asset,
+                                                      count=len(batch) - i - 1, reason="order_timeout")
+                            break
+            finally:
+                if late is None:
+                    fills.put_nowait(ticket)
+                else:
+                    # The symbol is released once the late result is booked
+                    late.add_done_callback(lambda _: fills.put_nowait(ticket))
+                orders.task_done()
 
-                trade = self.executor.submit_order(order)
+    async def _submit_one(self, order, received, queued, fills):
+        """
+        Send one order and queue its result for booking. Returns the still
+        running call when it exceeded `order_timeout`, else None.
+        """
+        try:
+            # Wall time of the call, including waiting for a worker thread
+            t = time.perf_counter_ns() if self.profiler is not None and self.profiler.sample("submit") else None
+            if getattr(self.executor, "blocking", True):
+                call = asyncio.ensure_future(asyncio.to_thread(self.executor.submit_order, order))
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(call), timeout=self.order_timeout)
+                except asyncio.TimeoutError:
+                    self.logger.log_event("order_timeout", WARNING, symbol=order.asset, side=order.side.name,
+                                          quantity=order.quantity, timeout_s=self.order_timeout)
+                    # The thread cannot be cancelled and the exchange may still fill it: book the late result
+                    self._late.add(call)
+                    call.add_done_callback(lambda done: self._book_late(done, order, fills))
+                    return call
+            else:
+                result = self.executor.submit_order(order)
+            acked = time.perf_counter()
+            if t is not None:
+                self.profiler.add("submit", time.perf_counter_ns() - t)
+            self.latencies.append((queued - received, acked - queued))
+            self.logger.log_event("order_latency", DEBUG, symbol=order.asset,
+                                  tick_to_queue_ms=round((queued - received) * 1000, 3),
+                                  queue_to_ack_ms=round((acked - queued) * 1000, 3))
+            fills.put_nowait(result)
+        except Exception as e:
+            self.logger.log_event("order_failed", WARNING, symbol=order.asset, error=repr(e))
+        return None
 
-                if trade:
+    def _book_late(self, call, order, fills):
+        self._late.discard(call)
+        if call.cancelled():
+            return
+        if call.exception() is not None:
+            self.logger.log_event("order_failed", WARNING, symbol=order.asset, error=repr(call.exception()))
+            return
+        self.logger.log_event("order_late_result", WARNING, symbol=order.asset, side=order.side.name)
+        fills.put_nowait(call.result())
+
+    async def _reconcile(self, fills, snapshots):
+        while True:
+            result = await fills.get()
+            try:
+                if isinstance(result, _Ticket):
+                    result.pending -= 1
+                    if not result.pending:
+                        # Every list of that candle is booked: its symbols may be evaluated again
+                        for symbol in result.symbols:
+                            snapshots.put_nowait((_Release(symbol), None))
+                    continue
+                # Live executors return the Trade, MockExecutor the order id
+                trade = result
+                if isinstance(result, str) and hasattr(self.executor, "get_trade"):
+                    trade = self.executor.get_trade(result)
+                if isinstance(trade, Trade):
+                    profiler = self.profiler
+                    t = time.perf_counter_ns() if profiler is not None and profiler.sample("broker") else None
                     self.broker.record_trade(trade)
+                    if t is not None:
+                        t = profiler.lap("broker", t)
                     self.logger.log_trade(trade, self.broker)
+                    if t is not None:
+                        profiler.lap("logging", t)
+            finally:
+                fills.task_done()
+
+
+class _Ticket:
+    """
+    The order lists one candle sent; booked when `pending` reaches 0.
+    """
+    __slots__ = ("symbols", "pending")
+
+    def __init__(self, symbols, pending):
+        self.symbols = symbols
+        self.pending = pending
+
+
+class _Release:
+    __slots__ = ("symbol",)
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
 
-            time.sleep(self.poll_interval)
+def _by_symbol(orders) -> list:
+    """
+    Split one candle's orders into per-symbol lists, keeping their order.
+    """
+    groups = {}
+    for order in orders:
+        groups.setdefault(order.asset, []).append(order)
+    return list(groups.values())
@@ -0,0 +1,118 @@
+# live/replay_server.py
+"""
+Local websocket stand-in for an exchange market-data stream.
+
+Serves recorded frames (one raw JSON message per line) to any stream path
+so feeds can be tested offline. Record real frames with `record_frames`,
+then replay them:
+
+    python -m live.replay_server frames.jsonl --port 8765
+"""
+import argparse
+import asyncio
+import json
+
+
+def load_frames(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+async def record_frames(url: str, path, limit: int):
+    """
+    Append the next `limit` messages from a live stream to `path`.
+    """
+    from websockets.asyncio.client import connect
+
+    async with connect(url) as ws:
+        with open(path, "a", encoding="utf-8") as f:
+            for _ in range(limit):
+                f.write(await ws.recv() + "\n")
+
+
+class ReplayServer:
+    """
+    Replays frames in order across connections.
+
+    `disconnect_after=n` drops each connection after n frames, and
+    `skip_on_reconnect=k` discards k frames while the client is away, so
+    a feed's reconnect and gap-backfill path can be exercised. Once every
+    frame is sent the connection stays open and idle.
+    """
+
+    def __init__(self, frames, host="127.0.0.1", port=0, interval=0.0, disconnect_after=None,
+                 skip_on_reconnect=0):
+        self.frames = [f if isinstance(f, str) else json.dumps(f) for f in frames]
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.disconnect_after = disconnect_after
+        self.skip_on_reconnect = skip_on_reconnect
+        self.position = 0
+        self.connections = 0
+        self.paths = []
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        from websockets.asyncio.server import serve
+
+        self._server = await serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, ws):
+        self.connections += 1
+        self.paths.append(ws.request.path)
+        if self.connections > 1:
+            self.position = min(self.position + self.skip_on_reconnect, len(self.frames))
+
+        sent = 0
+        while self.position < len(self.frames):
+            if self.disconnect_after is not None and sent >= self.disconnect_after:
+                await ws.close()
+                return
+            await ws.send(self.frames[self.position])
+            self.position += 1
+            sent += 1
+            if self.interval:
+                await asyncio.sleep(self.interval)
+        await ws.wait_closed()
+
+
+async def _serve(args):
+    server = ReplayServer(load_frames(args.frames), host=args.host, port=args.port, interval=args.interval)
+    async with server:
+        print(f"Replaying {len(server.frames)} frames on {server.url}")
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded websocket frames locally")
+    parser.add_argument("frames", help="JSONL file, one raw message per line")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between frames")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# live/warmup.py
+"""
+Indicator warm-up for live runs: load the most recent closed candles from
+the local parquet archive and/or the exchange, and stream them through the
+indicators before the first live tick.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from backtest.snapshot import MarketSnapshot
+from core.timeframes import timeframe_to_ms
+
+
+def required_history(indicators) -> int:
+    """
+    Bars of history needed so every indicator is ready on the first tick.
+    """
+    return max((ind.lookback for ind in indicators), default=0)
+
+
+def archive_candles(symbol: str, timeframe: str, bars: int, data_path=None, now_ms=None) -> list:
+    """
+    The last `bars` closed candles before now from the local archive, as
+    `[open_ms, o, h, l, c, v]` rows. Empty if there is no archive or it
+    stops before that window.
+    """
+    from backtest.dataloader import ColumnarOHLCVLoader
+
+    interval = timeframe_to_ms(timeframe)
+    end = _forming_open(interval, now_ms)
+    start = datetime.utcfromtimestamp((end - bars * interval) / 1000)
+    loader = ColumnarOHLCVLoader(symbol.replace("/", ""), timeframe, start=start.strftime("%Y-%m-%d %H:%M"),
+                                 data_path=data_path)
+    if loader.partitions is None and not os.path.exists(loader.path):
+        return []
+    arrays = loader.load_arrays()
+    columns = [arrays[name] for name in ("timestamp", "open", "high", "low", "close", "volume")]
+    rows = [[int(row[0]), *row[1:]] for row in zip(*(col.tolist() for col in columns)) if row[0] < end]
+    return rows[-bars:]
+
+
+async def fetch_candles(fetch, symbol: str, timeframe: str, since_ms: int, now_ms=None) -> list:
+    """
+    Closed candles from `since_ms` up to now, paging through
+    `fetch(symbol, timeframe, since_ms)` (an async callable returning
+    ccxt-style rows, e.g. a feed's `backfill`).
+    """
+    interval = timeframe_to_ms(timeframe)
+    end = _forming_open(interval, now_ms)
+    rows = []
+    since = since_ms
+    while since < end:
+        batch = [row for row in await fetch(symbol, timeframe, since) or () if since <= row[0] < end]
+        if not batch:
+            break
+        rows.extend(batch)
+        since = int(batch[-1][0]) + interval
+    return rows
+
+
+async def load_history(symbol: str, timeframe: str, bars: int, fetch=None, data_path=None, now_ms=None) -> list:
+    """
+    The last `bars` closed candles: what the archive has, topped up from
+    the exchange for anything after it (or all of it without an archive).
+    """
+    interval = timeframe_to_ms(timeframe)
+    end = _forming_open(interval, now_ms)
+    rows = []
+    if data_path is not None:
+        rows = await asyncio.to_thread(archive_candles, symbol, timeframe, bars, data_path, now_ms)
+    since = int(rows[-1][0]) + interval if rows else end - bars * interval
+    if fetch is not None and since < end:
+        rows += await fetch_candles(fetch, symbol, timeframe, since, now_ms)
+    return rows[-bars:]
+
+
+def warm_up(indicators, symbol: str, rows) -> int:
+    """
+    Stream `rows` through every indicator's `update()`. Returns the open
+    time (ms) of the last candle, or None when there was nothing to feed.
+    """
+    last = None
+    for row in rows:
+        snapshot = candle_snapshot(symbol, row)
+        for ind in indicators:
+            ind.update(snapshot)
+        last = int(row[0])
+    return last
+
+
+def candle_snapshot(symbol: str, row) -> MarketSnapshot:
+    open_ms, o, h, l, c, v = row[:6]
+    return MarketSnapshot(
+        symbol=symbol,
+        timestamp=datetime.utcfromtimestamp(int(open_ms) / 1000),
+        open=Decimal(str(o)),
+        high=Decimal(str(h)),
+        low=Decimal(str(l)),
+        close=Decimal(str(c)),
+        volume=Decimal(str(v))
+    )
+
+
+def _forming_open(interval: int, now_ms=None) -> int:
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    return now_ms // interval * interval
@@ -0,0 +1,205 @@
+# live/ws_feed.py
+import asyncio
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from backtest.snapshot import MarketSnapshot
+from core.timeframes import timeframe_to_ms
+from services.event_sink import INFO, WARNING
+
+BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
+
+
+class CandleAggregator:
+    """
+    Builds closed candles from individual trades. A candle is emitted when
+    the first trade of a later interval arrives, since only then is it
+    known to be complete. The interval of the very first trade seen was
+    joined midway, so that candle is dropped rather than emitted partial.
+    """
+
+    def __init__(self, interval_ms: int):
+        self.interval_ms = interval_ms
+        self.current = None  # [open_ms, o, h, l, c, v]
+        self.partial_open_ms = None
+
+    def add(self, ts_ms: int, price: Decimal, qty: Decimal):
+        open_ms = ts_ms - ts_ms % self.interval_ms
+        bar = self.current
+        if bar is None:
+            self.partial_open_ms = open_ms
+        elif open_ms == bar[0]:
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += qty
+            return None
+        elif open_ms < bar[0]:
+            return None  # late trade for an interval already closed
+        self.current = [open_ms, price, price, price, price, qty]
+        if bar is None or bar[0] == self.partial_open_ms:
+            return None
+        return bar
+
+
+class BinanceKlineStream:
+    """
+    Push-based candle feed over the Binance websocket API.
+
+    `snapshots()` is an async iterator yielding one `MarketSnapshot` per
+    *closed* candle, from either the kline stream (`stream="kline"`, using
+    the payload's `x` flag) or the raw trade stream aggregated locally
+    (`stream="trade"`). After a disconnect it reconnects with exponential
+    backoff and backfills the candles missed while down through
+    `backfill(symbol, timeframe, since_ms)`, by default ccxt's REST
+    `fetch_ohlcv` run in a worker thread. A streamed candle that skips
+    intervals triggers the same backfill first. Backfill pages forward from
+    the last candle seen until it reaches the streamed candle (or the
+    still-forming one), so outages longer than one REST page are filled
+    completely. Candles are deduplicated by open time, so overlap between
+    backfill and the stream is harmless.
+    """
+
+    def __init__(self, symbol="BTC/USDT", timeframe="1m", url=BINANCE_WS_URL, stream="kline", backfill=None,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0, logger=None):
+        if stream not in ("kline", "trade"):
+            raise ValueError(f"Unknown stream type: {stream}")
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.interval_ms = timeframe_to_ms(timeframe)
+        self.stream = stream
+        self.url = url
+        self.backfill = backfill if backfill is not None else self._fetch_ohlcv
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.logger = logger
+        self.last_open_ms = None
+        self.reconnects = 0
+        self._exchange = None
+        self._stopped = False
+        self._ws = None
+        self._loop = None
+
+    @property
+    def stream_url(self) -> str:
+        name = self.symbol.replace("/", "").lower()
+        suffix = f"@kline_{self.timeframe}" if self.stream == "kline" else "@trade"
+        return f"{self.url.rstrip('/')}/{name}{suffix}"
+
+    def stop(self):
+        """
+        End `snapshots()`; an idle connection is closed so the iterator
+        returns without waiting for another message. Thread-safe.
+        """
+        self._stopped = True
+        ws, loop = self._ws, self._loop
+        if ws is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: asyncio.ensure_future(ws.close()))
+
+    async def snapshots(self):
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import ConnectionClosed
+
+        self._loop = asyncio.get_running_loop()
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                async with connect(self.stream_url) as ws:
+                    self._ws = ws
+                    if self.last_open_ms is not None:
+                        for snapshot in await self._backfill():
+                            yield snapshot
+                    delay = self.reconnect_delay
+                    aggregator = CandleAggregator(self.interval_ms)
+                    async for message in ws:
+                        for row in self._parse(message, aggregator):
+                            if self.last_open_ms is not None and row[0] > self.last_open_ms + self.interval_ms:
+                                for snapshot in await self._backfill(until_ms=int(row[0])):
+                                    yield snapshot
+                            snapshot = self._accept(*row)
+                            if snapshot is not None:
+                                yield snapshot
+                        if self._stopped:
+                            return
+            except (ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+                self._log("feed_disconnected", WARNING, error=str(e))
+            finally:
+                self._ws = None
+            if self._stopped:
+                return
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _parse(self, message, aggregator):
+        payload = json.loads(message)
+        data = payload.get("data", payload)  # combined streams wrap the event
+        event = data.get("e")
+        if event == "kline":
+            k = data["k"]
+            if k["x"]:
+                yield int(k["t"]), k["o"], k["h"], k["l"], k["c"], k["v"]
+        elif event == "trade":
+            bar = aggregator.add(data["T"], Decimal(data["p"]), Decimal(data["q"]))
+            if bar is not None:
+                yield tuple(bar)
+
+    async def _backfill(self, until_ms=None):
+        """
+        Closed candles after the last one seen and before `until_ms` (the
+        first streamed candle; default: the one still forming), one REST
+        page at a time.
+        """
+        since = first = self.last_open_ms + self.interval_ms
+        snapshots = []
+        pages = 0
+        while True:
+            rows = await self.backfill(self.symbol, self.timeframe, since)
+            pages += 1
+            # Only candles that have fully closed; the stream delivers the rest
+            now_ms = int(time.time() * 1000)
+            end = now_ms if until_ms is None else min(until_ms, now_ms + self.interval_ms)
+            done = not rows
+            for row in sorted(rows or (), key=lambda r: r[0]):
+                if row[0] >= end or row[0] + self.interval_ms > now_ms:
+                    done = True
+                    break
+                snapshot = self._accept(*row[:6])
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+            next_since = self.last_open_ms + self.interval_ms
+            # A page that moved nothing forward would repeat forever
+            if done or next_since <= since or next_since >= end:
+                break
+            since = next_since
+        if snapshots:
+            self._log("feed_backfilled", INFO, candles=len(snapshots), since=first, pages=pages)
+        return snapshots
+
+    def _accept(self, open_ms, o, h, l, c, v):
+        open_ms = int(open_ms)
+        if self.last_open_ms is not None and open_ms <= self.last_open_ms:
+            return None
+        self.last_open_ms = open_ms
+        return MarketSnapshot(
+            symbol=self.symbol,
+            timestamp=datetime.utcfromtimestamp(open_ms / 1000),
+            open=Decimal(str(o)),
+            high=Decimal(str(h)),
+            low=Decimal(str(l)),
+            close=Decimal(str(c)),
+            volume=Decimal(str(v))
+        )
+
+    async def _fetch_ohlcv(self, symbol, timeframe, since_ms):
+        if self._exchange is None:
+            import ccxt
+
+            self._exchange = ccxt.binance({"enableRateLimit": True})
+        return await asyncio.to_thread(self._exchange.fetch_ohlcv, symbol, timeframe=timeframe, since=since_ms)
+
+    def _log(self, event, level, **fields):
+        if self.logger is not None:
+            self.logger.log_event(event, level, symbol=self.symbol, **fields)
@@ -1,5 +1,3 @@
-import matplotlib
-matplotlib.use('TkAgg')
 from decimal import Decimal
 from domain.simple_rsi_strategy import SimpleRSIStrategy
 from indicators.rsi import RSIIndicator
@@ -19,6 +17,7 @@ def main():
         ),
         symbol=symbol,
         timeframe="1m",
+        loader="cached",
         account_balance=10000,
         plot=True,
         indicators={"rsi": RSIIndicator(period=14)},
@@ -5,7 +5,7 @@ from indicators.rsi import RSIIndicator
 from services.broker import Broker
 from services.trade_logger import TradeLogger
 from services.binance_executor import BinanceExecutor
-from config.settings import BINANCE_API_KEY, BINANCE_API_SECRET
+from config.settings import BINANCE_API_KEY, BINANCE_API_SECRET, DATA_PATH
 from live.engine import LiveEngine
 
 
@@ -41,7 +41,8 @@ def main():
         indicators=indicators,
         symbol="BTC/USDT",
         timeframe="1m",
-        poll_interval=60
+        poll_interval=60,
+        archive=DATA_PATH                        # warm indicators from local parquet, REST for the rest
     )
 
     engine.run()
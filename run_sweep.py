@@ -0,0 +1,35 @@
+from backtest.sweep import SweepRunner
+
+
+def main():
+    grid = {
+        "period": [7, 14, 21],
+        "rsi_low": [20, 25, 30],
+        "rsi_high": [70, 75, 80],
+        "leverage": [2, 5, 10],
+        "sl_pct": [0.05, 0.1],
+        "tp_pct": [0.1, 0.2],
+        "size_fraction": [0.3],
+    }
+
+    runner = SweepRunner(
+        symbol="BTCUSDT",
+        timeframe="1m",
+        grid=grid,
+        results_path="sweep_results.csv",
+        start="2021-01-01",
+        end="2021-02-01",
+        account_balance=10000,
+        cache=True,
+    )
+
+    total = len(runner.pending())
+    print(f"🧪 {total} runs pending")
+    runner.run(on_result=lambda row: print(
+        f"✅ {row['key']} | Balance: {row['final_balance']:.2f} | Trades: {row['trade_count']}"
+        f" | Sharpe: {row['sharpe']:.2f} | Max DD: {row['max_drawdown']:.2%}"
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+from backtest.dataloader import ohlcv_path, read_ohlcv_columns
+from backtest.partitions import PartitionedDataset
+from config.settings import DATA_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact month partitions, or split single-file datasets into them")
+    parser.add_argument("--symbols", nargs="+", default=["BTCUSDT"])
+    parser.add_argument("--timeframes", nargs="+", default=["1m"])
+    parser.add_argument("--data-path", default=str(DATA_PATH))
+    parser.add_argument("--migrate", action="store_true",
+                        help="partition <symbol>_<tf>.parquet first (the source file is kept)")
+    parser.add_argument("--force", action="store_true", help="rewrite every month, not only fragmented ones")
+    args = parser.parse_args()
+
+    for symbol in args.symbols:
+        for tf in args.timeframes:
+            dataset = PartitionedDataset.for_symbol(symbol, tf, args.data_path)
+            source = ohlcv_path(symbol, tf, args.data_path)
+            if args.migrate and os.path.exists(source):
+                if dataset.exists():
+                    print(f"⚠️ {symbol} {tf}: {dataset.root} already exists, skipping migration")
+                else:
+                    written = dataset.append(read_ohlcv_columns(source))
+                    print(f"📦 {symbol} {tf}: {len(written)} month partitions from {source}")
+            if not dataset.exists():
+                continue
+            rewritten = dataset.compact(force=args.force)
+            print(f"✅ {symbol} {tf}: compacted {rewritten} months in {dataset.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,46 @@ import os
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import argparse
+import time
 
-from ohlcv_downloader import OHLCVDownloader
+from ohlcv_downloader import OHLCVDownloader, TokenBucket
 from config.settings import DATA_PATH
-import os
-
-timeframes = ["1d", "4h", "30m", "5m", "1m"]  # start with 1d to test
-symbol = "BTC/USDT"
-start_date = "2020-04-01"
-
-downloader = OHLCVDownloader(symbol=symbol)
-
-
-for tf in timeframes:
-    print(f"\n📥 Fetching {symbol} {tf} from {start_date}")
-    df = downloader.fetch_ohlcv_range(timeframe=tf, start_date=start_date)
 
-    symbol_dir = os.path.join(DATA_PATH, symbol.replace("/", ""))
-    filename = f"{symbol.replace('/', '')}_{tf}.parquet"
-    full_path = os.path.join(symbol_dir, filename)
 
-    downloader.save_to_parquet(df, full_path)
+def main():
+    parser = argparse.ArgumentParser(description="Download or top up OHLCV parquet datasets")
+    parser.add_argument("--symbols", nargs="+", default=["BTC/USDT"])
+    # Higher timeframes are resampled locally from 1m (backtest/resample.py); download them only if needed
+    parser.add_argument("--timeframes", nargs="+", default=["1m"])
+    parser.add_argument("--start", default="2020-04-01", help="start date for datasets not on disk yet")
+    parser.add_argument("--data-path", default=str(DATA_PATH))
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second across all downloads")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--partitioned", action="store_true",
+                        help="store year/month partitions (<symbol>/<tf>/year=/month=) instead of one file")
+    args = parser.parse_args()
+
+    # One bucket and one client for every symbol: the limit is per account/IP
+    bucket = TokenBucket(args.rate)
+    exchange = None
+    checkpoints = os.path.join(args.data_path, ".checkpoints")
+
+    for symbol in args.symbols:
+        downloader = OHLCVDownloader(symbol=symbol, workers=args.workers, checkpoint_dir=checkpoints,
+                                     exchange=exchange, bucket=bucket, partitioned=args.partitioned)
+        exchange = downloader.exchange
+        name = symbol.replace("/", "")
+        for tf in args.timeframes:
+            started = time.perf_counter()
+            if args.partitioned:
+                path = os.path.join(args.data_path, name, tf)
+            else:
+                path = os.path.join(args.data_path, name, f"{name}_{tf}.parquet")
+            stats = downloader.update(tf, path, args.start)
+            print(f"📥 {symbol} {tf}: +{stats['added']} rows ({stats['rows']} total, "
+                  f"{stats['gaps_remaining']} gaps) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
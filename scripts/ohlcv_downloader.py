@@ -1,41 +1,301 @@
-import ccxt
-import pandas as pd
-from datetime import datetime, timedelta
+import json
 import os
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.timeframes import timeframe_to_ms
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second on average, with
+    bursts of up to `capacity`. Shared by every download worker.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class OHLCVDownloader:
-    def __init__(self, exchange_name="binance", symbol="BTC/USDT", limit=1000, pause=1.2):
-        self.exchange = getattr(ccxt, exchange_name)()
+    """
+    Downloads OHLCV history in fixed, aligned chunks fetched concurrently
+    by `workers` threads under one shared `TokenBucket` (`rate` requests
+    per second). Downloaders for several symbols can share an `exchange`
+    and a `bucket` to stay under one account-wide limit.
+
+    With a `checkpoint_dir`, every completed chunk is written there as it
+    lands, so an interrupted download resumes with only the missing chunks.
+    `update()` appends just the missing tail (and any interior gaps) to an
+    existing parquet file and deduplicates on timestamp. Gaps the exchange
+    has returned nothing for are recorded next to the data and not asked
+    for again.
+    """
+
+    def __init__(self, exchange_name="binance", symbol="BTC/USDT", limit=1000, rate=10.0, workers=4,
+                 pages_per_chunk=20, checkpoint_dir=None, exchange=None, bucket=None, partitioned=False):
+        if exchange is None:
+            import ccxt
+
+            # Throttling is done by the shared bucket, not per call inside ccxt
+            exchange = getattr(ccxt, exchange_name)({"enableRateLimit": False})
+        self.exchange = exchange
         self.symbol = symbol
         self.limit = limit
-        self.pause = pause  # delay to avoid rate limits
+        self.workers = workers
+        self.pages_per_chunk = pages_per_chunk
+        self.checkpoint_dir = checkpoint_dir
+        self.partitioned = partitioned
+        self.bucket = bucket or TokenBucket(rate)
+        self.requests = 0
+        self._markets_loaded = False
+        self._lock = threading.Lock()
 
-    def fetch_ohlcv_range(self, timeframe: str, start_date: str) -> pd.DataFrame:
-        since = int(pd.Timestamp(start_date).timestamp() * 1000)
-        now = int(datetime.utcnow().timestamp() * 1000)
-        all_data = []
+    # --- full ranges ---
+    def fetch_ohlcv_range(self, timeframe: str, start_date: str, end_date: str = None) -> pd.DataFrame:
+        """
+        Closed candles from `start_date` up to `end_date` (default: now).
+        """
+        start = _to_ms(start_date)
+        end = _to_ms(end_date) if end_date is not None else None
+        return _to_frame(self.fetch_arrays(timeframe, [(start, end)]))
 
-        while since < now:
-            batch = self.exchange.fetch_ohlcv(self.symbol, timeframe, since=since, limit=self.limit)
+    def fetch_arrays(self, timeframe: str, ranges) -> np.ndarray:
+        """
+        Fetch half-open [start, end) ms ranges as one (n, 6) float64 array
+        sorted and deduplicated on timestamp. An `end` of None means the
+        open time of the current, still-forming candle.
+        """
+        tf = timeframe_to_ms(timeframe)
+        now = int(time.time() * 1000) // tf * tf
+        chunk_ms = tf * self.limit * self.pages_per_chunk
+
+        chunks = []
+        for start, end in ranges:
+            start = -(-start // tf) * tf
+            end = now if end is None else min(end, now)
+            lo = start // chunk_ms * chunk_ms
+            while lo < end:
+                chunks.append((max(lo, start), min(lo + chunk_ms, end), lo, lo + chunk_ms))
+                lo += chunk_ms
+        if not chunks:
+            return np.empty((0, len(COLUMNS)))
+
+        self._load_markets()
+        checkpoints = self._checkpoint_path(timeframe)
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="ohlcv") as pool:
+            parts = list(pool.map(lambda c: self._fetch_chunk(timeframe, tf, *c, checkpoints), chunks))
+        return _dedupe(np.concatenate(parts))
+
+    def _fetch_chunk(self, timeframe, tf, start, end, cell_start, cell_end, checkpoints):
+        # Only chunks covering their whole grid cell are final; a clipped one is refetched next run
+        complete = (start, end) == (cell_start, cell_end)
+        path = os.path.join(checkpoints, f"{start}.npy") if checkpoints and complete else None
+        if path and os.path.exists(path):
+            return np.load(path)
 
+        rows = []
+        since = start
+        while since < end:
+            self.bucket.acquire()
+            with self._lock:
+                self.requests += 1
+            batch = self.exchange.fetch_ohlcv(self.symbol, timeframe, since=since, limit=self.limit)
             if not batch:
-                break  # No more data available
+                break
+            rows.extend(b for b in batch if since <= b[0] < end)
+            last = batch[-1][0]
+            if last + tf >= end:
+                break
+            since = last + tf
+
+        data = np.asarray(rows, dtype="float64").reshape(-1, len(COLUMNS))
+        if path:
+            tmp = path + ".tmp.npy"
+            np.save(tmp, data)
+            os.replace(tmp, path)
+        return data
+
+    # --- incremental ---
+    def update(self, timeframe: str, path, start_date: str, end_date: str = None) -> dict:
+        """
+        Bring the parquet dataset at `path` up to date: fetch the candles
+        after its last timestamp plus any interior gaps, merge, dedupe and
+        rewrite it atomically. A missing file is downloaded from
+        `start_date`. Returns counts of what was fetched.
+
+        Interior gaps still empty after a fetch covered them are permanent
+        on the exchange (halts, delistings): they go to the `gaps_file()`
+        sidecar and later runs skip them.
+
+        With `partitioned=True`, `path` is a `PartitionedDataset` root: only
+        its newest month is read, so interior gaps are checked there (older
+        months were checked when they were the tail), and only the new rows
+        are written, into the months they belong to.
+        """
+        tf = timeframe_to_ms(timeframe)
+        end = _to_ms(end_date) if end_date is not None else None
+        existing = None
+        dataset = None
+        window = None  # start of what was read; the whole file when None
+        if self.partitioned:
+            from backtest.partitions import PartitionedDataset, _month_bounds
 
-            all_data.extend(batch)
+            dataset = PartitionedDataset(path)
+            months = dataset.months()
+            if months:
+                window = _month_bounds(*months[-1])[0]
+                existing = _stack(dataset.read(window))
+        elif os.path.exists(path):
+            existing = _read_parquet(path)
+        gaps_file = self.gaps_file(path)
+        empty = set(_load_gaps(gaps_file))
+        skipped = 0
+        if existing is None or not len(existing):
+            ranges = [(_to_ms(start_date), end)]
+            gaps = []
+        else:
+            ts = existing[:, 0].astype("int64")
+            found = find_gaps(ts, tf)
+            gaps = [gap for gap in found if gap not in empty]
+            skipped = len(found) - len(gaps)
+            ranges = gaps + [(int(ts[-1]) + tf, end)]
 
-            # Update 'since' to last timestamp + 1 ms
-            last_ts = batch[-1][0]
-            since = last_ts + 1
+        new = self.fetch_arrays(timeframe, ranges)
+        merged = new if existing is None else _dedupe(np.concatenate([existing, new]))
+        added = len(merged) - (0 if existing is None else len(existing))
+        if dataset is not None:
+            if existing is not None:
+                new = new[~np.isin(new[:, 0], existing[:, 0])]
+            if len(new):
+                dataset.append({name: new[:, i] for i, name in enumerate(COLUMNS)})
+                dataset.compact()  # only the months just appended to hold more than one file
+        elif added or existing is None:
+            self.save_to_parquet(_to_frame(merged), path)
 
-            print(f"Fetched {len(batch)} candles up to {pd.to_datetime(last_ts, unit='ms')}")
-            time.sleep(self.pause)  # Respect rate limits
+        checkpoints = self._checkpoint_path(timeframe)
+        if checkpoints:
+            shutil.rmtree(checkpoints, ignore_errors=True)
+        remaining = find_gaps(merged[:, 0].astype("int64"), tf) if len(merged) else []
+        confirmed = [gap for gap in remaining if gap in empty or _covered(gap, ranges)]
+        if window is not None:
+            # Gaps before the newest month were not re-read; keep them as they are
+            confirmed += [gap for gap in empty if gap[0] < window]
+        if set(confirmed) != empty:
+            _save_gaps(gaps_file, confirmed)
+        rows = len(merged) if dataset is None else dataset.num_rows()
+        return {"timeframe": timeframe, "added": added, "rows": rows,
+                "gaps_checked": len(gaps), "gaps_skipped": skipped, "gaps_remaining": len(remaining)}
 
-        df = pd.DataFrame(all_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        return df
+    def gaps_file(self, path) -> str:
+        """
+        Sidecar JSON of the exchange-confirmed empty gaps of the dataset at `path`.
+        """
+        return os.path.join(path, "_empty_gaps.json") if self.partitioned else f"{path}.gaps.json"
 
     def save_to_parquet(self, df: pd.DataFrame, path: str):
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        df.to_parquet(path, index=False, engine="pyarrow", coerce_timestamps="ms")
+        tmp = f"{path}.tmp"
+        df.to_parquet(tmp, index=False, engine="pyarrow", coerce_timestamps="ms")
+        os.replace(tmp, path)
         print(f"✅ Saved to {path}")
+
+    def _load_markets(self):
+        if not self._markets_loaded and hasattr(self.exchange, "load_markets"):
+            self.bucket.acquire()
+            self.exchange.load_markets()
+        self._markets_loaded = True
+
+    def _checkpoint_path(self, timeframe):
+        if not self.checkpoint_dir:
+            return None
+        path = os.path.join(self.checkpoint_dir, self.symbol.replace("/", ""), timeframe)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+def find_gaps(ts: np.ndarray, tf: int) -> list:
+    """
+    Missing [start, end) ms ranges between consecutive sorted timestamps.
+    """
+    if len(ts) < 2:
+        return []
+    idx = np.flatnonzero(np.diff(ts) > tf)
+    return [(int(ts[i]) + tf, int(ts[i + 1])) for i in idx]
+
+
+def _covered(gap, ranges) -> bool:
+    start, end = gap
+    return any(lo <= start and (hi is None or end <= hi) for lo, hi in ranges)
+
+
+def _load_gaps(path) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [tuple(gap) for gap in json.load(f)]
+
+
+def _save_gaps(path, gaps):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(sorted(gaps), f)
+    os.replace(tmp, path)
+
+
+def _dedupe(data: np.ndarray) -> np.ndarray:
+    if not len(data):
+        return data
+    # Stable sort, then keep the last row per timestamp so fresher downloads win
+    data = data[np.argsort(data[:, 0], kind="stable")]
+    keep = np.ones(len(data), dtype=bool)
+    keep[:-1] = data[1:, 0] != data[:-1, 0]
+    return data[keep]
+
+
+def _read_parquet(path) -> np.ndarray:
+    from backtest.dataloader import read_ohlcv_columns
+
+    return _stack(read_ohlcv_columns(path))
+
+
+def _stack(columns: dict) -> np.ndarray:
+    return np.column_stack([columns[name].astype("float64") for name in COLUMNS])
+
+
+def _to_frame(data: np.ndarray) -> pd.DataFrame:
+    df = pd.DataFrame(data, columns=COLUMNS)
+    df["timestamp"] = pd.to_datetime(data[:, 0].astype("int64"), unit="ms")
+    return df
+
+
+def _to_ms(value) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        value = pd.Timestamp(value)
+    return int(pd.Timestamp(value).value // 1_000_000)
@@ -1,20 +1,22 @@
 # services/binance_executor.py
 
-import ccxt
 from core.models import Order, Trade
 from core.enums import OrderStatus, OrderType, Side
 from services.executor import OrderExecutor
+from services.ccxt_support import CcxtOrderSupport, StageTimer
 from decimal import Decimal
 from uuid import uuid4
 from datetime import datetime
 
 
 
-class BinanceExecutor(OrderExecutor):
+class BinanceExecutor(CcxtOrderSupport, OrderExecutor):
     """
     Executes real orders on Binance (testnet or live).
     """
-    def __init__(self, api_key, api_secret, testnet=True):
+    def __init__(self, api_key, api_secret, testnet=True, margin_mode=None):
+        import ccxt  # deferred: ~0.4s to import, and backtests never need it
+
         self.exchange = ccxt.binance({
             'apiKey': api_key,
             'secret': api_secret,
@@ -29,19 +31,22 @@ class BinanceExecutor(OrderExecutor):
 
         self.orders = {}
         self.trades = []
+        self._init_order_support(margin_mode)  # e.g. "isolated"; None leaves the account setting alone
         self.broker = None  # set by LiveEngine or main script
 
 
     def submit_order(self, order):
+        timer = StageTimer()
         try:
             symbol = order.asset  # e.g. "BTC/USDT"
             qty = float(order.quantity)
 
-            # Set leverage before any order
+            # Only hits the exchange when leverage/margin mode changes for the symbol
             try:
-                self.exchange.set_leverage(int(order.leverage), symbol=symbol)
+                self._ensure_leverage(symbol, order.leverage)
             except Exception as e:
                 print(f"⚠️ Failed to set leverage {order.leverage}x on {symbol}: {e}")
+            timer.lap("leverage_ms")
 
             # Submit entry order
             if order.order_type == OrderType.MARKET:
@@ -59,6 +64,7 @@ class BinanceExecutor(OrderExecutor):
             else:
                 raise ValueError(f"Unsupported order type: {order.order_type}")
 
+            timer.lap("entry_ms")
             order_id = result["id"]
             order.timestamp = datetime.utcnow()
             order.status = OrderStatus.PENDING
@@ -82,41 +88,17 @@ class BinanceExecutor(OrderExecutor):
                 print(f"✅ Trade executed: {order.side.name} {order.quantity} {symbol} @ {executed_price}")
             else:
                 print(f"🕒 LIMIT order submitted (not yet filled): {order.side.name} {qty} @ {order.price}")
-
-                # Note: You may implement polling for fill later
+                if self.reconciler is not None:
+                    self.reconciler.track(self, order_id, order)
 
             # Attach SL/TP as bracket orders if needed
-            if order.stop_price:
-                try:
-                    self.exchange.create_order(
-                        symbol=symbol,
-                        type='STOP_MARKET',
-                        side='sell' if order.side == Side.BUY else 'buy',
-                        amount=qty,
-                        params={
-                            'stopPrice': float(order.stop_price),
-                            'closePosition': True
-                        }
-                    )
-                    print(f"📉 Stop-loss placed at {order.stop_price}")
-                except Exception as e:
-                    print(f"❌ Failed to place SL order:", e)
-
-            if order.take_profit:
-                try:
-                    self.exchange.create_order(
-                        symbol=symbol,
-                        type='TAKE_PROFIT_MARKET',
-                        side='sell' if order.side == Side.BUY else 'buy',
-                        amount=qty,
-                        params={
-                            'stopPrice': float(order.take_profit),
-                            'closePosition': True
-                        }
-                    )
-                    print(f"📈 Take-profit placed at {order.take_profit}")
-                except Exception as e:
-                    print(f"❌ Failed to place TP order:", e)
+            for label, price, placed in self._place_protective(order, symbol, qty):
+                if isinstance(placed, Exception):
+                    print(f"❌ Failed to place {label} order:", placed)
+                else:
+                    print(f"{'📉 Stop-loss placed at' if label == 'SL' else '📈 Take-profit placed at'} {price}")
+            timer.lap("protective_ms")
+            self._record_latency(timer, order_id=order_id, symbol=symbol)
 
             return trade if order.status == OrderStatus.FILLED else None
 
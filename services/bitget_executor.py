@@ -1,18 +1,20 @@
 # services/bitget_executor.py
 
-import ccxt
 from core.models import Order, Trade
 from core.enums import OrderStatus, OrderType, Side
 from services.executor import OrderExecutor
+from services.ccxt_support import CcxtOrderSupport, StageTimer
 from decimal import Decimal
 from datetime import datetime
 
 
-class BitgetExecutor(OrderExecutor):
+class BitgetExecutor(CcxtOrderSupport, OrderExecutor):
     """
     Executes real orders on Bitget (testnet or live).
     """
-    def __init__(self, api_key, api_secret, password=None, testnet=False):
+    def __init__(self, api_key, api_secret, password=None, testnet=False, margin_mode=None):
+        import ccxt
+
         self.exchange = ccxt.bitget({
             'apiKey': api_key,
             'secret': api_secret,
@@ -28,18 +30,21 @@ class BitgetExecutor(OrderExecutor):
 
         self.orders = {}
         self.trades = []
+        self._init_order_support(margin_mode)  # e.g. "isolated"; None leaves the account setting alone
         self.broker = None  # set by LiveEngine
 
     def submit_order(self, order):
+        timer = StageTimer()
         try:
             symbol = order.asset
             qty = float(order.quantity)
 
-            # Set leverage first
+            # Only hits the exchange when leverage/margin mode changes for the symbol
             try:
-                self.exchange.set_leverage(int(order.leverage), symbol=symbol)
+                self._ensure_leverage(symbol, order.leverage)
             except Exception as e:
                 print(f"⚠️ Bitget leverage set failed for {symbol}: {e}")
+            timer.lap("leverage_ms")
 
             # Submit entry order
             if order.order_type == OrderType.MARKET:
@@ -53,6 +58,7 @@ class BitgetExecutor(OrderExecutor):
             else:
                 raise ValueError(f"Unsupported order type: {order.order_type}")
 
+            timer.lap("entry_ms")
             order_id = result['id']
             order.timestamp = datetime.utcnow()
             order.status = OrderStatus.PENDING
@@ -76,39 +82,17 @@ class BitgetExecutor(OrderExecutor):
                 print(f"✅ Bitget trade executed: {order.side.name} {order.quantity} {symbol} @ {executed_price}")
             else:
                 print(f"🕒 Bitget LIMIT order submitted (pending): {order.side.name} {qty} @ {order.price}")
+                if self.reconciler is not None:
+                    self.reconciler.track(self, order_id, order)
 
             # SL/TP brackets
-            if order.stop_price:
-                try:
-                    self.exchange.create_order(
-                        symbol=symbol,
-                        type='STOP_MARKET',
-                        side='sell' if order.side == Side.BUY else 'buy',
-                        amount=qty,
-                        params={
-                            'stopPrice': float(order.stop_price),
-                            'closePosition': True
-                        }
-                    )
-                    print(f"📉 Bitget SL placed at {order.stop_price}")
-                except Exception as e:
-                    print(f"❌ Bitget SL failed:", e)
-
-            if order.take_profit:
-                try:
-                    self.exchange.create_order(
-                        symbol=symbol,
-                        type='TAKE_PROFIT_MARKET',
-                        side='sell' if order.side == Side.BUY else 'buy',
-                        amount=qty,
-                        params={
-                            'stopPrice': float(order.take_profit),
-                            'closePosition': True
-                        }
-                    )
-                    print(f"📈 Bitget TP placed at {order.take_profit}")
-                except Exception as e:
-                    print(f"❌ Bitget TP failed:", e)
+            for label, price, placed in self._place_protective(order, symbol, qty):
+                if isinstance(placed, Exception):
+                    print(f"❌ Bitget {label} failed:", placed)
+                else:
+                    print(f"{'📉 Bitget SL placed at' if label == 'SL' else '📈 Bitget TP placed at'} {price}")
+            timer.lap("protective_ms")
+            self._record_latency(timer, order_id=order_id, symbol=symbol)
 
             return trade if order.status == OrderStatus.FILLED else None
 
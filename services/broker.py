@@ -1,9 +1,15 @@
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_EVEN
 from typing import Dict
-from collections import defaultdict
-from core.models import Order, Trade, Position
-from core.enums import Side
+from collections import defaultdict, namedtuple
+from core.models import Order, Trade, Position, Instrument, div_round
+from core.enums import Side, OrderType
 from services.executor import OrderExecutor
+from services.event_sink import INFO
+
+INT64_MAX = 2 ** 63 - 1
+# Enum members looked up once: class attribute access is slow on the trade path
+_SELL = Side.SELL
+_ENTRY_STOPS = (OrderType.STOP, OrderType.STOP_LIMIT)
 
 class Broker:
     """
@@ -17,6 +23,8 @@ class Broker:
         self.trades: List[Trade] = []
         self.logger = logger
         self.last_price = None
+        self.position_listeners = []  # called as listener(symbol, position_or_None)
+        self.realized_pnl = []  # PnL of every closing fill, for win rate / profit factor
 
 
     def submit_order(self, order: Order) -> str:
@@ -34,25 +42,26 @@ class Broker:
         qty = trade.quantity
         price = trade.execution_price
         side = order.side
+        # Strategies pass leverage as int/float; Decimal arithmetic needs Decimal
+        leverage = Decimal(str(order.leverage or 1))
 
         pos = self.positions.get(symbol)
 
         # --- Opening new position ---
         if not pos:
             exposure = qty * price
-            leverage = order.leverage or Decimal("1")
             margin_required = exposure / leverage
 
-            self.positions[symbol] = Position(
+            self._set_position(symbol, Position(
                 symbol=symbol,
                 quantity=qty,
                 average_entry_price=price,
                 side=side,
                 leverage=leverage,
                 margin=margin_required,
-                stop_loss=order.stop_price,
+                stop_loss=self._protective_stop(order),
                 take_profit=order.take_profit
-            )
+            ))
             return
 
         # --- Scaling into existing position ---
@@ -62,7 +71,7 @@ class Broker:
             new_exposure = total_qty * price
             new_margin = new_exposure / pos.leverage
 
-            self.positions[symbol] = Position(
+            self._set_position(symbol, Position(
                 symbol=symbol,
                 quantity=total_qty,
                 average_entry_price=new_avg_price,
@@ -71,7 +80,7 @@ class Broker:
                 margin=new_margin,
                 stop_loss=pos.stop_loss,
                 take_profit=pos.take_profit
-            )
+            ))
             return
 
         # --- Closing or flipping (opposite side) ---
@@ -84,6 +93,7 @@ class Broker:
             pnl = (pos.average_entry_price - price) * closing_qty
 
         self.account_balance += pnl
+        self.realized_pnl.append(pnl)
         margin_released = (closing_qty / pos.quantity) * pos.margin
 
         # Equity = balance right after PnL is realized (no unrealized PnL at this point)
@@ -99,24 +109,24 @@ class Broker:
         if qty > pos.quantity:
             # Flip to new position
             new_exposure = remaining_qty * price
-            new_margin = new_exposure / (order.leverage or Decimal("1"))
+            new_margin = new_exposure / leverage
 
-            self.positions[symbol] = Position(
+            self._set_position(symbol, Position(
                 symbol=symbol,
                 quantity=remaining_qty,
                 average_entry_price=price,
                 side=side,
-                leverage=order.leverage,
+                leverage=leverage,
                 margin=new_margin,
-                stop_loss=order.stop_price,
+                stop_loss=self._protective_stop(order),
                 take_profit=order.take_profit
-            )
+            ))
 
         elif qty < pos.quantity:
             # Partial close
             remaining_margin = pos.margin * (remaining_qty / pos.quantity)
 
-            self.positions[symbol] = Position(
+            self._set_position(symbol, Position(
                 symbol=symbol,
                 quantity=remaining_qty,
                 average_entry_price=pos.average_entry_price,
@@ -125,13 +135,34 @@ class Broker:
                 margin=remaining_margin,
                 stop_loss=pos.stop_loss,
                 take_profit=pos.take_profit
-            )
+            ))
 
         else:
             # Full close
+            self._set_position(symbol, None)
+
+
+
+    def _set_position(self, symbol: str, position):
+        if position is None:
             del self.positions[symbol]
+        else:
+            self.positions[symbol] = position
+        for listener in self.position_listeners:
+            listener(symbol, position)
 
+    @staticmethod
+    def _protective_stop(order: Order):
+        # On STOP/STOP_LIMIT orders stop_price is the entry trigger, not a stop-loss
+        if order.order_type in _ENTRY_STOPS:
+            return None
+        return order.stop_price
 
+    def quote(self, symbol: str, price) -> Decimal:
+        """
+        Convert a simulated fill price to the ledger's price representation.
+        """
+        return Decimal(price)
 
     def get_position(self, symbol: str) -> Position:
         """
@@ -149,12 +180,12 @@ class Broker:
         """
         Debug print for cash and current positions.
         """
-        print(f"💰 Cash: {self.cash}")
+        print(f"💰 Cash: {self.account_balance}  (margin in use: {self.get_total_margin()})")
         print(f"📈 Positions:")
 
         total_position_value = Decimal("0")
         for symbol, pos in self.positions.items():
-            market_price = Decimal(getattr(self, "last_price", pos.average_entry_price))
+            market_price = Decimal(str(self.last_price or pos.average_entry_price))
             position_value = pos.quantity * market_price
             total_position_value += position_value
 
@@ -163,3 +194,244 @@ class Broker:
 
         print(f"📊 Total Account Value: {self.account_balance:.2f}")
     
+
+class FixedPointBroker(Broker):
+    """
+    Broker whose ledger is kept in scaled 64-bit integers.
+
+    Per symbol, prices are integer ticks and quantities integer lots (see
+    `Instrument`); cash, PnL and margin are integers of 1e-8 quote units.
+    Every operation is exact integer arithmetic with a single half-even
+    rounding where a division is unavoidable, so no Decimal is created on
+    the trade path: positions are `LedgerPosition`s holding the integers,
+    and `account_balance`, `realized_pnl`, `get_total_margin()` and the
+    positions' quantity/entry/margin are Decimal views built when read.
+    `quote()` returns prices on the tick grid as floats.
+    """
+    CASH_SCALE = 10 ** 8
+
+    def __init__(self, account_balance: Decimal, logger=None, instruments=None):
+        self.instruments = dict(instruments or {})
+        self._specs = {}      # symbol -> (Instrument, cash units per tick*lot, n of a 1/n lot, n of a 1/n tick)
+        self._leverages = {}  # order leverage -> (num, den, Decimal)
+        self._balance_view = None
+        self._realized = []   # realized PnL per closing fill, cash units
+        self._realized_views = []
+        super().__init__(account_balance=account_balance, logger=logger)
+
+    # --- Decimal views ---
+    @property
+    def account_balance(self) -> Decimal:
+        if self._balance_view is None:
+            self._balance_view = Decimal(self._balance) / self.CASH_SCALE
+        return self._balance_view
+
+    @account_balance.setter
+    def account_balance(self, value):
+        self._balance = self._to_cash(value)
+        self._balance_view = None
+
+    @property
+    def realized_pnl(self) -> list:
+        views = self._realized_views
+        for units in self._realized[len(views):]:
+            views.append(Decimal(units) / self.CASH_SCALE)
+        return views
+
+    @realized_pnl.setter
+    def realized_pnl(self, values):
+        self._realized = [self._to_cash(v) for v in values]
+        self._realized_views = []
+
+    def get_total_margin(self) -> Decimal:
+        return Decimal(sum(pos.margin_units for pos in self.positions.values())) / self.CASH_SCALE
+
+    def instrument(self, symbol: str) -> Instrument:
+        inst = self.instruments.get(symbol)
+        if inst is None:
+            inst = self.instruments[symbol] = Instrument(symbol)
+        return inst
+
+    def quote(self, symbol: str, price) -> float:
+        inst = self._spec(symbol)[0]
+        return inst.ticks_to_float(inst.price_to_ticks(price))
+
+    # --- integer ledger ---
+    def record_trade(self, trade: Trade):
+        self.trades.append(trade)
+        order = trade.order
+        symbol = order.asset
+        side = order.side
+        inst, factor, lot_n, tick_n = self._specs.get(symbol) or self._spec(symbol)
+        # Quoted floats and grid-aligned Decimals (the common cases) convert inline
+        qty, price = trade.quantity, trade.execution_price
+        if qty.__class__ is Decimal:
+            num, den = qty.as_integer_ratio()
+            lots = num * (lot_n // den) if lot_n and not lot_n % den else inst.qty_to_lots(qty)
+        else:
+            lots = inst.qty_to_lots(qty)
+        if price.__class__ is float:
+            ticks = round(price * inst._inv_tick)
+        elif price.__class__ is Decimal:
+            num, den = price.as_integer_ratio()
+            ticks = num * (tick_n // den) if tick_n and not tick_n % den else inst.price_to_ticks(price)
+        else:
+            ticks = inst.price_to_ticks(price)
+        leverage = order.leverage or 1
+        lev = self._leverages.get(leverage) or self._leverage(leverage)
+
+        pos = self.positions.get(symbol)
+
+        # --- Opening new position ---
+        if pos is None:
+            notional = lots * ticks
+            stop_loss = None if order.order_type in _ENTRY_STOPS else order.stop_price
+            self._open((symbol, side, lots, notional, _margin(notional * factor, lev), lev, stop_loss,
+                        order.take_profit, inst))
+            return
+
+        pos_lots, cost = pos.lots, pos.cost
+
+        # --- Scaling into existing position ---
+        if pos.side is side:
+            total = pos_lots + lots
+            p_lev = pos.lev
+            self._open((symbol, side, total, cost + lots * ticks, _margin(total * ticks * factor, p_lev), p_lev,
+                        pos.stop_loss, pos.take_profit, inst))
+            return
+
+        # --- Closing or flipping (opposite side) ---
+        pos_margin = pos.margin_units
+        if lots >= pos_lots:
+            # The whole position closes: PnL and released margin need no division
+            closing, remaining = pos_lots, lots - pos_lots
+            pnl = (closing * ticks - cost) * factor
+            margin_released = pos_margin
+        else:
+            closing, remaining = lots, pos_lots - lots
+            # PnL in notional units is exact as a fraction over pos_lots
+            pnl = div_round((closing * ticks * pos_lots - cost * closing) * factor, pos_lots)
+            margin_released = div_round(pos_margin * closing, pos_lots)
+        if pos.side is _SELL:
+            pnl = -pnl
+
+        self._balance += pnl
+        self._balance_view = None
+        if not -INT64_MAX <= self._balance <= INT64_MAX:
+            raise OverflowError("account balance exceeds the 64-bit ledger")
+        self._realized.append(pnl)
+
+        if self.logger is not None and self.logger.enabled(INFO):
+            self.logger.log_close_position(
+                symbol,
+                Decimal(pnl) / self.CASH_SCALE,
+                margin_released=round(Decimal(margin_released) / self.CASH_SCALE, 2),
+                timestamp=trade.timestamp
+            )
+
+        if lots > pos_lots:
+            # Flip to new position
+            notional = remaining * ticks
+            stop_loss = None if order.order_type in _ENTRY_STOPS else order.stop_price
+            self._open((symbol, side, remaining, notional, _margin(notional * factor, lev), lev, stop_loss,
+                        order.take_profit, inst))
+        elif lots < pos_lots:
+            # Partial close keeps the average entry: scale cost and margin down
+            self._open((symbol, pos.side, remaining, div_round(cost * remaining, pos_lots),
+                        pos_margin - margin_released, pos.lev, pos.stop_loss, pos.take_profit, inst))
+        else:
+            # Full close
+            self._set_position(symbol, None)
+
+    def _open(self, fields: tuple):
+        # Built straight from the field tuple: the namedtuple __new__ is a Python-level call
+        pos = _new_tuple(LedgerPosition, fields)
+        if pos.cost > INT64_MAX or pos.margin_units > INT64_MAX:
+            raise OverflowError(f"{pos.symbol} position exceeds the 64-bit ledger")
+        self.positions[pos.symbol] = pos
+        for listener in self.position_listeners:
+            listener(pos.symbol, pos)
+
+    def _spec(self, symbol: str) -> tuple:
+        spec = self._specs.get(symbol)
+        if spec is None:
+            inst = self.instrument(symbol)
+            factor = inst.tick_size * inst.lot_size * self.CASH_SCALE
+            if factor != factor.to_integral_value():
+                raise ValueError(f"tick_size * lot_size for {inst.symbol} is finer than the 1e-8 cash unit")
+            spec = self._specs[symbol] = (inst, int(factor), _inverse_step(inst.lot_size),
+                                          _inverse_step(inst.tick_size))
+        return spec
+
+    def _leverage(self, leverage) -> tuple:
+        view = Decimal(str(leverage))
+        num, den = view.as_integer_ratio()
+        lev = self._leverages[leverage] = (num, den, view)
+        return lev
+
+    def _to_cash(self, value) -> int:
+        if isinstance(value, float):
+            return round(value * self.CASH_SCALE)
+        return int((Decimal(value) * self.CASH_SCALE).to_integral_value(ROUND_HALF_EVEN))
+
+
+def _margin(notional_units: int, lev: tuple) -> int:
+    """
+    `notional_units / leverage`, rounded half-even; exact leverages skip the rounding.
+    """
+    scaled = notional_units * lev[1]
+    margin, rest = divmod(scaled, lev[0])
+    return div_round(scaled, lev[0]) if rest else margin
+
+
+def _inverse_step(step: Decimal) -> int:
+    """
+    n when `step` is exactly 1/n (0.01 -> 100), else 0.
+    """
+    num, den = step.as_integer_ratio()
+    return den if num == 1 else 0
+
+
+_new_tuple = tuple.__new__
+
+
+class LedgerPosition(namedtuple("LedgerPosition", "symbol side lots cost margin_units lev stop_loss take_profit inst")):
+    """
+    A `FixedPointBroker` position: the integer ledger entry itself (lots,
+    cost in ticks*lots, margin in cash units, leverage as (num, den,
+    Decimal)), with the remaining `Position` fields as Decimal views
+    computed on first read. Replaced, never mutated, on every fill.
+    """
+
+    @property
+    def leverage(self) -> Decimal:
+        return self.lev[2]
+
+    # Views are cached in the instance dict, which is only created on first read
+    @property
+    def quantity(self) -> Decimal:
+        try:
+            return self._quantity
+        except AttributeError:
+            self._quantity = self.inst.lots_to_qty(self.lots)
+            return self._quantity
+
+    @property
+    def average_entry_price(self) -> Decimal:
+        try:
+            return self._entry
+        except AttributeError:
+            self._entry = (Decimal(self.cost) / self.lots * self.inst.tick_size) if self.lots else Decimal("0")
+            return self._entry
+
+    @property
+    def margin(self) -> Decimal:
+        try:
+            return self._margin
+        except AttributeError:
+            self._margin = Decimal(self.margin_units) / FixedPointBroker.CASH_SCALE
+            return self._margin
+
+    @property
+    def notional_value(self) -> Decimal:
+        return self.quantity * self.average_entry_price * self.leverage
@@ -0,0 +1,166 @@
+# services/ccxt_support.py
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.enums import Side
+from services.event_sink import DEBUG
+
+
+class LeverageCache:
+    """
+    Last leverage / margin mode successfully set per symbol, so executors
+    only call the exchange when the requested value changes. Failed calls
+    are not cached and will be retried on the next order.
+    """
+
+    def __init__(self):
+        self.leverage = {}
+        self.margin_mode = {}
+        self._locks = defaultdict(threading.Lock)
+
+    def ensure(self, exchange, symbol, leverage, margin_mode=None) -> int:
+        """
+        Set leverage (and margin mode) on `exchange` if they differ from
+        the cached state. Returns the number of exchange calls made.
+        """
+        calls = 0
+        with self._locks[symbol]:
+            if margin_mode is not None and self.margin_mode.get(symbol) != margin_mode:
+                calls += 1
+                exchange.set_margin_mode(margin_mode, symbol)
+                self.margin_mode[symbol] = margin_mode
+            if self.leverage.get(symbol) != leverage:
+                calls += 1
+                exchange.set_leverage(leverage, symbol=symbol)
+                self.leverage[symbol] = leverage
+        return calls
+
+    def invalidate(self, symbol=None):
+        if symbol is None:
+            self.leverage.clear()
+            self.margin_mode.clear()
+        else:
+            self.leverage.pop(symbol, None)
+            self.margin_mode.pop(symbol, None)
+
+
+class OrderRejected(Exception):
+    """
+    The exchange answered an order request without accepting the order.
+    """
+
+
+def _checked(result):
+    """
+    `result` if it is an accepted order, else an `OrderRejected` for it.
+    Batch endpoints report a failed leg in place (`status: "rejected"`
+    or a `code`/`msg` error payload) instead of raising.
+    """
+    if isinstance(result, Exception):
+        return result
+    if not isinstance(result, dict) or not result.get("id"):
+        return OrderRejected(f"no order id in response: {result!r}")
+    if str(result.get("status") or "").lower() in ("rejected", "expired", "canceled", "cancelled"):
+        return OrderRejected(f"order {result['id']} {result['status']}: {result.get('info') or ''}")
+    return result
+
+
+class StageTimer:
+    """
+    Wall-clock milliseconds per named stage of one order submission.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._mark = self.started
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.stages[stage] = round((now - self._mark) * 1000, 3)
+        self._mark = now
+
+    def result(self, **fields) -> dict:
+        return {**fields, **self.stages, "total_ms": round((time.perf_counter() - self.started) * 1000, 3)}
+
+
+class CcxtOrderSupport:
+    """
+    Shared exchange plumbing for the ccxt-backed executors: cached
+    leverage setup, SL/TP placement in one round trip, and a per-order
+    latency breakdown in `self.latencies`.
+
+    Protective orders go out as a single `create_orders` batch when the
+    venue supports it (`exchange.has["createOrders"]`), otherwise the SL
+    and TP requests are sent concurrently from a small thread pool. A leg
+    only counts as placed when the exchange returned it with an `id` and
+    a status other than rejected; legs the batch failed (or all of them,
+    if the batch call raised) are sent again one by one, concurrently.
+    """
+    protective_workers = 2
+
+    def _init_order_support(self, margin_mode=None):
+        self.margin_mode = margin_mode
+        self.leverage_cache = LeverageCache()
+        self.latencies = deque(maxlen=1000)
+        self._protective_pool = None
+        self.reconciler = None  # OrderReconciler that follows resting orders to their fills
+
+    def _ensure_leverage(self, symbol, leverage):
+        self.leverage_cache.ensure(self.exchange, symbol, int(leverage or 1), self.margin_mode)
+
+    def _protective_specs(self, order, symbol, qty):
+        side = 'sell' if order.side == Side.BUY else 'buy'
+        specs = []
+        if order.stop_price:
+            specs.append(("SL", order.stop_price, dict(
+                symbol=symbol, type='STOP_MARKET', side=side, amount=qty,
+                params={'stopPrice': float(order.stop_price), 'closePosition': True})))
+        if order.take_profit:
+            specs.append(("TP", order.take_profit, dict(
+                symbol=symbol, type='TAKE_PROFIT_MARKET', side=side, amount=qty,
+                params={'stopPrice': float(order.take_profit), 'closePosition': True})))
+        return specs
+
+    def _place_protective(self, order, symbol, qty):
+        """
+        Place SL/TP for a just-acknowledged entry. Returns
+        [(label, price, result_or_exception), ...].
+        """
+        specs = self._protective_specs(order, symbol, qty)
+        if not specs:
+            return []
+
+        results = [None] * len(specs)
+        if len(specs) > 1 and self.exchange.has.get("createOrders"):
+            try:
+                batch = self.exchange.create_orders([spec for _, _, spec in specs])
+                results = [_checked(result) for result in batch] + results[len(batch):]
+            except Exception:
+                pass  # every leg is retried on its own below
+
+        retry = [i for i, result in enumerate(results) if result is None or isinstance(result, Exception)]
+        if len(retry) <= 1:
+            futures = None
+        else:
+            if self._protective_pool is None:
+                self._protective_pool = ThreadPoolExecutor(self.protective_workers,
+                                                           thread_name_prefix="protective")
+            futures = {i: self._protective_pool.submit(self.exchange.create_order, **specs[i][2]) for i in retry}
+
+        for i in retry:
+            try:
+                results[i] = _checked(futures[i].result() if futures else self.exchange.create_order(**specs[i][2]))
+            except Exception as e:
+                results[i] = e
+        return [(label, price, result) for (label, price, _), result in zip(specs, results)]
+
+    def _record_latency(self, timer: StageTimer, **fields):
+        breakdown = timer.result(**fields)
+        self.latencies.append(breakdown)
+        logger = getattr(self.broker, "logger", None) if self.broker is not None else None
+        if logger is not None:
+            logger.log_event("order_latency", DEBUG, **breakdown)
+        return breakdown
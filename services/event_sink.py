@@ -0,0 +1,264 @@
+# services/event_sink.py
+import json
+import logging
+import queue
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+# Standard logging levels, so sinks can be filtered like any Python logger
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+
+class EventSink:
+    """
+    Destination for structured trade/engine events.
+
+    An event is a flat dict with an `event` name, a `level` and arbitrary
+    fields. Producers call `enabled(level)` before building a record so a
+    filtered or silent sink costs one comparison per event.
+    """
+
+    def __init__(self, level=DEBUG):
+        self.level = level
+
+    def enabled(self, level) -> bool:
+        return level >= self.level
+
+    def emit(self, record: dict):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SilentSink(EventSink):
+    """
+    Drops everything; for sweeps, benchmarks and tests.
+    """
+
+    def __init__(self):
+        super().__init__(level=float("inf"))
+
+    def enabled(self, level) -> bool:
+        return False
+
+    def emit(self, record: dict):
+        pass
+
+
+class ConsoleSink(EventSink):
+    """
+    Prints each event as the human-readable line the backtester has always
+    shown. Synchronous, so meant for short or interactive runs.
+    """
+
+    def __init__(self, level=DEBUG, stream=None):
+        super().__init__(level)
+        self.stream = stream
+
+    def emit(self, record: dict):
+        formatter = CONSOLE_FORMATS.get(record["event"], _format_generic)
+        print(formatter(record), file=self.stream)
+
+
+class BufferedSink(EventSink):
+    """
+    Batches records in memory and writes them from a background thread.
+
+    `emit` only appends to a list; every `batch_size` records (or every
+    `flush_interval` seconds, whichever comes first) the batch is handed to
+    the writer thread, so the trading loop never waits on disk. `format`
+    is "jsonl" (one JSON object per line) or "parquet" (one row group per
+    batch; event-specific fields are kept as a JSON string column).
+    """
+
+    def __init__(self, path, format="jsonl", level=INFO, batch_size=1024, flush_interval=1.0):
+        if format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unknown event log format: {format}")
+        super().__init__(level)
+        self.path = path
+        self.format = format
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._batches = queue.Queue()
+        self._closed = False
+        self._writer = _JSONLWriter(path) if format == "jsonl" else _ParquetWriter(path)
+        self._thread = threading.Thread(target=self._drain, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: dict):
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._hand_off()
+
+    def flush(self):
+        """
+        Block until everything emitted so far is on disk.
+        """
+        self._hand_off()
+        self._batches.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._batches.put(None)
+        self._thread.join()
+        self._writer.close()
+
+    def _hand_off(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._batches.put(batch)
+
+    def _drain(self):
+        while True:
+            try:
+                batch = self._batches.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Idle: pick up a partial batch so a quiet live run still lands on disk
+                self._hand_off()
+                continue
+            try:
+                if batch is None:
+                    return
+                self._writer.write(batch)
+            finally:
+                self._batches.task_done()
+
+
+class _JSONLWriter:
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, batch):
+        self.file.write("".join(json.dumps(r, default=_json_default) + "\n" for r in batch))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        import pyarrow as pa
+
+        self.path = path
+        self.schema = pa.schema([
+            ("event", pa.string()),
+            ("level", pa.string()),
+            ("timestamp", pa.string()),
+            ("symbol", pa.string()),
+            ("fields", pa.string()),
+        ])
+        self.writer = None
+
+    def write(self, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        core = ("event", "level", "timestamp", "symbol")
+        columns = {name: [_text(r.get(name)) for r in batch] for name in core}
+        columns["fields"] = [
+            json.dumps({k: v for k, v in r.items() if k not in core}, default=_json_default) for r in batch
+        ]
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(pa.table(columns, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)  # exact; parse back with Decimal()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _text(value):
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+# --- console rendering, one line per event ---
+def _format_trade(r):
+    extra_info = ""
+    if r.get("stop_loss"):
+        extra_info += f" SL: {round(r['stop_loss'], 2)}"
+    if r.get("take_profit"):
+        extra_info += f" TP: {round(r['take_profit'], 2)}"
+    if r.get("tag"):
+        extra_info += f" Tag: {r['tag']}"
+    return (
+        f"🕒 {r['timestamp']} | 💼 Trade Executed: {r['side']} {round(r['quantity'], 4)} {r['symbol']}"
+        f" @ {round(r['price'], 2)} | Margin: {r['margin']:.2f} | {r['leverage']}x"
+        f" | Balance: {r['balance']:.2f}{extra_info} Type: {r['order_type']}"
+    )
+
+
+def _format_close(r):
+    pnl = r["pnl"]
+    direction = "📈" if pnl > 0 else "📉"
+    margin_str = f" | Margin Released: {r['margin_released']:.2f}" if r.get("margin_released") else ""
+    ts = r.get("timestamp") or "🕒"
+    return f"{ts} | 🔁 Position Closed: {r['symbol']} | Realized PnL: {direction} {pnl:+.2f}{margin_str}"
+
+
+def _format_profile(r):
+    lines = [f"\n⏱️ Stage profile | {r['sampled_bars']:,} of {r['bars']:,} bars timed (every {r['every']})",
+             f"{'stage':<16} {'calls':>9} {'total ms':>11} {'est. ms':>11} {'mean us':>10} "
+             f"{'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'share':>7}"]
+    for s in r["stages"]:
+        share = "-" if s["share"] is None else f"{s['share']:.1%}"
+        lines.append(f"{s['stage']:<16} {s['calls']:>9,} {s['total_ms']:>11,.1f} {s['est_total_ms']:>11,.1f} "
+                     f"{s['mean_ms'] * 1000:>10.2f} {s['p50_ms'] * 1000:>10.2f} {s['p90_ms'] * 1000:>10.2f} "
+                     f"{s['p99_ms'] * 1000:>10.2f} {share:>7}")
+    return "\n".join(lines)
+
+
+def _format_generic(r):
+    fields = " ".join(f"{k}={v}" for k, v in r.items() if k not in ("event", "level"))
+    return f"[{r['event']}] {fields}"
+
+
+CONSOLE_FORMATS = {
+    "trade": _format_trade,
+    "position_closed": _format_close,
+    "run_start": lambda r: f"🚀 Starting backtest with initial balance: {r['balance']:.2f}",
+    "run_end": lambda r: f"\n🏁 Final Account State | Balance: {r['balance']:.2f} | Margin Used: {r['margin']:.2f}",
+    "order_queued": lambda r: (
+        f"[MockExecutor] {r['order_type']} order queued: {r['side']} {r['quantity']} @ "
+        + (f"stop {r['stop_price']}" if r['order_type'] != "LIMIT" else f"{r['price']}")
+    ),
+    "order_rejected": lambda r: f"[MockExecutor] {r['order_type']} order rejected: {r['reason']}",
+    "order_cancelled": lambda r: f"[MockExecutor] Cancelled order {r['order_id']}",
+    "cancel_failed": lambda r: "[MockExecutor] Cannot cancel: Order already filled or unknown",
+    "exit_triggered": lambda r: f"🚨 Triggered exit for {r['symbol']}: SL={r['sl_hit']}, TP={r['tp_hit']}",
+    "engine_started": lambda r: f"🚀 Live engine started for {r['symbol']}",
+    "profile": _format_profile,
+    "tick": lambda r: f"📡 Tick @ {r['timestamp']} | Price: {r['price']} | RSI: {r.get('rsi')}",
+}
@@ -8,6 +8,8 @@ class OrderExecutor(ABC):
     All concrete executors (e.g., BinanceExecutor, MockExecutor)
     must implement this interface.
     """
+    # submit_order does network I/O; async engines call it from a worker thread
+    blocking = True
 
     @abstractmethod
     def submit_order(self, order: Order):
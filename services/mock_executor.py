@@ -3,6 +3,15 @@ from core.enums import OrderStatus, Side, OrderType
 from services.executor import OrderExecutor
 from uuid import uuid4
 from decimal import Decimal
+from datetime import datetime
+from collections import defaultdict
+from services.order_book import PendingOrderBook
+from services.trigger_index import TriggerIndex, FALLING, RISING
+from services.event_sink import DEBUG, INFO, WARNING
+from services.trade_logger import TradeLogger
+
+POSITION = "position"  # trigger key for a symbol's position SL/TP
+_console = TradeLogger()
 
 class MockExecutor(OrderExecutor):
     """
@@ -10,18 +19,53 @@ class MockExecutor(OrderExecutor):
 
     Good for local testing of trading logic and strategy behavior.
     """
+    blocking = False  # in-memory; safe to call inline from the event loop
 
     def __init__(self, broker=None):
-        self.broker = broker
         self.orders = {}
         self.trades = []
+        self.trades_by_order = defaultdict(list)  # order_id -> its fills in order, so callers never scan self.trades
+        self.books = defaultdict(PendingOrderBook)  # symbol -> resting LIMIT orders
+        self.triggers = defaultdict(TriggerIndex)  # symbol -> SL/TP levels and STOP triggers
+        # Set to hand triggered fills to the caller instead of booking them here (LiveEngine's reconcile task)
+        self.on_trade = None
+        self._broker = None
+        self.broker = broker
+
+    @property
+    def broker(self):
+        return self._broker
+
+    @broker.setter
+    def broker(self, broker):
+        # Follow the broker's positions so SL/TP levels are indexed as they change
+        if self._broker is not None:
+            self._broker.position_listeners.remove(self._on_position_change)
+        self._broker = broker
+        if broker is not None:
+            broker.position_listeners.append(self._on_position_change)
+            for symbol, pos in broker.positions.items():
+                self._on_position_change(symbol, pos)
 
+    def _on_position_change(self, symbol, pos):
+        index = self.triggers[symbol]
+        index.remove(POSITION)
+        if pos is None:
+            return
+        long = pos.side == Side.BUY
+        if pos.stop_loss:
+            index.add(POSITION, pos.stop_loss, FALLING if long else RISING)
+        if pos.take_profit:
+            index.add(POSITION, pos.take_profit, RISING if long else FALLING)
 
     def submit_order(self, order: Order) -> str:
         """
-        Handles MARKET and LIMIT orders for backtesting.
+        Handles MARKET, LIMIT, STOP and STOP_LIMIT orders for backtesting.
         MARKET orders are filled immediately.
         LIMIT orders are stored as PENDING and checked via check_pending_limits().
+        STOP and STOP_LIMIT orders wait on `stop_price` in the trigger index and
+        are released by check_exit_triggers().
+        The resulting trade, if any, is available as get_trade(order_id).
         """
         order_id = str(uuid4())
         self.orders[order_id] = order
@@ -38,19 +82,68 @@ class MockExecutor(OrderExecutor):
                 quantity=order.quantity,
                 timestamp=order.timestamp
             )
-            self.trades.append(trade)
+            self._record_fill(order_id, trade)
             return order_id
 
         elif order.order_type == OrderType.LIMIT:
             order.status = OrderStatus.PENDING
-            print(f"[MockExecutor] LIMIT order queued: {order.side.name} {order.quantity} @ {order.price}")
+            if order.price:
+                self.books[order.asset].add(order_id, order)
+            self._log("order_queued", DEBUG, order_id=order_id, symbol=order.asset, order_type="LIMIT",
+                      side=order.side.name, quantity=order.quantity, price=order.price)
+            return order_id
+
+        elif order.order_type in (OrderType.STOP, OrderType.STOP_LIMIT):
+            if not order.stop_price or (order.order_type == OrderType.STOP_LIMIT and not order.price):
+                order.status = OrderStatus.REJECTED
+                self._log("order_rejected", WARNING, order_id=order_id, symbol=order.asset,
+                          order_type=order.order_type.name, reason="missing stop/limit price")
+                return order_id
+            order.status = OrderStatus.PENDING
+            # Buy stops fire on the way up, sell stops on the way down
+            direction = RISING if order.side == Side.BUY else FALLING
+            self.triggers[order.asset].add(order_id, order.stop_price, direction)
+            self._log("order_queued", DEBUG, order_id=order_id, symbol=order.asset,
+                      order_type=order.order_type.name, side=order.side.name, quantity=order.quantity,
+                      stop_price=order.stop_price, price=order.price)
             return order_id
 
         else:
-            print(f"[MockExecutor] Unsupported order type: {order.order_type}")
+            self._log("order_rejected", WARNING, order_id=order_id, symbol=order.asset,
+                      order_type=order.order_type.name, reason="unsupported order type")
             return order_id
 
 
+    def _log(self, event, level, **fields):
+        # Executor events go to the broker's logger; without one, print as before
+        logger = self.broker.logger if self.broker is not None else None
+        (logger or _console).log_event(event, level, **fields)
+
+    def _record_fill(self, order_id: str, trade: Trade):
+        self.trades.append(trade)
+        self.trades_by_order[order_id].append(trade)
+
+    def _book(self, trade: Trade):
+        if self.on_trade is not None:
+            self.on_trade(trade)
+            return
+        self.broker.record_trade(trade)
+        if self.broker.logger:
+            self.broker.logger.log_trade(trade, self.broker)
+
+    def get_trade(self, order_id: str):
+        """
+        Return the latest trade produced by the given order, or None if it has not filled.
+        """
+        fills = self.trades_by_order.get(order_id)
+        return fills[-1] if fills else None
+
+    def get_trades(self, order_id: str) -> list:
+        """
+        Return every fill of the given order, oldest first.
+        """
+        return list(self.trades_by_order.get(order_id, ()))
+
     def cancel_order(self, order_id: str):
         """
         Simulate cancellation of an order (if not already filled).
@@ -58,9 +151,11 @@ class MockExecutor(OrderExecutor):
         order = self.orders.get(order_id)
         if order and order.status == OrderStatus.PENDING:
             order.status = OrderStatus.CANCELLED
-            print(f"[MockExecutor] Cancelled order {order_id}")
+            self.books[order.asset].remove(order_id)
+            self.triggers[order.asset].remove(order_id)
+            self._log("order_cancelled", DEBUG, order_id=order_id, symbol=order.asset)
         else:
-            print(f"[MockExecutor] Cannot cancel: Order already filled or unknown")
+            self._log("cancel_failed", WARNING, order_id=order_id)
 
     def fetch_order_status(self, order_id: str):
         """
@@ -70,77 +165,107 @@ class MockExecutor(OrderExecutor):
         return order.status if order else None
     
     def check_exit_triggers(self, snapshot):
-        # from decimal import Decimal  # to be safe
-        price_high = Decimal(snapshot.high)
-        price_low = Decimal(snapshot.low)
-        price_close = Decimal(snapshot.close)
-
-        triggered = []
-
-        for symbol, pos in list(self.broker.positions.items()):
-            sl = pos.stop_loss
-            tp = pos.take_profit
-            exit_side = Side.BUY if pos.side == Side.SELL else Side.SELL
-
-            
-            if pos.side == Side.BUY:
-                sl_hit = sl and price_low <= sl
-                tp_hit = tp and price_high >= tp
+        """
+        Fire every SL/TP and STOP trigger on the snapshot's symbol that the
+        bar's low/high range reached, found by bisecting the trigger index.
+        """
+        index = self.triggers.get(snapshot.symbol)
+        if not index:
+            return
+
+        for key in index.triggered(snapshot.low, snapshot.high):
+            if key == POSITION:
+                self._exit_position(snapshot)
             else:
-                sl_hit = sl and price_high >= sl
-                tp_hit = tp and price_low <= tp
-
-            if sl_hit or tp_hit:
-                print(f"🚨 Triggered exit for {symbol}: SL={sl_hit}, TP={tp_hit}")
-                exit_order = Order(
-                    asset=symbol,
-                    side=exit_side,
-                    quantity=pos.quantity,
-                    order_type=OrderType.MARKET,
-                    execution_price=price_close,
-                    timestamp=snapshot.timestamp,
-                    leverage=pos.leverage,
-                    client_tag="tp_exit" if tp_hit else "sl_exit"
-                )
-                self.submit_order(exit_order)
-                trade = Trade(order=exit_order, execution_price=price_close, quantity=pos.quantity, timestamp=snapshot.timestamp)
-                self.trades.append(trade)
-                self.broker.record_trade(trade)
-                if self.broker.logger:
-                    self.broker.logger.log_trade(trade, self.broker)
+                self._release_stop(key, snapshot)
+
+    def _exit_position(self, snapshot):
+        symbol = snapshot.symbol
+        pos = self.broker.positions.get(symbol)
+        if pos is None:
+            return
+
+        price_high = snapshot.high
+        price_low = snapshot.low
+        price_close = self.broker.quote(symbol, snapshot.close)
+        sl = pos.stop_loss
+        tp = pos.take_profit
+        exit_side = Side.BUY if pos.side == Side.SELL else Side.SELL
+
+        if pos.side == Side.BUY:
+            sl_hit = bool(sl) and price_low <= sl
+            tp_hit = bool(tp) and price_high >= tp
+        else:
+            sl_hit = bool(sl) and price_high >= sl
+            tp_hit = bool(tp) and price_low <= tp
+        if not (sl_hit or tp_hit):
+            return
+
+        self._log("exit_triggered", INFO, timestamp=snapshot.timestamp, symbol=symbol, sl_hit=sl_hit, tp_hit=tp_hit)
+        exit_order = Order(
+            asset=symbol,
+            side=exit_side,
+            quantity=pos.quantity,
+            order_type=OrderType.MARKET,
+            execution_price=price_close,
+            timestamp=snapshot.timestamp,
+            leverage=pos.leverage,
+            client_tag="tp_exit" if tp_hit else "sl_exit"
+        )
+        self._book(self.get_trade(self.submit_order(exit_order)))
+
+    def _release_stop(self, order_id, snapshot):
+        order = self.orders[order_id]
+        self.triggers[order.asset].remove(order_id)
+        if order.status != OrderStatus.PENDING:
+            return
+
+        if order.order_type == OrderType.STOP_LIMIT:
+            # Becomes a resting limit; check_pending_limits may fill it this bar
+            self.books[order.asset].add(order_id, order)
+            return
+
+        # STOP becomes a market order: fill at the stop, or at the open if the bar gapped through it
+        stop = self.broker.quote(order.asset, order.stop_price)
+        bar_open = self.broker.quote(order.asset, snapshot.open)
+        fill_price = max(stop, bar_open) if order.side == Side.BUY else min(stop, bar_open)
+
+        order.status = OrderStatus.FILLED
+        order.execution_price = fill_price
+        order.timestamp = snapshot.timestamp
+        trade = Trade(
+            order=order,
+            execution_price=fill_price,
+            quantity=order.quantity,
+            timestamp=snapshot.timestamp
+        )
+        self._record_fill(order_id, trade)
+        self._book(trade)
 
     def check_pending_limits(self, snapshot):
+        """
+        Fill resting LIMIT orders for the snapshot's symbol that the bar crossed:
+        buys whose price is at or above the low, sells at or below the high.
+        """
         filled = []
-        for order_id, order in list(self.orders.items()):
-            if order.status != OrderStatus.PENDING:
-                continue
-
-            if not order.price:
-                continue
-
-            limit_price = Decimal(order.price)
-            fill = False
-
-            if order.side == Side.BUY and snapshot.low <= limit_price:
-                fill = True
-            elif order.side == Side.SELL and snapshot.high >= limit_price:
-                fill = True
-
-            if fill:
-                order.status = OrderStatus.FILLED
-                order.execution_price = limit_price
-                order.timestamp = snapshot.timestamp
-
-                trade = Trade(
-                    order=order,
-                    execution_price=limit_price,
-                    quantity=order.quantity,
-                    timestamp=snapshot.timestamp
-                )
-                self.trades.append(trade)
-                self.broker.record_trade(trade)
-                if self.broker.logger:
-                    self.broker.logger.log_trade(trade, self.broker)
-
-                filled.append(order_id)
+        book = self.books.get(snapshot.symbol)
+        if not book:
+            return filled
+
+        for order_id, order in book.pop_crossed(snapshot.low, snapshot.high):
+            limit_price = self.broker.quote(order.asset, order.price)
+            order.status = OrderStatus.FILLED
+            order.execution_price = limit_price
+            order.timestamp = snapshot.timestamp
+
+            trade = Trade(
+                order=order,
+                execution_price=limit_price,
+                quantity=order.quantity,
+                timestamp=snapshot.timestamp
+            )
+            self._record_fill(order_id, trade)
+            self._book(trade)
+
+            filled.append(order_id)
         return filled
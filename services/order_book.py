@@ -0,0 +1,81 @@
+# services/order_book.py
+import heapq
+from decimal import Decimal
+from itertools import count
+
+from core.enums import Side
+
+
+class PendingOrderBook:
+    """
+    Resting LIMIT orders for one symbol, indexed by price.
+
+    Buy limits sit in a max-heap and sell limits in a min-heap, so a bar only
+    pops the orders its low/high actually crosses instead of walking every
+    order ever submitted. Ties at the same price fill in submission order.
+    Cancelled orders are dropped lazily when they surface at the top of a
+    heap; the heaps are rebuilt once dead entries outnumber live ones.
+    """
+
+    def __init__(self):
+        self._bids = []  # (-price, seq, order_id)
+        self._asks = []  # (price, seq, order_id)
+        self._live = {}  # order_id -> Order
+        self._dead = 0
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, order_id):
+        return order_id in self._live
+
+    def add(self, order_id: str, order):
+        price = Decimal(order.price)
+        self._live[order_id] = order
+        if order.side == Side.BUY:
+            heapq.heappush(self._bids, (-price, next(self._seq), order_id))
+        else:
+            heapq.heappush(self._asks, (price, next(self._seq), order_id))
+
+    def remove(self, order_id: str):
+        if self._live.pop(order_id, None) is not None:
+            self._dead += 1
+            if self._dead > len(self._live) + 64:
+                self._compact()
+
+    def pop_crossed(self, low, high) -> list:
+        """
+        Remove and return (order_id, order) for every buy limit at or above
+        `low` and every sell limit at or below `high`, best price first.
+        """
+        crossed = []
+        bids, asks, live = self._bids, self._asks, self._live
+
+        while bids and -bids[0][0] >= low:
+            order_id = heapq.heappop(bids)[2]
+            order = live.pop(order_id, None)
+            if order is not None:
+                crossed.append((order_id, order))
+            else:
+                self._dead -= 1
+
+        while asks and asks[0][0] <= high:
+            order_id = heapq.heappop(asks)[2]
+            order = live.pop(order_id, None)
+            if order is not None:
+                crossed.append((order_id, order))
+            else:
+                self._dead -= 1
+
+        return crossed
+
+    def orders(self):
+        return list(self._live.items())
+
+    def _compact(self):
+        self._bids = [e for e in self._bids if e[2] in self._live]
+        self._asks = [e for e in self._asks if e[2] in self._live]
+        heapq.heapify(self._bids)
+        heapq.heapify(self._asks)
+        self._dead = 0
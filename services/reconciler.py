@@ -0,0 +1,229 @@
+# services/reconciler.py
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from decimal import Decimal
+
+from core.enums import OrderStatus
+from core.models import Trade
+from services.event_sink import INFO, WARNING
+
+
+class _Tracked:
+    __slots__ = ("order", "filled", "cost", "missing")
+
+    def __init__(self, order):
+        self.order = order
+        self.filled = Decimal("0")
+        self.cost = Decimal("0")
+        self.missing = 0  # consecutive polls not listed as open
+
+
+class OrderReconciler:
+    """
+    Keeps resting exchange orders in sync with the Broker.
+
+    Orders are tracked per (executor, symbol). One poll costs two requests
+    per symbol with open orders, however many orders rest there:
+    `fetch_open_orders` to see which are still working, then
+    `fetch_my_trades` since the last fill seen, `page_limit` fills at a
+    time; a full page is followed by another (one more request each) so
+    a burst of fills is read completely. New fill quantity per order
+    becomes one `Trade` (VWAP of the new fills), so partial fills reach
+    the broker as they happen. Filled orders stop being tracked; one that
+    drops off the open list short of its quantity gets one more poll for
+    late fills, then is marked CANCELLED.
+
+    The poll interval drops to `min_interval` after a fill or a new order
+    and backs off by `backoff` towards `max_interval` while nothing
+    happens. At most `budget` requests are made per `window` seconds;
+    symbols left out by the budget are served first on the next poll.
+    """
+
+    def __init__(self, broker=None, on_trade=None, budget=60, window=60.0, min_interval=1.0, max_interval=30.0,
+                 backoff=1.5, lookback_ms=60_000, page_limit=100, logger=None, clock=time.monotonic):
+        self.broker = broker
+        self.on_trade = on_trade or self._record
+        self.budget = budget
+        self.window = window
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.lookback_ms = lookback_ms
+        self.page_limit = page_limit
+        self.logger = logger if logger is not None else getattr(broker, "logger", None)
+        self.clock = clock
+        self.interval = min_interval
+        self.open = {}        # (executor id, symbol) -> {order_id: _Tracked}
+        self._executors = {}  # executor id -> executor
+        self._since = {}      # group -> ms of the newest fill seen
+        self._seen = {}       # group -> fill ids at that ms (since is inclusive)
+        self._calls = deque() # clock() of each request within the window
+        self._stopped = False
+
+    # --- tracking ---
+    def track(self, executor, order_id: str, order):
+        key = (id(executor), order.asset)
+        self._executors[id(executor)] = executor
+        self.open.setdefault(key, {})[order_id] = _Tracked(order)
+        self._since.setdefault(key, int(time.time() * 1000) - self.lookback_ms)
+        self.interval = self.min_interval
+
+    def untrack(self, executor, order_id: str, symbol: str):
+        self.open.get((id(executor), symbol), {}).pop(order_id, None)
+
+    def open_orders(self) -> int:
+        return sum(len(orders) for orders in self.open.values())
+
+    # --- polling ---
+    def poll_once(self) -> list:
+        """
+        Reconcile as many symbols as the request budget allows and return
+        the new trades (not yet dispatched to `on_trade`).
+        """
+        trades = []
+        for key in list(self.open):
+            if not self.open[key]:
+                del self.open[key]
+                continue
+            if not self._take(2):
+                self._log("reconcile_budget_exhausted", WARNING, pending_symbols=len(self.open))
+                break
+            trades.extend(self._reconcile(key))
+            # Served: move to the back so starved symbols go first next time
+            self.open[key] = self.open.pop(key)
+
+        active = sum(1 for orders in self.open.values() if orders)
+        if trades or not active:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        # Never plan to poll faster than the budget sustains
+        floor = self.window * 2 * active / self.budget
+        self.interval = max(self.interval, floor)
+        return trades
+
+    def reconcile(self) -> list:
+        """
+        Synchronous poll that also dispatches the trades.
+        """
+        trades = self.poll_once()
+        for trade in trades:
+            self.on_trade(trade)
+        return trades
+
+    async def run(self):
+        """
+        Poll forever on the adaptive interval. Exchange calls run in a
+        worker thread; `on_trade` is called from the event loop.
+        """
+        self._stopped = False
+        while not self._stopped:
+            await asyncio.sleep(self.interval)
+            if not self.open:
+                continue
+            try:
+                trades = await asyncio.to_thread(self.poll_once)
+            except Exception as e:
+                self._log("reconcile_failed", WARNING, error=repr(e))
+                continue
+            for trade in trades:
+                self.on_trade(trade)
+
+    def stop(self):
+        self._stopped = True
+
+    def _reconcile(self, key) -> list:
+        executor = self._executors[key[0]]
+        symbol = key[1]
+        tracked = self.open[key]
+
+        # Open orders first: anything that closes after this call has its fills in the next one
+        open_ids = {o["id"] for o in executor.exchange.fetch_open_orders(symbol)}
+        new = {}
+        for fill in self._fetch_fills(executor.exchange, key, symbol):
+            if fill.get("order") in tracked:
+                new.setdefault(fill["order"], []).append(fill)
+
+        trades = []
+        for order_id, rows in new.items():
+            t = tracked[order_id]
+            qty = sum(Decimal(str(r["amount"])) for r in rows)
+            cost = sum(Decimal(str(r["amount"])) * Decimal(str(r["price"])) for r in rows)
+            t.filled += qty
+            t.cost += cost
+            trade = Trade(
+                order=t.order,
+                execution_price=cost / qty,
+                quantity=qty,
+                timestamp=datetime.utcfromtimestamp(max(r["timestamp"] for r in rows) / 1000),
+            )
+            if hasattr(executor, "trades"):
+                executor.trades.append(trade)
+            trades.append(trade)
+
+        for order_id, t in list(tracked.items()):
+            if t.filled >= t.order.quantity:
+                t.order.status = OrderStatus.FILLED
+            elif order_id in open_ids:
+                t.missing = 0
+                continue
+            elif t.missing == 0:
+                t.missing = 1
+                continue
+            else:
+                t.order.status = OrderStatus.CANCELLED
+                self._log("order_closed_unfilled", INFO, order_id=order_id, symbol=symbol, filled=t.filled)
+            if t.filled:
+                t.order.execution_price = t.cost / t.filled
+            del tracked[order_id]
+        return trades
+
+    def _fetch_fills(self, exchange, key, symbol) -> list:
+        """
+        Fills not seen before, paging through `fetch_my_trades` until a
+        short page. The cursor only moves to fills actually read, so a page
+        cut short by the budget is resumed on the next poll.
+        """
+        since, seen = self._since[key], self._seen.get(key, set())
+        fills = []
+        while True:
+            page = exchange.fetch_my_trades(symbol, since=since, limit=self.page_limit)
+            new = [f for f in page if f["id"] not in seen]
+            fills.extend(new)
+            if page:
+                newest = max(f["timestamp"] for f in page)
+                if newest > since:
+                    since, seen = newest, set()
+                seen |= {f["id"] for f in page if f["timestamp"] == since}
+            if len(page) < self.page_limit:
+                break
+            if not new:
+                # A full page of one millisecond: `since` cannot move past it
+                self._log("reconcile_page_stalled", WARNING, symbol=symbol, since=since)
+                break
+            if not self._take(1):
+                self._log("reconcile_budget_exhausted", WARNING, pending_symbols=len(self.open))
+                break
+        self._since[key], self._seen[key] = since, seen
+        return fills
+
+    def _take(self, n: int) -> bool:
+        now = self.clock()
+        calls = self._calls
+        while calls and calls[0] <= now - self.window:
+            calls.popleft()
+        if len(calls) + n > self.budget:
+            return False
+        calls.extend([now] * n)
+        return True
+
+    def _record(self, trade):
+        self.broker.record_trade(trade)
+        if self.broker.logger:
+            self.broker.logger.log_trade(trade, self.broker)
+
+    def _log(self, event, level, **fields):
+        if self.logger is not None:
+            self.logger.log_event(event, level, **fields)
@@ -1,51 +1,92 @@
+import logging
 from decimal import Decimal
 from services.broker import Broker
+from services.event_sink import ConsoleSink, INFO
 from core.models import Trade
 from core.enums import Side
 
 class TradeLogger:
-    def __init__(self):
-        pass
+    """
+    Turns trades, closes and engine events into structured records and
+    hands them to an `EventSink`.
+
+    The default sink prints the familiar console lines; pass `SilentSink()`
+    for quiet runs or `BufferedSink(path)` to write JSONL/Parquet from a
+    background thread. Records are only built when the sink accepts the
+    event's level.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink if sink is not None else ConsoleSink()
+
+    def enabled(self, level=INFO) -> bool:
+        return self.sink.enabled(level)
 
     def log_trade(self, trade: Trade, broker: Broker):
+        if not self.sink.enabled(INFO):
+            return
         order = trade.order
         symbol = order.asset
-        side = order.side.name
-        qty = round(trade.quantity, 4)
-        price = round(trade.execution_price, 2)
-        ts = trade.timestamp
 
         # Retrieve current margin and leverage
         pos = broker.get_position(symbol)
-        margin = round(pos.margin, 2) if pos else 0
-        leverage = order.leverage or 1
-        balance = round(broker.account_balance, 2)
-
-        # SL/TP/Tag extra info
-        extra_info = ""
-        if order.stop_price:
-            extra_info += f" SL: {round(order.stop_price, 2)}"
-        if order.take_profit:
-            extra_info += f" TP: {round(order.take_profit, 2)}"
-        if order.client_tag:
-            extra_info += f" Tag: {order.client_tag}"
-
-        print(
-            f"🕒 {ts} | 💼 Trade Executed: {side} {qty} {symbol} @ {price}"
-            f" | Margin: {margin:.2f} | {leverage}x | Balance: {balance:.2f}"
-            f"{extra_info} Type: {order.order_type.name}"
-        )
+        self.sink.emit({
+            "event": "trade",
+            "level": "INFO",
+            "timestamp": trade.timestamp,
+            "symbol": symbol,
+            "side": order.side.name,
+            "quantity": trade.quantity,
+            "price": trade.execution_price,
+            "margin": round(pos.margin, 2) if pos else 0,
+            "leverage": order.leverage or 1,
+            "balance": round(broker.account_balance, 2),
+            "stop_loss": order.stop_price,
+            "take_profit": order.take_profit,
+            "tag": order.client_tag,
+            "order_type": order.order_type.name,
+        })
 
     def log_close_position(self, symbol, pnl: Decimal, margin_released=None, timestamp=None):
-        direction = "📈" if pnl > 0 else "📉"
-        margin_str = f" | Margin Released: {margin_released:.2f}" if margin_released else ""
-        ts = timestamp or "🕒"
-        print(f"{ts} | 🔁 Position Closed: {symbol} | Realized PnL: {direction} {pnl:+.2f}{margin_str}")
+        if not self.sink.enabled(INFO):
+            return
+        self.sink.emit({
+            "event": "position_closed",
+            "level": "INFO",
+            "timestamp": timestamp,
+            "symbol": symbol,
+            "pnl": pnl,
+            "margin_released": margin_released,
+        })
 
     def log_start(self, starting_cash):
-        print(f"🚀 Starting backtest with initial balance: {starting_cash:.2f}")
+        self.log_event("run_start", INFO, balance=starting_cash)
+
+    def log_end(self, broker: Broker, profile=None):
+        self.log_event("run_end", INFO,
+                       balance=round(broker.account_balance, 2),
+                       margin=round(broker.get_total_margin(), 2))
+        if profile is not None:
+            self.log_profile(profile)
+        self.flush()
+
+    def log_profile(self, profile):
+        """
+        Emit a `StageProfiler`'s per-stage summary as one "profile" event.
+        """
+        if profile.sampled_bars or profile.samples:
+            self.log_event("profile", INFO, every=profile.every, bars=profile.bars,
+                           sampled_bars=profile.sampled_bars, stages=profile.summary())
+
+    def log_event(self, event: str, level=INFO, **fields):
+        """
+        Emit any other engine/executor event, e.g. an order being queued.
+        """
+        if self.sink.enabled(level):
+            self.sink.emit({"event": event, "level": logging.getLevelName(level), **fields})
+
+    def flush(self):
+        self.sink.flush()
 
-    def log_end(self, broker: Broker):
-        margin = round(broker.get_total_margin(), 2)
-        balance = round(broker.account_balance, 2)
-        print(f"\n🏁 Final Account State | Balance: {balance:.2f} | Margin Used: {margin:.2f}")
+    def close(self):
+        self.sink.close()
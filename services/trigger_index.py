@@ -0,0 +1,54 @@
+# services/trigger_index.py
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+
+FALLING = "falling"  # fires when the bar trades at or below the level
+RISING = "rising"    # fires when the bar trades at or above the level
+
+
+class TriggerIndex:
+    """
+    Price-triggered exits and stop orders for one symbol.
+
+    Levels live in two sorted lists, so the triggers hit by a bar's
+    [low, high] range are a bisect away: every FALLING level at or above
+    the low and every RISING level at or below the high. A key may own
+    several levels (a position's SL and TP); it is reported once.
+    """
+
+    def __init__(self):
+        self._falling = []  # (level, seq, key), ascending
+        self._rising = []   # (level, seq, key), ascending
+        self._entries = {}  # key -> [(direction, entry)]
+        self._seq = count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key, level, direction):
+        entry = (float(level), next(self._seq), key)
+        insort(self._falling if direction == FALLING else self._rising, entry)
+        self._entries.setdefault(key, []).append((direction, entry))
+
+    def remove(self, key):
+        for direction, entry in self._entries.pop(key, ()):
+            levels = self._falling if direction == FALLING else self._rising
+            i = bisect_left(levels, entry)
+            if i < len(levels) and levels[i] == entry:
+                del levels[i]
+
+    def triggered(self, low, high) -> list:
+        """
+        Keys whose levels the range [low, high] reaches, nearest level first.
+        """
+        hits = []
+        falling = self._falling
+        for i in range(len(falling) - 1, bisect_left(falling, (float(low),)) - 1, -1):
+            hits.append(falling[i][2])
+        rising = self._rising
+        for i in range(bisect_right(rising, (float(high), float("inf")))):
+            hits.append(rising[i][2])
+        return list(dict.fromkeys(hits))
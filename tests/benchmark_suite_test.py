@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+
+from benchmarks.compare import compare, main as compare_main
+from benchmarks.suite import CASES, run_suite
+from benchmarks.synthetic import generate_ohlcv, iter_ohlcv
+
+
+def test_generator_is_seeded_and_well_formed():
+    a = generate_ohlcv(50_000, seed=7)
+    b = generate_ohlcv(50_000, seed=7, chunk=50_000)
+    for name in a:
+        np.testing.assert_array_equal(a[name], b[name])
+    assert not np.array_equal(a["close"], generate_ohlcv(50_000, seed=8)["close"])
+
+    assert np.all(np.diff(a["timestamp"]) == 60_000)
+    assert np.all(a["high"] >= np.maximum(a["open"], a["close"]))
+    assert np.all(a["low"] <= np.minimum(a["open"], a["close"]))
+    np.testing.assert_array_equal(a["open"][1:], a["close"][:-1])
+    # Regime switches show up as very different volatility between windows
+    chunk_vol = [np.log(c["close"][1:] / c["close"][:-1]).std() for c in iter_ohlcv(50_000, seed=7, chunk=5_000)]
+    assert max(chunk_vol) > 1.5 * min(chunk_vol)
+
+
+def test_suite_reports_every_case(tmp_path):
+    report = run_suite(bars=3_000, seed=1, data_path=str(tmp_path))
+    assert report["meta"]["bars"] == 3_000
+    prefixes = {key.split(".")[0] for key in report["results"]}
+    assert prefixes == set(CASES)
+    results = dict(report["results"])
+    assert results.pop("broker.fixed_speedup")["unit"] == "x"
+    assert results.pop("vectorized.speedup")["unit"] == "x"
+    assert results["vectorized.event_loop"]["trades"] == results["vectorized.vectorized"]["trades"] > 0
+    assert all(r["value"] > 0 and r["unit"].endswith("/s") for r in results.values())
+    json.dumps(report)
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    base = {"meta": {"bars": 10}, "results": {"a": {"value": 100.0}, "b": {"value": 100.0}, "gone": {"value": 1.0}}}
+    head = {"meta": {"bars": 10}, "results": {"a": {"value": 85.0}, "b": {"value": 95.0}, "new": {"value": 1.0}}}
+    assert [(row[0], row[4]) for row in compare(base, head, threshold=0.1)] == [
+        ("a", "regressed"), ("b", "ok"), ("gone", "missing"), ("new", "new")]
+
+    (tmp_path / "base.json").write_text(json.dumps(base))
+    (tmp_path / "head.json").write_text(json.dumps(head))
+    assert compare_main([str(tmp_path / "base.json"), str(tmp_path / "head.json")]) == 1
+    assert compare_main([str(tmp_path / "base.json"), str(tmp_path / "head.json"), "--threshold", "0.2"]) == 0
+    assert "regression" in capsys.readouterr().out
@@ -0,0 +1,142 @@
+import contextlib
+import io
+import threading
+import time
+from decimal import Decimal
+
+from core.enums import OrderType, Side
+from core.models import Order
+from services.binance_executor import BinanceExecutor
+from services.bitget_executor import BitgetExecutor
+
+
+class FakeExchange:
+    """Records calls; every request takes `delay` seconds like an HTTP round trip."""
+
+    def __init__(self, delay=0.05, batch=False):
+        self.delay = delay
+        self.has = {"createOrders": batch}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _call(self, name, *args):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append((name, *args))
+
+    def set_leverage(self, leverage, symbol=None):
+        self._call("set_leverage", leverage, symbol)
+
+    def set_margin_mode(self, mode, symbol):
+        self._call("set_margin_mode", mode, symbol)
+
+    def _fill(self, price=100.0):
+        return {"id": str(len(self.calls)), "status": "closed", "average": price}
+
+    def create_market_buy_order(self, symbol, qty):
+        self._call("entry", symbol, qty)
+        return self._fill()
+
+    def create_market_order(self, symbol, side, qty):
+        self._call("entry", symbol, qty)
+        return self._fill()
+
+    def create_order(self, symbol, type, side, amount, params=None):
+        self._call("create_order", type)
+        return {"id": type}
+
+    def create_orders(self, orders):
+        self._call("create_orders", [o["type"] for o in orders])
+        return [{"id": o["type"]} for o in orders]
+
+
+def order(leverage=5, sl=None, tp=None):
+    return Order(asset="BTC/USDT", side=Side.BUY, quantity=Decimal("0.01"), order_type=OrderType.MARKET,
+                 leverage=leverage, stop_price=sl, take_profit=tp)
+
+
+def executor(cls, exchange, **kwargs):
+    ex = cls("key", "secret", **kwargs)
+    ex.exchange = exchange
+    return ex
+
+
+def names(exchange):
+    return [c[0] for c in exchange.calls]
+
+
+def test_leverage_is_only_set_when_it_changes():
+    fake = FakeExchange(delay=0)
+    ex = executor(BinanceExecutor, fake, margin_mode="isolated")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for lev in (5, 5, 5, 10, 10):
+            assert ex.submit_order(order(leverage=lev)) is not None
+    assert names(fake).count("set_leverage") == 2
+    assert names(fake).count("set_margin_mode") == 1
+    assert names(fake).count("entry") == 5
+
+
+def test_protective_orders_are_concurrent_or_batched():
+    fake = FakeExchange(delay=0.1)
+    ex = executor(BitgetExecutor, fake)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ex.submit_order(order(sl=Decimal("90"), tp=Decimal("120")))
+    breakdown = ex.latencies[-1]
+    assert names(fake).count("create_order") == 2
+    assert breakdown["protective_ms"] < 180  # two 100 ms requests overlapped
+    assert {"leverage_ms", "entry_ms", "protective_ms", "total_ms", "order_id"} <= set(breakdown)
+
+    fake = FakeExchange(delay=0, batch=True)
+    ex = executor(BinanceExecutor, fake)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ex.submit_order(order(sl=Decimal("90"), tp=Decimal("120")))
+    assert fake.calls[-1] == ("create_orders", ["STOP_MARKET", "TAKE_PROFIT_MARKET"])
+    assert "Stop-loss placed at 90" in out.getvalue() and "Take-profit placed at 120" in out.getvalue()
+
+
+class RejectingBatch(FakeExchange):
+    """`create_orders` rejects the stop-loss leg in place, as ccxt binance reports it, or raises."""
+
+    def __init__(self, raises=False):
+        super().__init__(delay=0, batch=True)
+        self.raises = raises
+
+    def create_orders(self, orders):
+        self._call("create_orders", [o["type"] for o in orders])
+        if self.raises:
+            raise ConnectionError("batch endpoint unavailable")
+        return [{"id": None, "status": "rejected", "info": {"code": -2021, "msg": "Order would immediately trigger"}},
+                {"id": "TAKE_PROFIT_MARKET", "status": "open"}]
+
+
+def test_rejected_batch_leg_is_placed_again():
+    fake = RejectingBatch()
+    ex = executor(BinanceExecutor, fake)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ex.submit_order(order(sl=Decimal("90"), tp=Decimal("120")))
+    # Only the rejected stop-loss goes out again
+    assert [c for c in fake.calls if c[0] in ("create_orders", "create_order")] == [
+        ("create_orders", ["STOP_MARKET", "TAKE_PROFIT_MARKET"]), ("create_order", "STOP_MARKET")]
+    assert "Stop-loss placed at 90" in out.getvalue() and "Take-profit placed at 120" in out.getvalue()
+
+
+def test_failed_batch_falls_back_to_single_orders():
+    fake = RejectingBatch(raises=True)
+    ex = executor(BitgetExecutor, fake)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ex.submit_order(order(sl=Decimal("90"), tp=Decimal("120")))
+    assert sorted(c[1] for c in fake.calls if c[0] == "create_order") == ["STOP_MARKET", "TAKE_PROFIT_MARKET"]
+    assert "SL placed at 90" in out.getvalue() and "TP placed at 120" in out.getvalue()
+
+
+def test_leg_rejected_twice_is_reported_as_failed():
+    class AlwaysRejects(RejectingBatch):
+        def create_order(self, symbol, type, side, amount, params=None):
+            self._call("create_order", type)
+            return {"id": None, "status": "rejected"}
+
+    ex = executor(BinanceExecutor, AlwaysRejects())
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ex.submit_order(order(sl=Decimal("90"), tp=Decimal("120")))
+    assert "Failed to place SL order" in out.getvalue() and "Stop-loss placed" not in out.getvalue()
+    assert "Take-profit placed at 120" in out.getvalue()
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backtest.dataloader import ColumnarOHLCVLoader
+
+
+def write_bars(root, symbol="BTCUSDT", timeframe="1m", n=2 * 1440):
+    ts = pd.date_range("2021-01-01", periods=n, freq="1min")
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(scale=0.003, size=n)))
+    df = pd.DataFrame({
+        "timestamp": ts,
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": np.ones(n),
+    })
+    path = root / symbol / f"{symbol}_{timeframe}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False, engine="pyarrow", coerce_timestamps="ms")
+    return df
+
+
+def test_window_is_inclusive_binary_search(tmp_path):
+    df = write_bars(tmp_path)
+    loader = ColumnarOHLCVLoader("BTCUSDT", "1m", start="2021-01-01 12:00",
+                                 end="2021-01-02", data_path=tmp_path)
+
+    expected = df[(df.timestamp >= "2021-01-01 12:00") & (df.timestamp <= "2021-01-02")]
+    assert len(loader) == len(expected)
+    np.testing.assert_array_equal(loader.load_arrays()["close"], expected.close.to_numpy())
+
+
+def test_stream_snapshots_matches_columns(tmp_path):
+    df = write_bars(tmp_path, n=300)
+    loader = ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path)
+    loader.chunk_size = 128
+
+    snapshots = list(loader.stream_snapshots())
+    assert len(snapshots) == 300
+    assert snapshots[0].timestamp == datetime(2021, 1, 1)
+    assert snapshots[-1].close == df.close.iloc[-1]
+    assert loader.snapshot_at(299) == snapshots[-1]
+
+
+def test_stream_snapshots_reuse_updates_one_object(tmp_path):
+    write_bars(tmp_path, n=300)
+    loader = ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path)
+    loader.chunk_size = 128
+
+    fresh = [(s.timestamp, s.close) for s in loader.stream_snapshots()]
+    seen, reused = set(), []
+    for s in loader.stream_snapshots(reuse=True):
+        seen.add(id(s))
+        reused.append((s.timestamp, s.close))
+    assert reused == fresh
+    assert len(seen) == 1
+
+
+def test_bar_cache_matches_parquet_and_invalidates(tmp_path):
+    import os
+    from backtest.bar_cache import BarCache, INDEX_STRIDE
+
+    write_bars(tmp_path, n=3 * INDEX_STRIDE + 17)
+    cache = BarCache(root=tmp_path / "cache")
+    kwargs = dict(start="2021-01-02 03:00", end="2021-01-03 10:30", data_path=tmp_path)
+
+    plain = ColumnarOHLCVLoader("BTCUSDT", "1m", **kwargs).load_arrays()
+    cached = ColumnarOHLCVLoader("BTCUSDT", "1m", cache=cache, **kwargs).load_arrays()
+    assert isinstance(cached["close"], np.memmap)
+    for name, col in plain.items():
+        np.testing.assert_array_equal(cached[name], col)
+
+    # Rewriting the source parquet produces a new cache entry and drops the old one
+    write_bars(tmp_path, n=100)
+    assert len(cache.get("BTCUSDT", "1m", ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path).path)) == 100
+    assert len(os.listdir(tmp_path / "cache" / "BTCUSDT")) == 1
@@ -0,0 +1,72 @@
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pyarrow.parquet as pq
+
+from core.enums import OrderType, Side
+from core.models import Order, Trade
+from services.broker import Broker
+from services.event_sink import BufferedSink, ConsoleSink, SilentSink, DEBUG, INFO, WARNING
+from services.mock_executor import MockExecutor
+from services.trade_logger import TradeLogger
+
+
+def make_trade(price="100.5"):
+    order = Order(asset="BTCUSDT", side=Side.BUY, quantity=Decimal("0.5"), order_type=OrderType.MARKET,
+                  execution_price=Decimal(price), leverage=2, client_tag="entry")
+    return Trade(order=order, execution_price=Decimal(price), quantity=Decimal("0.5"),
+                 timestamp=datetime(2024, 1, 1, 12))
+
+
+def test_console_sink_keeps_trade_line():
+    out = io.StringIO()
+    broker = Broker(account_balance=Decimal("1000"))
+    TradeLogger(ConsoleSink(stream=out)).log_trade(make_trade(), broker)
+    assert out.getvalue() == (
+        "🕒 2024-01-01 12:00:00 | 💼 Trade Executed: BUY 0.5000 BTCUSDT @ 100.50"
+        " | Margin: 0.00 | 2x | Balance: 1000.00 Tag: entry Type: MARKET\n"
+    )
+
+
+def test_level_filter_and_silent_sink():
+    out = io.StringIO()
+    logger = TradeLogger(ConsoleSink(level=WARNING, stream=out))
+    executor = MockExecutor(Broker(account_balance=Decimal("1000"), logger=logger))
+    executor.submit_order(Order(asset="BTCUSDT", side=Side.BUY, quantity=Decimal("1"),
+                                order_type=OrderType.LIMIT, price=Decimal("90")))
+    executor.cancel_order("missing")
+    assert out.getvalue() == "[MockExecutor] Cannot cancel: Order already filled or unknown\n"
+
+    assert not SilentSink().enabled(WARNING)
+
+
+def test_buffered_jsonl_sink_flushes_in_background(tmp_path):
+    path = tmp_path / "events.jsonl"
+    broker = Broker(account_balance=Decimal("1000"))
+    with BufferedSink(path, batch_size=4, level=INFO) as sink:
+        logger = TradeLogger(sink)
+        for i in range(10):
+            logger.log_trade(make_trade(f"{100 + i}.25"), broker)
+        logger.log_event("order_queued", DEBUG, order_id="x")  # below the sink level
+        logger.flush()
+        assert len(path.read_text().splitlines()) == 10
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [Decimal(r["price"]) for r in records] == [Decimal(f"{100 + i}.25") for i in range(10)]
+    assert records[0]["timestamp"] == "2024-01-01T12:00:00"
+    assert {r["event"] for r in records} == {"trade"}
+
+
+def test_buffered_parquet_sink(tmp_path):
+    path = tmp_path / "events.parquet"
+    with BufferedSink(path, format="parquet", batch_size=3) as sink:
+        logger = TradeLogger(sink)
+        logger.log_start(Decimal("1000"))
+        logger.log_close_position("BTCUSDT", Decimal("-1.5"), timestamp=datetime(2024, 1, 2))
+
+    table = pq.read_table(path).to_pylist()
+    assert [r["event"] for r in table] == ["run_start", "position_closed"]
+    assert table[1]["symbol"] == "BTCUSDT"
+    assert json.loads(table[1]["fields"])["pnl"] == "-1.5"
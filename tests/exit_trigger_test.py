@@ -0,0 +1,75 @@
+from datetime import datetime
+from decimal import Decimal
+
+from backtest.snapshot import MarketSnapshot
+from core.enums import OrderStatus, OrderType, Side
+from core.models import Order
+from services.broker import Broker
+from services.mock_executor import MockExecutor
+
+
+def bar(open_, high, low, close, symbol="BTCUSDT"):
+    return MarketSnapshot(symbol, datetime(2021, 1, 1, 0, 1), open_, high, low, close, 1.0)
+
+
+def make_executor():
+    executor = MockExecutor()
+    executor.broker = Broker(account_balance=Decimal("10000"))
+    return executor
+
+
+def enter(executor, side, price, sl=None, tp=None):
+    order = Order(asset="BTCUSDT", side=side, quantity=Decimal("1"), order_type=OrderType.MARKET,
+                  execution_price=Decimal(price), stop_price=sl and Decimal(sl), take_profit=tp and Decimal(tp),
+                  timestamp=datetime(2021, 1, 1))
+    executor.broker.record_trade(executor.get_trade(executor.submit_order(order)))
+
+
+def test_position_levels_follow_broker_and_fire_once(capsys):
+    executor = make_executor()
+    enter(executor, Side.BUY, "100", sl="95", tp="110")
+    assert "position" in executor.triggers["BTCUSDT"]
+
+    executor.check_exit_triggers(bar(100, 105, 96, 101))
+    assert "BTCUSDT" in executor.broker.positions
+
+    executor.check_exit_triggers(bar(100, 111, 99, 108))
+    assert "BTCUSDT" not in executor.broker.positions
+    assert executor.trades[-1].order.client_tag == "tp_exit"
+    assert executor.trades[-1].execution_price == Decimal(108)
+    assert len(executor.triggers["BTCUSDT"]) == 0
+
+
+def test_short_stop_loss_and_other_symbols(capsys):
+    executor = make_executor()
+    enter(executor, Side.SELL, "100", sl="104")
+
+    executor.check_exit_triggers(bar(100, 120, 90, 100, symbol="ETHUSDT"))
+    assert "BTCUSDT" in executor.broker.positions
+
+    executor.check_exit_triggers(bar(101, 104, 100, 103))
+    assert executor.trades[-1].order.client_tag == "sl_exit"
+    assert executor.broker.account_balance == Decimal("9997")
+
+
+def test_stop_and_stop_limit_orders(capsys):
+    executor = make_executor()
+    stop = executor.submit_order(Order(asset="BTCUSDT", side=Side.BUY, quantity=Decimal("1"),
+                                       order_type=OrderType.STOP, stop_price=Decimal("105")))
+    stop_limit = executor.submit_order(Order(asset="BTCUSDT", side=Side.SELL, quantity=Decimal("1"),
+                                             order_type=OrderType.STOP_LIMIT, stop_price=Decimal("95"),
+                                             price=Decimal("97")))
+
+    executor.check_exit_triggers(bar(100, 104, 96, 100))
+    assert executor.fetch_order_status(stop) == OrderStatus.PENDING
+
+    # Gap through the stop: fills at the open, and the stop price is not used as a stop-loss
+    executor.check_exit_triggers(bar(107, 109, 106, 108))
+    assert executor.get_trade(stop).execution_price == Decimal(107)
+    assert executor.broker.positions["BTCUSDT"].stop_loss is None
+
+    # Stop-limit triggers at 95 but only fills once the bar trades up to the 97 limit
+    executor.check_exit_triggers(bar(96, 96, 94.5, 95))
+    assert executor.check_pending_limits(bar(96, 96, 94.5, 95)) == []
+    assert executor.check_pending_limits(bar(95, 97.5, 95, 97)) == [stop_limit]
+    assert executor.get_trade(stop_limit).execution_price == Decimal(97)
@@ -0,0 +1,116 @@
+import itertools
+import threading
+import time
+from collections import Counter
+
+
+class FakeExchange:
+    """
+    In-memory stand-in for a ccxt exchange, enough to run executors and
+    the order reconciler offline.
+
+    Market orders fill immediately at `prices[symbol]`; limit orders rest
+    until `fill(order_id, amount, price)` is called, which may fill them
+    partially. `fetch_my_trades` returns at most `limit` fills, oldest
+    first, like a real exchange. `requests` counts calls per ccxt method
+    so tests can check request budgets.
+    """
+
+    def __init__(self, prices=None):
+        self.has = {"createOrders": True, "fetchOpenOrders": True, "fetchMyTrades": True}
+        self.prices = dict(prices or {})
+        self.orders = {}
+        self.my_trades = []
+        self.leverage = {}
+        self.requests = Counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # --- order entry ---
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.requests["create_order"] += 1
+        with self._lock:
+            order_id = str(next(self._ids))
+            order = {
+                "id": order_id, "symbol": symbol, "type": type.lower(), "side": side, "amount": float(amount),
+                "price": price, "filled": 0.0, "status": "open", "average": None, "params": params or {},
+            }
+            self.orders[order_id] = order
+        if order["type"] == "market":
+            self.fill(order_id, amount, self.prices.get(symbol, price))
+        return dict(order)
+
+    def create_orders(self, orders):
+        self.requests["create_orders"] += 1
+        self.requests["create_order"] -= len(orders)
+        return [self.create_order(**o) for o in orders]
+
+    def create_market_order(self, symbol, side, amount):
+        return self.create_order(symbol, "market", side, amount)
+
+    def create_limit_order(self, symbol, side, amount, price):
+        return self.create_order(symbol, "limit", side, amount, price)
+
+    def create_market_buy_order(self, symbol, amount):
+        return self.create_order(symbol, "market", "buy", amount)
+
+    def create_market_sell_order(self, symbol, amount):
+        return self.create_order(symbol, "market", "sell", amount)
+
+    def create_limit_buy_order(self, symbol, amount, price):
+        return self.create_order(symbol, "limit", "buy", amount, price)
+
+    def create_limit_sell_order(self, symbol, amount, price):
+        return self.create_order(symbol, "limit", "sell", amount, price)
+
+    def cancel_order(self, order_id, symbol=None):
+        self.requests["cancel_order"] += 1
+        with self._lock:
+            order = self.orders[order_id]
+            if order["status"] == "open":
+                order["status"] = "canceled"
+            return dict(order)
+
+    def set_leverage(self, leverage, symbol=None):
+        self.requests["set_leverage"] += 1
+        self.leverage[symbol] = leverage
+
+    # --- simulation ---
+    def fill(self, order_id, amount, price, timestamp=None):
+        """
+        Execute `amount` of a resting order at `price` (at `timestamp` ms, default now).
+        """
+        with self._lock:
+            order = self.orders[order_id]
+            amount = min(float(amount), round(order["amount"] - order["filled"], 12))
+            if amount <= 0:
+                return
+            cost = (order["average"] or 0.0) * order["filled"] + amount * float(price)
+            order["filled"] += amount
+            order["average"] = cost / order["filled"]
+            if order["filled"] >= order["amount"] - 1e-12:
+                order["status"] = "closed"
+            self.my_trades.append({
+                "id": str(len(self.my_trades) + 1), "order": order_id, "symbol": order["symbol"],
+                "side": order["side"], "amount": amount, "price": float(price),
+                "timestamp": int(time.time() * 1000) if timestamp is None else timestamp,
+            })
+
+    # --- queries ---
+    def fetch_order(self, order_id, symbol=None):
+        self.requests["fetch_order"] += 1
+        return dict(self.orders[order_id])
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        self.requests["fetch_open_orders"] += 1
+        with self._lock:
+            return [dict(o) for o in self.orders.values()
+                    if o["status"] == "open" and (symbol is None or o["symbol"] == symbol)]
+
+    def fetch_my_trades(self, symbol=None, since=None, limit=None, params=None):
+        self.requests["fetch_my_trades"] += 1
+        with self._lock:
+            fills = sorted((t for t in self.my_trades
+                            if (symbol is None or t["symbol"] == symbol) and (since is None or t["timestamp"] >= since)),
+                           key=lambda t: t["timestamp"])
+            return [dict(t) for t in fills[:limit]]
@@ -0,0 +1,87 @@
+import contextlib
+import io
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from backtest.dataloader import ColumnarOHLCVLoader
+from backtest.engine import BacktestEngine
+from columnar_loader_test import write_bars
+from core.enums import OrderType, Side
+from core.models import Instrument, Order, Trade
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+from services.broker import Broker, FixedPointBroker
+
+
+def trade(side, qty, price, leverage=5):
+    order = Order(asset="BTCUSDT", side=side, quantity=Decimal(qty), order_type=OrderType.MARKET,
+                  leverage=leverage, timestamp=datetime(2021, 1, 1))
+    return Trade(order=order, execution_price=Decimal(price), quantity=Decimal(qty), timestamp=order.timestamp)
+
+
+@pytest.mark.parametrize("sequence", [
+    [(Side.BUY, "0.5", "30000.10"), (Side.BUY, "0.25", "30100.55"), (Side.SELL, "0.3", "30200.00"),
+     (Side.SELL, "1.0", "29950.25"), (Side.BUY, "0.55", "29800.01")],
+    [(Side.SELL, "2", "100.03"), (Side.BUY, "0.7", "99.99"), (Side.BUY, "1.3", "101.10")],
+])
+def test_fixed_point_ledger_matches_decimal(sequence):
+    decimal, fixed = Broker(Decimal("10000")), FixedPointBroker(Decimal("10000"))
+    for side, qty, price in sequence:
+        decimal.record_trade(trade(side, qty, price))
+        fixed.record_trade(trade(side, qty, price))
+
+        assert fixed.account_balance == pytest.approx(decimal.account_balance, abs=Decimal("1e-8"))
+        assert fixed.get_total_margin() == pytest.approx(decimal.get_total_margin(), abs=Decimal("1e-8"))
+        assert fixed.positions.keys() == decimal.positions.keys()
+        for symbol, pos in decimal.positions.items():
+            assert fixed.positions[symbol].quantity == pos.quantity
+            assert fixed.positions[symbol].side == pos.side
+            assert fixed.positions[symbol].average_entry_price == pytest.approx(pos.average_entry_price)
+
+
+def test_prices_snap_to_the_instrument_grid():
+    broker = FixedPointBroker(Decimal("1000"), instruments={"ETHUSDT": Instrument("ETHUSDT", Decimal("0.05"), Decimal("0.001"))})
+    assert broker.quote("ETHUSDT", 2000.024) == 2000.0
+    assert broker.quote("ETHUSDT", 2000.026) == 2000.05
+    assert broker.quote("ETHUSDT", Decimal("2000.075")) == 2000.1  # tie: ticks round half to even
+    assert broker.instrument("ETHUSDT").price_to_ticks(broker.quote("ETHUSDT", 2000.026)) == 40001
+    with pytest.raises(ValueError):
+        FixedPointBroker(Decimal("1000"), instruments={"X": Instrument("X", Decimal("1e-6"), Decimal("1e-6"))}).record_trade(
+            Trade(order=Order(asset="X", side=Side.BUY, quantity=Decimal(1), order_type=OrderType.MARKET),
+                  execution_price=Decimal(1), quantity=Decimal(1)))
+
+
+def test_ledger_stays_in_integers_until_read():
+    broker = FixedPointBroker(Decimal("10000"))
+    broker.record_trade(trade(Side.BUY, "0.5", "30000.10"))
+    broker.record_trade(trade(Side.SELL, "0.2", "30100.00"))
+
+    pos = broker.get_position("BTCUSDT")
+    assert (pos.lots, pos.cost, pos.margin_units) == (3000, 3000 * 3000010, 180_000_600_000)
+    assert not any(hasattr(pos, view) for view in ("_quantity", "_entry", "_margin"))
+    assert pos.quantity == Decimal("0.3") and pos.average_entry_price == Decimal("30000.10")
+    assert pos.margin == Decimal("1800.006") and pos.leverage == Decimal("5")
+    assert broker._realized == [1_998_000_000]
+    assert broker.realized_pnl == [Decimal("19.98")]
+    assert broker.account_balance == Decimal("10019.98")
+
+
+def test_backtest_accounting_modes_agree(tmp_path):
+    write_bars(tmp_path, n=4000)
+    results = {}
+    for mode in ("decimal", "fixed"):
+        engine = BacktestEngine(
+            strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT", size_fraction=0.3, leverage=5, sl_pct=0.05, tp_pct=0.1),
+            symbol="BTCUSDT", timeframe="1m", indicators={"rsi": RSIIndicator(period=14)},
+            loader=ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path), accounting=mode,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run()
+        results[mode] = engine.broker
+
+    decimal, fixed = results["decimal"], results["fixed"]
+    assert [t.order.client_tag for t in fixed.trades] == [t.order.client_tag for t in decimal.trades]
+    # Fills land on the 0.01 tick grid in fixed mode, so allow a tick's worth per trade
+    assert float(fixed.account_balance) == pytest.approx(float(decimal.account_balance), abs=0.01 * len(decimal.trades))
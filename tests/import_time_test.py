@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("ccxt", "pyspark", "matplotlib", "pandas", "pyarrow", "websockets")
+
+# Measured with numpy, which is over half of it: ~95 ms on the reference machine. 3x leaves room for slow CI
+# but a new eager heavy import still trips it; the startup benchmark (`benchmarks.suite --only startup`) tracks trends
+IMPORT_BUDGET_US = 300_000
+
+
+def loaded_heavy(script: str, *args) -> list:
+    """
+    Heavy top-level packages in `sys.modules` after running `script` in a fresh interpreter.
+    """
+    check = f"\nimport sys\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}} & {set(HEAVY)!r})))"
+    result = subprocess.run([sys.executable, "-c", script + check, *args], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return result.stdout.split()
+
+
+def import_time_us(module: str) -> int:
+    """
+    Cumulative microseconds `python -X importtime` reports for `module`.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        _, _, rest = line.partition("import time:")
+        fields = rest.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+def test_backtest_engine_import_budget():
+    # Best of three fresh interpreters, so one scheduling hiccup does not fail the run
+    best = min(import_time_us("backtest.engine") for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import backtest.engine took {best / 1000:.0f} ms"
+
+
+def test_entry_points_defer_heavy_dependencies():
+    for module in ("backtest.engine", "backtest.sweep", "run_backtest", "services.binance_executor",
+                   "services.bitget_executor", "live.engine", "live.data_feed"):
+        assert loaded_heavy(f"import {module}") == [], f"{module} imports heavy modules eagerly"
+
+
+def test_cached_backtest_starts_without_pyarrow(tmp_path):
+    n = 1440
+    ts = pd.date_range("2021-01-01", periods=n, freq="1min")
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(scale=0.003, size=n)))
+    path = tmp_path / "BTCUSDT" / "BTCUSDT_1m.parquet"
+    path.parent.mkdir()
+    pd.DataFrame({"timestamp": ts, "open": close, "high": close + 1, "low": close - 1, "close": close,
+                  "volume": np.ones(n)}).to_parquet(path, index=False, coerce_timestamps="ms")
+
+    script = f"""
+from backtest.engine import BacktestEngine
+from backtest.dataloader import CachedOHLCVLoader
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+from services.event_sink import SilentSink
+from services.trade_logger import TradeLogger
+
+engine = BacktestEngine(strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT"), symbol="BTCUSDT",
+                        timeframe="1m", loader=CachedOHLCVLoader("BTCUSDT", "1m", data_path={str(tmp_path)!r}),
+                        indicators={{"rsi": RSIIndicator(period=14)}}, logger=TradeLogger(SilentSink()))
+engine.run()
+"""
+    # The first run builds the bar cache from parquet; the second starts from it
+    assert "pyarrow" in loaded_heavy(script)
+    assert loaded_heavy(script) == []
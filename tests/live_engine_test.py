@@ -0,0 +1,187 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from backtest.snapshot import MarketSnapshot
+from core.enums import OrderStatus, OrderType, Side
+from core.models import Order, Trade
+from live.engine import LiveEngine
+from services.broker import Broker
+from services.mock_executor import MockExecutor
+from services.event_sink import EventSink
+from services.trade_logger import TradeLogger
+
+
+class ListFeed:
+    def __init__(self, count):
+        start = datetime(2024, 1, 1)
+        self.items = [MarketSnapshot("BTC/USDT", start + timedelta(minutes=i), 100, 100, 100, 100, 1)
+                      for i in range(count)]
+
+    async def snapshots(self):
+        for snapshot in self.items:
+            yield snapshot
+
+
+class SlowExecutor:
+    """Blocking executor whose every submit takes `delay` seconds, like an exchange round trip."""
+
+    def __init__(self, broker, delay):
+        self.broker = broker
+        self.delay = delay
+
+    def submit_order(self, order):
+        time.sleep(self.delay[order.client_tag] if isinstance(self.delay, dict) else self.delay)
+        order.status = OrderStatus.FILLED
+        return Trade(order=order, execution_price=Decimal("100"), quantity=order.quantity, timestamp=order.timestamp)
+
+    def check_exit_triggers(self, snapshot):
+        pass
+
+
+class BuyEveryBar:
+    def __init__(self):
+        self.seen = []
+
+    def on_data(self, data):
+        pos = self.broker.get_position(data.symbol)
+        self.seen.append(pos.quantity if pos else Decimal("0"))
+        return [Order(asset=data.symbol, side=Side.BUY, quantity=Decimal("0.01"), order_type=OrderType.MARKET)]
+
+
+FOUR_SYMBOLS = ("BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT")
+
+
+class BuyFourSymbols:
+    def on_data(self, data):
+        return [Order(asset=symbol, side=Side.BUY, quantity=Decimal("0.01"), order_type=OrderType.MARKET)
+                for symbol in FOUR_SYMBOLS]
+
+
+class FlipOnSecondBar:
+    def __init__(self):
+        self.bars = 0
+
+    def on_data(self, data):
+        self.bars += 1
+        if self.bars == 1:
+            return [Order(asset=data.symbol, side=Side.BUY, quantity=Decimal("0.01"), order_type=OrderType.MARKET,
+                          client_tag="entry")]
+        return [Order(asset=data.symbol, side=Side.SELL, quantity=Decimal("0.01"), order_type=OrderType.MARKET,
+                      client_tag="close"),
+                Order(asset=data.symbol, side=Side.SELL, quantity=Decimal("0.01"), order_type=OrderType.MARKET,
+                      client_tag="reentry")]
+
+
+class BuyOnceWithStop:
+    def __init__(self):
+        self.seen = []
+
+    def on_data(self, data):
+        pos = self.broker.get_position(data.symbol)
+        self.seen.append(pos.stop_loss if pos else None)
+        if self.seen == [None]:
+            return [Order(asset=data.symbol, side=Side.BUY, quantity=Decimal("0.01"), order_type=OrderType.MARKET,
+                          stop_price=Decimal("95"))]
+        return []
+
+
+class Recorder(EventSink):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def emit(self, record):
+        self.events.append(record["event"])
+
+
+def test_slow_order_io_runs_concurrently_across_symbols():
+    sink = Recorder()
+    broker = Broker(account_balance=Decimal("1000"), logger=TradeLogger(sink))
+    engine = LiveEngine(BuyFourSymbols, SlowExecutor(broker, delay=0.1), feed=ListFeed(2), order_workers=4)
+
+    started = time.perf_counter()
+    asyncio.run(engine.run_async())
+    elapsed = time.perf_counter() - started
+
+    assert len(broker.trades) == 8
+    assert all(broker.get_position(symbol).quantity == Decimal("0.02") for symbol in FOUR_SYMBOLS)
+    assert elapsed < 0.5  # each candle's four 100 ms submits overlap instead of taking 0.8 s
+    assert len(engine.latencies) == 8
+    assert sink.events.count("order_latency") == 8
+
+
+def test_next_candle_sees_the_booked_position():
+    broker = Broker(account_balance=Decimal("1000"))
+    engine = LiveEngine(BuyEveryBar, SlowExecutor(broker, delay=0.02), feed=ListFeed(5))
+
+    asyncio.run(engine.run_async())
+
+    assert engine.strategy.seen == [Decimal("0"), Decimal("0.01"), Decimal("0.02"), Decimal("0.03"), Decimal("0.04")]
+
+
+def test_flip_legs_are_booked_in_order():
+    broker = Broker(account_balance=Decimal("1000"))
+    # The close leg is the slow one; with parallel submits the re-entry used to be booked first
+    executor = SlowExecutor(broker, delay={"entry": 0.0, "close": 0.1, "reentry": 0.0})
+    engine = LiveEngine(FlipOnSecondBar, executor, feed=ListFeed(2), order_workers=4)
+
+    asyncio.run(engine.run_async())
+
+    assert [t.order.client_tag for t in broker.trades] == ["entry", "close", "reentry"]
+    pos = broker.get_position("BTC/USDT")
+    assert pos.side == Side.SELL and pos.quantity == Decimal("0.01")
+
+
+def test_order_timeout_books_the_late_fill():
+    sink = Recorder()
+    broker = Broker(account_balance=Decimal("1000"), logger=TradeLogger(sink))
+    engine = LiveEngine(BuyEveryBar, SlowExecutor(broker, delay=0.3), feed=ListFeed(2), order_timeout=0.05)
+
+    asyncio.run(engine.run_async())
+
+    assert sink.events.count("order_timeout") == 2
+    # The exchange filled both orders after the timeout; the broker must still know about them
+    assert len(broker.trades) == 2
+    assert broker.get_position("BTC/USDT").quantity == Decimal("0.02")
+
+
+def test_slow_symbol_does_not_hold_back_other_symbols():
+    sink = Recorder()
+    broker = Broker(account_balance=Decimal("1000"), logger=TradeLogger(sink))
+    executor = SlowExecutor(broker, delay=0)
+    submit = executor.submit_order
+    executor.submit_order = lambda order: time.sleep(0.3 if order.asset == "BTC/USDT" else 0) or submit(order)
+    feed = ListFeed(0)
+    start = datetime(2024, 1, 1)
+    feed.items = [MarketSnapshot(symbol, start + timedelta(minutes=i), 100, 100, 100, 100, 1)
+                  for i, symbol in enumerate(["BTC/USDT", "BTC/USDT", "ETH/USDT", "ETH/USDT"])]
+    engine = LiveEngine(BuyEveryBar, executor, feed=feed, order_timeout=0.05)
+
+    asyncio.run(engine.run_async())
+
+    # ETH is evaluated and booked while BTC's first order is still out; BTC's second candle waits for it
+    assert [t.order.asset for t in broker.trades] == ["ETH/USDT", "ETH/USDT", "BTC/USDT", "BTC/USDT"]
+    assert engine.strategy.seen == [Decimal("0"), Decimal("0"), Decimal("0.01"), Decimal("0.01")]
+    assert sink.events.count("order_timeout") == 2 and sink.events.count("order_late_result") == 2
+
+
+def test_simulated_exit_is_booked_by_the_reconcile_task():
+    broker = Broker(account_balance=Decimal("1000"))
+    executor = MockExecutor(broker)
+    feed = ListFeed(0)
+    start = datetime(2024, 1, 1)
+    feed.items = [MarketSnapshot("BTC/USDT", start, 100, 100, 100, 100, 1),
+                  MarketSnapshot("BTC/USDT", start + timedelta(minutes=1), 100, 100, 90, 91, 1)]
+    engine = LiveEngine(BuyOnceWithStop, executor, feed=feed)
+    booked = []
+    record_trade = broker.record_trade
+    broker.record_trade = lambda trade: booked.append(trade.order.client_tag) or record_trade(trade)
+
+    asyncio.run(engine.run_async())
+
+    assert booked == [None, "sl_exit"]
+    assert executor.on_trade is None  # the engine's hook is removed when it stops
+    # The strategy ran after the stop-out was booked
+    assert engine.strategy.seen == [None, None]
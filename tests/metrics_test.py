@@ -0,0 +1,94 @@
+import contextlib
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from backtest.dataloader import ColumnarOHLCVLoader
+from backtest.engine import BacktestEngine
+from backtest.equity import EquityCurve
+from backtest.metrics import max_drawdown_duration, performance_report
+from columnar_loader_test import write_bars
+from core.enums import Side
+from core.models import Position
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+from services.broker import Broker
+
+
+def test_equity_curve_marks_positions_and_downsamples():
+    broker = Broker(account_balance=Decimal("1000"))
+    broker.positions["BTCUSDT"] = Position(symbol="BTCUSDT", quantity=Decimal("2"), average_entry_price=Decimal("100"),
+                                           side=Side.SELL, leverage=Decimal("1"), margin=Decimal("200"))
+    curve = EquityCurve(every=3, capacity=1)
+    start = datetime(2024, 1, 1)
+    for i in range(10):
+        curve.update(broker, "BTCUSDT", 100 + i, start + timedelta(minutes=i))
+    curve.finish(broker, "BTCUSDT", 109, start + timedelta(minutes=9))
+
+    arrays = curve.arrays()
+    assert len(curve) == 4  # bars 0, 3, 6, 9; finish replaces bar 9
+    np.testing.assert_array_equal(arrays["unrealized"], [0, -6, -12, -18])
+    np.testing.assert_array_equal(arrays["equity"], [1000, 994, 988, 982])
+    assert arrays["margin"].tolist() == [200] * 4
+    assert arrays["timestamp"][1] - arrays["timestamp"][0] == 3 * 60_000
+    assert arrays["timestamp"][0] == np.datetime64(start, "ms").astype("int64")
+
+
+def test_performance_report_on_known_curve():
+    class Curve:
+        def arrays(self):
+            day = 24 * 3600 * 1000
+            return {
+                "timestamp": np.arange(5) * day,
+                "equity": np.array([100.0, 110.0, 99.0, 121.0, 110.0]),
+                "margin": np.array([0.0, 1.0, 1.0, 0.0, 0.0]),
+            }
+
+    report = performance_report(Curve(), realized_pnl=[Decimal("10"), Decimal("-5"), Decimal("20")],
+                                periods_per_year=365)
+    returns = np.diff([100.0, 110.0, 99.0, 121.0, 110.0]) / [100.0, 110.0, 99.0, 121.0]
+    assert report["sharpe"] == pytest.approx(returns.mean() / returns.std() * np.sqrt(365))
+    assert report["max_drawdown"] == pytest.approx(0.1)
+    assert report["max_drawdown_duration_s"] == 2 * 24 * 3600  # day 1 high, recovered on day 3
+    assert report["win_rate"] == pytest.approx(2 / 3)
+    assert report["profit_factor"] == pytest.approx(6.0)
+    assert report["exposure"] == pytest.approx(0.4)
+    assert report["total_return"] == pytest.approx(0.1)
+    assert max_drawdown_duration([0, 1, 2, 3], [5, 4, 3, 2]) == 3
+
+
+def test_engine_records_equity_and_reports(tmp_path):
+    write_bars(tmp_path, n=2000)
+    engine = BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT", sl_pct=0.05, tp_pct=0.1),
+        symbol="BTCUSDT",
+        timeframe="1m",
+        account_balance=10000,
+        indicators={"rsi": RSIIndicator(period=14)},
+        loader=ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path),
+        equity_every=1,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.run()
+
+    arrays = engine.equity.arrays()
+    assert len(engine.equity) == 2000
+    assert len(arrays["timestamp"]) == 2000
+    report = engine.report()
+    assert report["trade_count"] == len(engine.broker.trades) > 0
+    assert report["closed_trades"] == len(engine.broker.realized_pnl)
+    assert arrays["balance"][-1] == pytest.approx(float(engine.broker.account_balance))
+    assert 0 < report["exposure"] <= 1
+
+
+def test_equity_is_off_by_default_and_nothing_loads_at_construction(tmp_path):
+    write_bars(tmp_path, n=500)
+    loader = ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path)
+    engine = BacktestEngine(strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT"), symbol="BTCUSDT",
+                            timeframe="1m", loader=loader)
+    assert engine.equity is None and loader._arrays is None
+    with pytest.raises(ValueError, match="equity_every"):
+        engine.report()
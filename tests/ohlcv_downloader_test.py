@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.ohlcv_downloader import OHLCVDownloader, TokenBucket, find_gaps
+
+MINUTE = 60_000
+CHUNK = 200 * MINUTE  # limit=100 x pages_per_chunk=2
+START = int(pd.Timestamp("2021-01-01").value // 1_000_000) // CHUNK * CHUNK  # aligned to the chunk grid
+
+
+class FakeOHLCVExchange:
+    """
+    Serves a synthetic 1m history of `n` candles from START, `limit` at a time.
+    """
+
+    def __init__(self, n, fail_after=None, missing=()):
+        self.n = n
+        self.fail_after = fail_after
+        self.missing = set(missing)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=1000):
+        with self._lock:
+            self.calls += 1
+            if self.fail_after is not None and self.calls > self.fail_after:
+                raise ConnectionError("connection reset")
+        first = max(0, -(-(since - START) // MINUTE))
+        rows = []
+        for i in range(first, min(first + limit, self.n)):
+            if i not in self.missing:
+                rows.append([START + i * MINUTE, i, i + 1, i - 1, i + 0.5, 1.0])
+        return rows
+
+
+def downloader(exchange, **kwargs):
+    return OHLCVDownloader(symbol="BTC/USDT", limit=100, pages_per_chunk=2, rate=1e6, exchange=exchange, **kwargs)
+
+
+def end_of(n):
+    return START + n * MINUTE
+
+
+def test_chunks_are_fetched_concurrently_and_stitched_in_order():
+    exchange = FakeOHLCVExchange(1000)
+    df = downloader(exchange, workers=4).fetch_ohlcv_range("1m", START, end_of(1000))
+
+    assert len(df) == 1000
+    assert df.timestamp.is_monotonic_increasing and df.timestamp.is_unique
+    np.testing.assert_array_equal(df.open.to_numpy(), np.arange(1000))
+    assert exchange.calls == 10
+
+
+def test_interrupted_download_resumes_from_checkpoints(tmp_path):
+    failing = FakeOHLCVExchange(1000, fail_after=6)
+    with pytest.raises(ConnectionError):
+        downloader(failing, workers=1, checkpoint_dir=tmp_path).fetch_ohlcv_range("1m", START, end_of(1000))
+
+    exchange = FakeOHLCVExchange(1000)
+    df = downloader(exchange, workers=1, checkpoint_dir=tmp_path).fetch_ohlcv_range("1m", START, end_of(1000))
+    assert len(df) == 1000
+    assert exchange.calls == 4  # three of five chunks were already on disk
+
+
+def test_update_appends_tail_and_fills_gaps(tmp_path):
+    path = str(tmp_path / "BTCUSDT" / "BTCUSDT_1m.parquet")
+    first = downloader(FakeOHLCVExchange(500, missing={100, 101}))
+    first.save_to_parquet(first.fetch_ohlcv_range("1m", START, end_of(500)), path)
+    assert find_gaps(pd.read_parquet(path).timestamp.to_numpy().astype("datetime64[ms]").astype("int64"), MINUTE) == [
+        (end_of(100), end_of(102))]
+
+    exchange = FakeOHLCVExchange(800)
+    stats = downloader(exchange).update("1m", path, START, end_date=end_of(800))
+
+    df = pd.read_parquet(path)
+    assert stats["added"] == 302 and stats["gaps_remaining"] == 0
+    assert len(df) == 800 and df.timestamp.is_unique and df.timestamp.is_monotonic_increasing
+    np.testing.assert_array_equal(df.open.to_numpy(), np.arange(800))
+    assert exchange.calls == 1 + 3  # one page for the gap, three for the tail (split across two chunks)
+
+
+def test_update_skips_gaps_the_exchange_confirmed_empty(tmp_path):
+    path = str(tmp_path / "BTCUSDT" / "BTCUSDT_1m.parquet")
+    exchange = FakeOHLCVExchange(500, missing={100, 101})
+    downloader(exchange).update("1m", path, START, end_date=end_of(300))
+    # The first download asked for the gap and got nothing back: it is permanent
+    assert downloader(exchange).update("1m", path, START, end_date=end_of(300))["gaps_skipped"] == 1
+
+    exchange.calls = 0
+    stats = downloader(exchange).update("1m", path, START, end_date=end_of(500))
+    assert stats["added"] == 200 and stats["gaps_checked"] == 0 and stats["gaps_remaining"] == 1
+    assert exchange.calls == 2  # only the tail
+
+    # A gap the exchange later backfills is refetched once the sidecar is gone
+    os.remove(downloader(exchange).gaps_file(path))
+    stats = downloader(FakeOHLCVExchange(500)).update("1m", path, START, end_date=end_of(500))
+    assert stats["added"] == 2 and stats["gaps_remaining"] == 0
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=200, capacity=1)
+    started = time.perf_counter()
+    for _ in range(21):
+        bucket.acquire()
+    assert time.perf_counter() - started >= 0.09
+
+
+def test_partitioned_update_writes_only_new_rows(tmp_path):
+    from backtest.partitions import PartitionedDataset
+
+    root = str(tmp_path / "BTCUSDT" / "1m")
+    downloader(FakeOHLCVExchange(300), partitioned=True).update("1m", root, START, end_date=end_of(300))
+    stats = downloader(FakeOHLCVExchange(500), partitioned=True).update("1m", root, START, end_date=end_of(500))
+
+    dataset = PartitionedDataset(root)
+    assert stats["added"] == 200
+    assert {name.rsplit("/", 1)[1] for name in dataset.files()} == {"data.parquet"}
+    np.testing.assert_array_equal(dataset.read()["open"], np.arange(500))
+
+
+def test_partitioned_update_reads_only_the_newest_month(tmp_path, monkeypatch):
+    from backtest.partitions import PartitionedDataset
+
+    root = str(tmp_path / "BTCUSDT" / "1m")
+    first = downloader(FakeOHLCVExchange(300, missing={50, 51}), partitioned=True)
+    first.update("1m", root, START, end_date=end_of(300))
+    assert PartitionedDataset(root).months() == [(2020, 12), (2021, 1)]
+    gap = (end_of(50), end_of(52))
+
+    reads = []
+    read = PartitionedDataset.read
+
+    def spy(self, start_ms=None, end_ms=None):
+        columns = read(self, start_ms, end_ms)
+        reads.append((start_ms, len(columns["timestamp"])))
+        return columns
+
+    monkeypatch.setattr(PartitionedDataset, "read", spy)
+    stats = downloader(FakeOHLCVExchange(500, missing={50, 51}), partitioned=True).update(
+        "1m", root, START, end_date=end_of(500))
+
+    january = int(pd.Timestamp("2021-01-01").value // 1_000_000)
+    # December (the first 120 bars) is never opened, not even by compaction
+    assert reads[0] == (january, 180)
+    assert all(start is not None and start >= january for start, _ in reads)
+    assert (stats["added"], stats["rows"]) == (200, 498)
+    # The December gap was confirmed by the first run and is kept, not re-fetched
+    assert json.load(open(first.gaps_file(root))) == [list(gap)]
@@ -0,0 +1,50 @@
+from datetime import datetime
+from decimal import Decimal
+
+from backtest.snapshot import MarketSnapshot
+from core.enums import OrderStatus, OrderType, Side
+from core.models import Order
+from services.broker import Broker
+from services.mock_executor import MockExecutor
+
+
+def limit(side, price, qty="0.01"):
+    return Order(asset="BTCUSDT", side=side, quantity=Decimal(qty), order_type=OrderType.LIMIT,
+                 price=Decimal(str(price)), timestamp=datetime(2021, 1, 1))
+
+
+def bar(low, high, symbol="BTCUSDT"):
+    return MarketSnapshot(symbol, datetime(2021, 1, 1, 0, 1), (low + high) / 2, high, low, (low + high) / 2, 1.0)
+
+
+def make_executor():
+    executor = MockExecutor()
+    executor.broker = Broker(account_balance=Decimal("100000"))
+    return executor
+
+
+def test_only_crossed_levels_fill_best_price_first(capsys):
+    executor = make_executor()
+    bids = [executor.submit_order(limit(Side.BUY, 2000 - i)) for i in range(1000)]
+    asks = [executor.submit_order(limit(Side.SELL, 2001 + i)) for i in range(1000)]
+
+    filled = executor.check_pending_limits(bar(low=1995.5, high=2002))
+    # Bids at 2000..1996 and asks at 2001..2002 are crossed
+    assert filled == bids[:5] + asks[:2]
+    assert [executor.get_trade(i).execution_price for i in filled[:5]] == [Decimal(p) for p in range(2000, 1995, -1)]
+    assert len(executor.books["BTCUSDT"]) == 2000 - 7
+
+    # Other symbols' bars never touch this book
+    assert executor.check_pending_limits(bar(low=1, high=10_000, symbol="ETHUSDT")) == []
+
+
+def test_cancelled_orders_leave_the_book(capsys):
+    executor = make_executor()
+    first = executor.submit_order(limit(Side.BUY, 100))
+    second = executor.submit_order(limit(Side.BUY, 100))
+    executor.cancel_order(first)
+
+    assert executor.check_pending_limits(bar(low=99, high=101)) == [second]
+    assert executor.fetch_order_status(first) == OrderStatus.CANCELLED
+    assert executor.fetch_order_status(second) == OrderStatus.FILLED
+    assert len(executor.books["BTCUSDT"]) == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from backtest.dataloader import ColumnarOHLCVLoader, read_ohlcv_columns
+from backtest.partitions import ROW_GROUP_ROWS, PartitionedDataset
+from backtest.resample import ResampleCache, write_ohlcv_columns
+
+
+def minute_columns(start, n):
+    ts = pd.date_range(start, periods=n, freq="1min").to_numpy().astype("datetime64[ms]").view("int64")
+    close = np.arange(n, dtype="float64")
+    return {"timestamp": ts, "open": close, "high": close + 1, "low": close - 1, "close": close,
+            "volume": np.ones(n)}
+
+
+def ms(value):
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def test_reads_only_overlapping_months_and_row_groups(tmp_path):
+    dataset = PartitionedDataset.for_symbol("BTCUSDT", "1m", tmp_path)
+    dataset.append(minute_columns("2021-01-01", 90 * 1440))
+    assert dataset.months() == [(2021, 1), (2021, 2), (2021, 3)]
+
+    day = dataset.read(ms("2021-02-10"), ms("2021-02-10 23:59"))
+    assert len(day["timestamp"]) == 1440
+    assert dataset.last_scan["files"] == 1
+    assert dataset.last_scan["row_groups"] <= 2
+
+    full = dataset.read()
+    assert len(full["timestamp"]) == 90 * 1440
+    assert dataset.last_scan["row_groups"] > 2 * ROW_GROUP_ROWS // 1440
+
+
+def test_appends_are_deduplicated_and_compacted(tmp_path):
+    dataset = PartitionedDataset.for_symbol("BTCUSDT", "1m", tmp_path)
+    dataset.append(minute_columns("2021-01-31", 1440))
+    overlap = minute_columns("2021-01-31 12:00", 1440)
+    overlap["close"] = overlap["close"] + 1000
+    dataset.append(overlap)
+    assert len(dataset.files()) == 3  # Jan twice, Feb once
+
+    assert dataset.compact() == 2
+    assert dataset.compact() == 0
+    assert [p.rsplit("/", 1)[1] for p in dataset.files(ms("2021-01-01"), ms("2021-01-31"))] == ["data.parquet"]
+    columns = dataset.read()
+    assert len(columns["timestamp"]) == 1440 + 720
+    assert np.all(np.diff(columns["timestamp"]) == 60_000)
+    # Later appends win on duplicate timestamps
+    assert columns["close"][720] == 1000.0
+
+
+def test_loader_and_resampler_use_partitions(tmp_path):
+    PartitionedDataset.for_symbol("BTCUSDT", "1m", tmp_path).append(minute_columns("2021-01-01", 62 * 1440))
+
+    loader = ColumnarOHLCVLoader("BTCUSDT", "1m", start="2021-02-01", end="2021-02-01 00:09", data_path=tmp_path)
+    assert loader.partitions is not None
+    np.testing.assert_array_equal(loader.load_arrays()["close"], np.arange(31 * 1440, 31 * 1440 + 10))
+    assert loader.partitions.last_scan["files"] == 1
+
+    daily = ColumnarOHLCVLoader("BTCUSDT", "1d", data_path=tmp_path)
+    assert daily.path.startswith(ResampleCache(data_path=tmp_path).root)
+    assert len(daily) == 62
+
+
+def test_compaction_rewrites_monolithic_layout(tmp_path):
+    source = tmp_path / "BTCUSDT" / "BTCUSDT_1m.parquet"
+    source.parent.mkdir()
+    write_ohlcv_columns(minute_columns("2021-01-30", 3 * 1440), str(source))
+    dataset = PartitionedDataset.for_symbol("BTCUSDT", "1m", tmp_path)
+    dataset.append(read_ohlcv_columns(source))
+    assert dataset.compact(force=True) == 2
+    np.testing.assert_array_equal(dataset.read()["close"], read_ohlcv_columns(source)["close"])
@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+import numpy as np
+
+from backtest.dataloader import ColumnarOHLCVLoader
+from backtest.engine import BacktestEngine
+from backtest.plotting import downsample, lttb_indices, minmax_indices
+from columnar_loader_test import write_bars
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+
+
+def test_minmax_keeps_extremes_and_endpoints():
+    y = np.random.default_rng(1).normal(size=100_000)
+    y[54_321] = 50.0
+    idx = minmax_indices(y, 500)
+    assert len(idx) <= 1002
+    assert {0, len(y) - 1, 54_321, int(y.argmin())} <= set(idx.tolist())
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_and_nan_handling():
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    idx = lttb_indices(x, y, 300)
+    assert len(idx) == 300 and idx[0] == 0 and idx[-1] == 9_999
+    assert (np.diff(idx) > 0).all()
+
+    y[:14] = np.nan
+    xs, ys = downsample(x, y, max_points=100, method="lttb")
+    assert len(xs) == 100 and not np.isnan(ys).any() and xs[0] == 14
+
+
+def test_engine_renders_png_and_html_without_reloading(tmp_path):
+    write_bars(tmp_path, n=5000)
+    loader = ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path)
+    engine = BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT"),
+        symbol="BTCUSDT",
+        timeframe="1m",
+        indicators={"rsi": RSIIndicator(period=14)},
+        loader=loader,
+        plot=str(tmp_path / "out" / "run.png"),
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.run()
+    assert (tmp_path / "out" / "run.png").read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+    loader.stream_snapshots = None  # plotting must not stream the data again
+    engine.plot_trades(str(tmp_path / "run.html"), subplot_indicators=engine.indicators, method="lttb")
+    page = (tmp_path / "run.html").read_text()
+    assert page.startswith("<!DOCTYPE html>") and "<svg" in page
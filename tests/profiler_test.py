@@ -0,0 +1,99 @@
+import asyncio
+import io
+from decimal import Decimal
+
+from backtest.dataloader import ColumnarOHLCVLoader
+from backtest.engine import BacktestEngine
+from backtest.profiler import StageProfiler
+from benchmarks.synthetic import write_dataset
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+from live.engine import LiveEngine
+from services.broker import Broker
+from services.event_sink import ConsoleSink, EventSink
+from services.trade_logger import TradeLogger
+from tests.live_engine_test import BuyEveryBar, ListFeed, SlowExecutor
+
+
+class Records(EventSink):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def run_engine(tmp_path, profile, bars=2_000):
+    write_dataset(str(tmp_path), bars, seed=3, symbol="SYNTH")
+    sink = Records()
+    engine = BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol="SYNTH", sl_pct=0.02, tp_pct=0.04),
+        symbol="SYNTH", timeframe="1m", loader=ColumnarOHLCVLoader("SYNTH", "1m", data_path=str(tmp_path)),
+        indicators={"rsi": RSIIndicator(period=14)}, logger=TradeLogger(sink), profile=profile, equity_every=1)
+    engine.run()
+    return engine, sink.records
+
+
+def test_backtest_samples_every_nth_bar_and_logs_summary(tmp_path):
+    profiler = StageProfiler(every=10)
+    engine, records = run_engine(tmp_path, profiler)
+
+    assert profiler.bars == 2_000
+    assert profiler.sampled_bars == 200
+    for stage in ("bar", "indicators", "exit_triggers", "pending_limits", "strategy", "equity"):
+        assert len(profiler.samples[stage]) == 200
+    assert len(engine.broker.trades) > 0
+
+    rows = {row["stage"]: row for row in profiler.summary()}
+    assert rows["bar"]["share"] is None
+    assert 0.5 < sum(row["share"] for row in rows.values() if row["share"] is not None) <= 1.0
+    assert rows["strategy"]["p50_ms"] <= rows["strategy"]["p90_ms"] <= rows["strategy"]["p99_ms"]
+    assert rows["bar"]["est_total_ms"] > rows["bar"]["total_ms"]
+
+    profile = [r for r in records if r["event"] == "profile"]
+    assert len(profile) == 1 and profile[0]["sampled_bars"] == 200
+    assert records.index(profile[0]) > [r["event"] for r in records].index("run_end")
+    out = io.StringIO()
+    ConsoleSink(stream=out).emit(profile[0])
+    table = out.getvalue()
+    assert "Stage profile" in table and "p99 us" in table and "strategy" in table
+
+
+def test_profiling_is_off_by_default(tmp_path):
+    engine, records = run_engine(tmp_path, None, bars=300)
+    assert engine.profiler is None
+    assert "profile" not in [r["event"] for r in records]
+
+
+def test_flame_range_is_timed_and_exported(tmp_path):
+    profiler = StageProfiler(every=1_000, flame_bars=(100, 199))
+    run_engine(tmp_path, profiler)
+    assert profiler.sampled_bars == 2 + 100  # bars 0 and 1000, plus the range
+
+    path = tmp_path / "profile.folded"
+    assert profiler.write_collapsed(path) > 0
+    lines = path.read_text().splitlines()
+    stacks = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines}
+    assert "backtest;bar;strategy.on_data" in stacks
+    assert "backtest;bar;executor;check_exit_triggers" in stacks
+    assert all(stack.startswith("backtest;bar") and ns > 0 for stack, ns in stacks.items())
+    # Only the flame bars are folded, not the sampled ones outside the range
+    assert sum(stacks.values()) <= sum(profiler.samples["bar"]) - profiler.samples["bar"][0]
+
+
+def test_live_engine_times_candles_and_orders():
+    sink = Records()
+    broker = Broker(account_balance=Decimal("1000"), logger=TradeLogger(sink))
+    engine = LiveEngine(BuyEveryBar, SlowExecutor(broker, delay=0), feed=ListFeed(6), warmup=False, profile=2)
+
+    asyncio.run(engine.run_async())
+
+    profiler = engine.profiler
+    assert profiler.bars == 6 and profiler.sampled_bars == 3
+    assert len(profiler.samples["submit"]) == 3
+    assert len(profiler.samples["broker"]) == 3
+    rows = {row["stage"]: row for row in profiler.summary()}
+    assert rows["strategy"]["share"] is not None
+    assert rows["submit"]["share"] is None  # order tasks run outside the candle
+    assert [r["event"] for r in sink.records].count("profile") == 1
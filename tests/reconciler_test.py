@@ -0,0 +1,141 @@
+import asyncio
+import contextlib
+import io
+from decimal import Decimal
+
+from core.enums import OrderStatus, OrderType, Side
+from core.models import Order
+from services.binance_executor import BinanceExecutor
+from services.broker import Broker
+from services.event_sink import SilentSink
+from tests.fake_exchange import FakeExchange
+from services.reconciler import OrderReconciler
+from services.trade_logger import TradeLogger
+
+
+def setup(budget=60):
+    broker = Broker(account_balance=Decimal("10000"), logger=TradeLogger(SilentSink()))
+    executor = BinanceExecutor("key", "secret")
+    executor.exchange = FakeExchange(prices={"BTC/USDT": 100.0, "ETH/USDT": 10.0})
+    executor.broker = broker
+    reconciler = OrderReconciler(broker, budget=budget, clock=lambda: 0.0)
+    executor.reconciler = reconciler
+    return broker, executor, reconciler
+
+
+def limit(symbol, qty, price, side=Side.BUY):
+    return Order(asset=symbol, side=side, quantity=Decimal(qty), order_type=OrderType.LIMIT,
+                 price=Decimal(price), leverage=1)
+
+
+def submit(executor, order):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert executor.submit_order(order) is None  # resting
+    return next(oid for oid, o in executor.orders.items() if o is order)
+
+
+def test_partial_fills_reach_the_broker_with_two_requests_per_symbol():
+    broker, executor, reconciler = setup()
+    fake = executor.exchange
+    orders = [limit("BTC/USDT", "1", "99") for _ in range(5)]
+    ids = [submit(executor, o) for o in orders]
+    assert reconciler.open_orders() == 5
+
+    fake.fill(ids[0], 0.4, 99)
+    fake.fill(ids[0], 0.2, 98)
+    fake.fill(ids[1], 1, 99)
+    fake.requests.clear()
+    trades = reconciler.reconcile()
+
+    assert fake.requests == {"fetch_open_orders": 1, "fetch_my_trades": 1}
+    assert [t.quantity for t in trades] == [Decimal("0.6"), Decimal("1")]
+    assert trades[0].execution_price == (Decimal("0.4") * 99 + Decimal("0.2") * 98) / Decimal("0.6")
+    assert broker.get_position("BTC/USDT").quantity == Decimal("1.6")
+    assert orders[1].status == OrderStatus.FILLED and orders[0].status == OrderStatus.PENDING
+    assert reconciler.open_orders() == 4
+
+    # Already-seen fills are not replayed; the rest of order 0 fills later
+    assert reconciler.reconcile() == []
+    fake.fill(ids[0], 0.4, 97)
+    assert [t.quantity for t in reconciler.reconcile()] == [Decimal("0.4")]
+    assert orders[0].status == OrderStatus.FILLED
+    assert orders[0].execution_price == Decimal("98")
+
+
+def test_a_burst_of_fills_is_paged_before_the_cursor_moves():
+    broker, executor, reconciler = setup()
+    reconciler.page_limit = 3
+    fake = executor.exchange
+    order_id = submit(executor, limit("BTC/USDT", "10", "99"))
+    start = reconciler._since[(id(executor), "BTC/USDT")]
+    # Eight fills, two sharing a millisecond across a page boundary
+    for i, ts in enumerate([1, 2, 3, 3, 4, 5, 6, 7]):
+        fake.fill(order_id, 1, 90 + i, timestamp=start + ts)
+    fake.requests.clear()
+
+    trades = reconciler.reconcile()
+    assert fake.requests["fetch_my_trades"] == 4  # each page restarts at the newest millisecond read
+    assert [t.quantity for t in trades] == [Decimal("8")]
+    assert broker.get_position("BTC/USDT").quantity == Decimal("8")
+
+    fake.fill(order_id, 2, 99, timestamp=start + 8)
+    assert [t.quantity for t in reconciler.reconcile()] == [Decimal("2")]
+    assert executor.orders[order_id].status == OrderStatus.FILLED
+
+
+def test_cancelled_orders_are_dropped_after_a_grace_poll():
+    broker, executor, reconciler = setup()
+    order_id = submit(executor, limit("BTC/USDT", "1", "99"))
+    executor.exchange.cancel_order(order_id)
+    reconciler.reconcile()
+    assert reconciler.open_orders() == 1
+    reconciler.reconcile()
+    assert reconciler.open_orders() == 0
+    assert executor.orders[order_id].status == OrderStatus.CANCELLED
+
+
+def test_budget_and_adaptive_interval():
+    broker, executor, reconciler = setup(budget=2)
+    submit(executor, limit("BTC/USDT", "1", "99"))
+    eth = submit(executor, limit("ETH/USDT", "1", "9"))
+
+    reconciler.reconcile()
+    assert sum(executor.exchange.requests[k] for k in ("fetch_open_orders", "fetch_my_trades")) == 2
+    assert reconciler.interval >= 60.0  # 2 symbols x 2 requests cannot be sustained faster
+    # ETH was starved this round, so it is served first next time
+    assert list(reconciler.open)[0][1] == "ETH/USDT"
+
+    reconciler = OrderReconciler(broker, min_interval=1, max_interval=8, backoff=2)
+    reconciler.track(executor, eth, executor.orders[eth])
+    intervals = []
+    for _ in range(4):
+        reconciler.poll_once()
+        intervals.append(reconciler.interval)
+    assert intervals == [2, 4, 8, 8]
+    executor.exchange.fill(eth, 1, 9)
+    reconciler.reconcile()
+    assert reconciler.interval == 1
+
+
+def test_live_engine_applies_reconciled_fills():
+    from live.engine import LiveEngine
+
+    broker, executor, reconciler = setup()
+    reconciler.min_interval = reconciler.interval = 0.01
+    order_id = submit(executor, limit("BTC/USDT", "2", "99"))
+
+    class Feed:
+        async def snapshots(self):
+            executor.exchange.fill(order_id, 2, 99)
+            await asyncio.sleep(0.1)
+            return
+            yield
+
+    class Idle:
+        def on_data(self, data):
+            return []
+
+    engine = LiveEngine(Idle, executor, feed=Feed(), reconciler=reconciler)
+    asyncio.run(engine.run_async())
+    assert broker.get_position("BTC/USDT").quantity == Decimal("2")
+    assert reconciler.on_trade == reconciler._record  # hook restored once the engine stops
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.dataloader import ColumnarOHLCVLoader, read_ohlcv_columns, resolve_ohlcv_path
+from backtest.resample import ResampleCache, resample_columns, write_ohlcv_columns
+from core.timeframes import timeframe_to_ms
+
+
+def minute_columns(n, start="2021-01-04", seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(start, periods=n, freq="1min").to_numpy().astype("datetime64[ms]").view("int64")
+    close = 100 * np.exp(np.cumsum(rng.normal(scale=0.002, size=n)))
+    open_ = np.r_[100.0, close[:-1]]
+    return {
+        "timestamp": ts,
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.random(n),
+        "low": np.minimum(open_, close) - rng.random(n),
+        "close": close,
+        "volume": rng.random(n) * 10,
+    }
+
+
+def pandas_resample(columns, rule):
+    df = pd.DataFrame(columns).set_index(pd.to_datetime(columns["timestamp"], unit="ms"))
+    return df.resample(rule, origin="epoch").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna()
+
+
+@pytest.mark.parametrize("timeframe,rule", [("7m", "7min"), ("3h", "3h"), ("1d", "24h")])
+def test_matches_pandas_resample(timeframe, rule):
+    columns = minute_columns(3 * 1440 + 17)
+    out = resample_columns(columns, timeframe)
+    expected = pandas_resample(columns, rule)
+    expected = expected[expected.index.values.astype("datetime64[ms]").view("int64")
+                        + timeframe_to_ms(timeframe) <= columns["timestamp"][-1] + 60_000]
+
+    np.testing.assert_array_equal(out["timestamp"], expected.index.values.astype("datetime64[ms]").view("int64"))
+    for name in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_allclose(out[name], expected[name].to_numpy())
+
+
+def test_weeks_start_on_monday_and_bad_timeframes_fail():
+    out = resample_columns(minute_columns(15 * 1440, start="2021-01-04"), "1w")
+    assert pd.to_datetime(out["timestamp"], unit="ms").dayofweek.tolist() == [0, 0]
+    with pytest.raises(ValueError):
+        resample_columns(minute_columns(10), "90s")
+    with pytest.raises(ValueError):
+        resample_columns(minute_columns(10), "7m", base_timeframe="5m")
+
+
+def test_loader_reads_derived_timeframe_from_cache(tmp_path):
+    base = tmp_path / "BTCUSDT" / "BTCUSDT_1m.parquet"
+    base.parent.mkdir()
+    write_ohlcv_columns(minute_columns(2 * 1440), str(base))
+
+    loader = ColumnarOHLCVLoader("BTCUSDT", "4h", data_path=tmp_path)
+    assert loader.path.startswith(str(tmp_path / ".resampled"))
+    assert len(loader) == 12
+    np.testing.assert_array_equal(loader.load_arrays()["close"],
+                                  resample_columns(read_ohlcv_columns(base), "4h")["close"])
+
+    # Cached: the same file is reused until the base data changes
+    mtime = os.stat(loader.path).st_mtime_ns
+    assert resolve_ohlcv_path("BTCUSDT", "4h", tmp_path) == loader.path
+    assert os.stat(loader.path).st_mtime_ns == mtime
+
+    write_ohlcv_columns(minute_columns(3 * 1440), str(base))
+    os.utime(base, ns=(mtime + 10**9, mtime + 10**9))
+    rebuilt = resolve_ohlcv_path("BTCUSDT", "4h", tmp_path)
+    assert rebuilt != loader.path and not os.path.exists(loader.path)
+    assert len(ColumnarOHLCVLoader("BTCUSDT", "4h", data_path=tmp_path)) == 18
+    assert len(os.listdir(ResampleCache(data_path=tmp_path).root + "/BTCUSDT")) == 1
@@ -0,0 +1,77 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators.rsi import RSIIndicator, WILDER, CUTLER
+
+Bar = namedtuple("Bar", "timestamp close")
+
+
+def reference_rsi(closes, period, mode):
+    delta = pd.Series(closes).diff()
+    gains = delta.clip(lower=0)
+    losses = (-delta).clip(lower=0)
+
+    if mode == CUTLER:
+        avg_gain = gains.rolling(period).mean()
+        avg_loss = losses.rolling(period).mean()
+    else:
+        # Seed with the SMA of the first `period` deltas, then RMA (alpha = 1/period)
+        def rma(values):
+            seeded = values.copy()
+            seeded.iloc[:period] = np.nan
+            seeded.iloc[period] = values.iloc[1:period + 1].mean()
+            return seeded.ewm(alpha=1 / period, adjust=False, ignore_na=True).mean().where(seeded.index >= period)
+        avg_gain, avg_loss = rma(gains), rma(losses)
+
+    rs = avg_gain / avg_loss.replace(0, 1e-10)
+    return (100 - 100 / (1 + rs)).to_numpy()
+
+
+@pytest.mark.parametrize("mode", [WILDER, CUTLER])
+def test_matches_vectorized_reference(mode):
+    rng = np.random.default_rng(7)
+    closes = 30000 + np.cumsum(rng.normal(scale=25, size=20000))
+    closes[500:540] = closes[499]  # flat stretch exercises the zero-loss path
+
+    ind = RSIIndicator(period=14, mode=mode)
+    streamed = []
+    for i, close in enumerate(closes):
+        ind.update(Bar(i, close))
+        streamed.append(np.nan if ind.get() is None else ind.get())
+
+    np.testing.assert_allclose(np.array(streamed), reference_rsi(closes, 14, mode), rtol=1e-9, atol=1e-7)
+    assert len(ind.values) == len(closes) - 14
+
+
+@pytest.mark.parametrize("mode", [WILDER, CUTLER])
+def test_batch_matches_streaming_and_continues(mode):
+    rng = np.random.default_rng(3)
+    closes = 100 + np.cumsum(rng.normal(size=3000))
+    timestamps = np.arange(3000, dtype="int64") * 60_000
+    arrays = {"timestamp": timestamps[:2000], "close": closes[:2000]}
+
+    streamed = RSIIndicator(period=14, mode=mode)
+    for i, close in enumerate(closes[:2000]):
+        streamed.update(Bar(i, close))
+
+    batched = RSIIndicator(period=14, mode=mode)
+    series = batched.compute_batch(arrays)
+    assert batched.supports_batch
+    np.testing.assert_allclose(series[14:], streamed.values, rtol=1e-9)
+    series_ts, values = batched.get_series()
+    assert len(series_ts) == len(values) == 2000 - 14
+    assert series_ts == timestamps[14:2000].astype("datetime64[ms]").tolist()
+
+    # Streaming on after a batch pass picks up where the batch left off
+    for i, close in enumerate(closes[2000:], start=2000):
+        streamed.update(Bar(i, close))
+        batched.update(Bar(i, close))
+        assert batched.get() == pytest.approx(streamed.get(), rel=1e-9)
+
+
+def test_batch_rejects_misaligned_columns():
+    with pytest.raises(ValueError, match="differ in length"):
+        RSIIndicator(period=14).compute_batch({"timestamp": np.arange(30, dtype="int64"), "close": np.ones(20)})
@@ -3,21 +3,26 @@ from core.enums import OrderType, Side
 from core.models import Order, Trade
 from services.mock_executor import MockExecutor
 from services.broker import Broker
+from services.event_sink import SilentSink
+from services.trade_logger import TradeLogger
 
-def main():
+def run(logger=None):
     # 1. Set up executor and broker
     executor = MockExecutor()
-    broker = Broker(starting_cash=Decimal("1000.00"), executor=executor)
+    broker = Broker(account_balance=Decimal("1000.00"), logger=logger)
+    executor.broker = broker
+    broker.executor = executor
 
     # 2. Submit a mock BUY order
     buy_order = Order(
         asset="BTC/USDT",
         side=Side.BUY,
         quantity=Decimal("0.01"),
-        order_type=OrderType.MARKET
+        order_type=OrderType.MARKET,
+        execution_price=Decimal("100.00")
     )
     order_id = broker.submit_order(buy_order)
-    trade = executor.trades[-1]  # Get last trade
+    trade = executor.get_trade(order_id)
     broker.record_trade(trade)
 
     print("\n✅ After BUY:")
@@ -28,14 +33,25 @@ def main():
         asset="BTC/USDT",
         side=Side.SELL,
         quantity=Decimal("0.01"),
-        order_type=OrderType.MARKET
+        order_type=OrderType.MARKET,
+        execution_price=Decimal("110.00")
     )
     sell_id = broker.submit_order(sell_order)
-    sell_trade = executor.trades[-1]
+    sell_trade = executor.get_trade(sell_id)
     broker.record_trade(sell_trade)
 
     print("\n✅ After SELL:")
     broker.print_status()
+    return broker
+
+def test_buy_then_sell_round_trip():
+    broker = run(TradeLogger(SilentSink()))
+    assert broker.get_position("BTC/USDT") is None
+    assert broker.account_balance == Decimal("1000.10")
+    assert len(broker.trades) == 2
+
+def main():
+    run(TradeLogger())
 
 if __name__ == "__main__":
     main()
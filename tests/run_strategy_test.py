@@ -2,26 +2,40 @@ from decimal import Decimal
 from core.models import Order, Trade
 from services.mock_executor import MockExecutor
 from services.broker import Broker
+from services.event_sink import SilentSink
+from services.trade_logger import TradeLogger
 from domain.sample_strategies import AlwaysBuyBTC
 
-def main():
+def run(ticks=5, logger=None):
     # Setup executor, broker, and strategy
     executor = MockExecutor()
-    broker = Broker(starting_cash=Decimal("1000.00"), executor=executor)
+    broker = Broker(account_balance=Decimal("1000.00"), logger=logger)
+    executor.broker = broker
+    broker.executor = executor
     strategy = AlwaysBuyBTC()
 
-    # Simulate a simple stream of candles (5 steps)
-    for i in range(5):
+    # Simulate a simple stream of candles
+    for i in range(ticks):
         print(f"\n⏱️ Tick {i + 1}")
         market_data = {"close": Decimal("100.00")}  # Mocked price
         orders = strategy.on_data(market_data)
 
         for order in orders:
+            order.execution_price = market_data["close"]  # BacktestEngine stamps the bar close
             order_id = broker.submit_order(order)
-            trade = executor.trades[-1]
+            trade = executor.get_trade(order_id)
             broker.record_trade(trade)
 
         broker.print_status()
+    return broker
+
+def test_always_buy_accumulates_position():
+    broker = run(ticks=5, logger=TradeLogger(SilentSink()))
+    assert broker.get_position("BTC/USDT").quantity == Decimal("0.005")
+    assert len(broker.trades) == 5
+
+def main():
+    run(logger=TradeLogger())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,54 @@
+import csv
+
+import pytest
+
+from backtest.metrics import max_drawdown
+from backtest.sweep import SweepRunner
+from columnar_loader_test import write_bars
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_sweep_writes_one_row_per_run_and_resumes(tmp_path):
+    write_bars(tmp_path, n=2000)
+    results = tmp_path / "results.csv"
+    grid = {"period": [7, 14], "rsi_low": [30], "rsi_high": [70], "leverage": [2, 5.0]}
+
+    def runner(grid, start=None):
+        return SweepRunner("BTCUSDT", "1m", grid, str(results), start=start, data_path=tmp_path, workers=2)
+
+    assert runner(grid).run() == 4
+    rows = read_rows(results)
+    assert len(rows) == 4
+    assert all(int(r["trade_count"]) > 0 for r in rows)
+
+    # Simulate an interrupted sweep: drop the last row and half-write it again
+    with open(results) as f:
+        lines = f.readlines()
+    with open(results, "w") as f:
+        f.writelines(lines[:-1])
+        f.write(lines[-1][:10])
+
+    grid["period"].append(21)
+    assert runner(grid).run() == 3
+    rows = read_rows(results)
+    # The half-written row is gone rather than left behind
+    assert len(rows) == 6 and len({r["key"] for r in rows}) == 6
+
+    # Same grid over another window is a different set of runs
+    assert runner(grid, start="2021-01-01 06:00").run() == 6
+    assert len(read_rows(results)) == 12
+
+
+    # Another grid shape cannot append to this file
+    with pytest.raises(ValueError, match="columns"):
+        runner({"period": [7], "rsi_low": [25]}).run()
+    assert len(read_rows(results)) == 12
+
+
+def test_max_drawdown():
+    assert max_drawdown([100, 120, 90, 130, 65]) == 0.5
+    assert max_drawdown([100, 110]) == 0.0
@@ -0,0 +1,86 @@
+from datetime import datetime
+from decimal import Decimal
+
+from backtest.snapshot import MarketSnapshot
+from core.enums import OrderStatus, OrderType, Side
+from core.models import Order, Trade
+from services.broker import Broker
+from services.mock_executor import MockExecutor
+
+
+def bar(open_, high, low, close):
+    return MarketSnapshot("BTCUSDT", datetime(2021, 1, 1, 0, 1), open_, high, low, close, 1.0)
+
+
+def make_executor():
+    return MockExecutor(Broker(account_balance=Decimal("10000")))
+
+
+def market(executor, side, qty, price):
+    order = Order(asset="BTCUSDT", side=side, quantity=Decimal(qty), order_type=OrderType.MARKET,
+                  execution_price=Decimal(price), timestamp=datetime(2021, 1, 1))
+    order_id = executor.submit_order(order)
+    executor.broker.record_trade(executor.get_trade(order_id))
+    return order_id
+
+
+def limit(executor, side, qty, price):
+    return executor.submit_order(Order(asset="BTCUSDT", side=side, quantity=Decimal(qty),
+                                       order_type=OrderType.LIMIT, price=Decimal(price)))
+
+
+def test_each_order_finds_its_own_fill_across_partial_closes(capsys):
+    executor = make_executor()
+    entry = market(executor, Side.BUY, "3", "100")
+    first = market(executor, Side.SELL, "1", "105")
+    second = market(executor, Side.SELL, "2", "110")
+
+    assert [executor.get_trade(i).quantity for i in (entry, first, second)] == [Decimal(3), Decimal(1), Decimal(2)]
+    assert [executor.get_trade(i).execution_price for i in (entry, first, second)] == [100, 105, 110]
+    assert [executor.get_trade(i) for i in (entry, first, second)] == executor.trades
+    assert "BTCUSDT" not in executor.broker.positions
+
+
+def test_unfilled_and_cancelled_orders_have_no_trade(capsys):
+    executor = make_executor()
+    resting = limit(executor, Side.BUY, "1", "90")
+    cancelled = limit(executor, Side.BUY, "1", "95")
+    assert executor.get_trade(resting) is None and executor.get_trades(resting) == []
+
+    executor.cancel_order(cancelled)
+    assert executor.fetch_order_status(cancelled) == OrderStatus.CANCELLED
+    # The bar crosses both limits, but only the live one fills
+    assert executor.check_pending_limits(bar(96, 97, 89, 92)) == [resting]
+    assert executor.get_trade(cancelled) is None
+    assert executor.get_trade(resting).execution_price == Decimal(90)
+    assert executor.get_trade("unknown-order") is None
+    assert len(executor.trades) == 1
+
+
+def test_order_with_several_fills_keeps_them_in_order(capsys):
+    executor = make_executor()
+    order_id = limit(executor, Side.SELL, "3", "110")
+    order = executor.orders[order_id]
+    # Fills reported in pieces, as an exchange does for a partially filled order
+    pieces = [Trade(order=order, execution_price=Decimal(110), quantity=Decimal(q)) for q in ("1", "2")]
+    for trade in pieces:
+        executor._record_fill(order_id, trade)
+
+    assert executor.get_trades(order_id) == pieces
+    assert executor.get_trade(order_id) is pieces[-1]
+    assert executor.trades == pieces
+    # The returned list is a copy; the index itself is not exposed for mutation
+    executor.get_trades(order_id).clear()
+    assert len(executor.get_trades(order_id)) == 2
+
+
+def test_exit_trigger_records_one_trade_for_its_order(capsys):
+    executor = make_executor()
+    order = Order(asset="BTCUSDT", side=Side.BUY, quantity=Decimal("1"), order_type=OrderType.MARKET,
+                  execution_price=Decimal("100"), take_profit=Decimal("110"), timestamp=datetime(2021, 1, 1))
+    executor.broker.record_trade(executor.get_trade(executor.submit_order(order)))
+
+    executor.check_exit_triggers(bar(100, 111, 99, 108))
+    exit_id = next(i for i, o in executor.orders.items() if o.client_tag == "tp_exit")
+    assert executor.get_trades(exit_id) == [executor.trades[-1]]
+    assert len(executor.trades) == 2
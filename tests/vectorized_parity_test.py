@@ -0,0 +1,67 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from backtest.dataloader import ColumnarOHLCVLoader
+from backtest.engine import BacktestEngine
+from backtest.vectorized import VectorizedBacktestEngine, rsi_signals
+from columnar_loader_test import write_bars
+from domain.simple_rsi_strategy import SimpleRSIStrategy
+from indicators.rsi import RSIIndicator
+
+
+@pytest.mark.parametrize("sl_pct,tp_pct", [(0.05, 0.1), (None, None), (0.02, None)])
+def test_vectorized_engine_matches_event_loop(tmp_path, sl_pct, tp_pct):
+    write_bars(tmp_path, n=5000)
+    params = dict(size_fraction=0.3, leverage=5, sl_pct=sl_pct, tp_pct=tp_pct)
+
+    engine = BacktestEngine(
+        strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT", rsi_low=30, rsi_high=70, **params),
+        symbol="BTCUSDT",
+        timeframe="1m",
+        account_balance=10000,
+        indicators={"rsi": RSIIndicator(period=14)},
+        loader=ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path),
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.run()
+
+    vec = VectorizedBacktestEngine(
+        symbol="BTCUSDT", timeframe="1m", account_balance=10000,
+        loader=ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path), **params
+    )
+    rsi = RSIIndicator(period=14).compute_batch(vec.loader.load_arrays())
+    result = vec.run(*rsi_signals(rsi, 30, 70))
+
+    expected = engine.broker.trades
+    assert len(expected) > 20
+    assert result.trade_count == len(expected)
+    assert result.tags() == [t.order.client_tag for t in expected]
+    assert [1 if t.order.side.name == "BUY" else -1 for t in expected] == result.trades["side"].tolist()
+    assert [t.timestamp for t in expected] == result.trades["timestamp"].astype("datetime64[ms]").tolist()
+    np.testing.assert_allclose(result.trades["price"], [float(t.execution_price) for t in expected])
+    np.testing.assert_allclose(result.trades["quantity"], [float(t.quantity) for t in expected], atol=1e-4)
+    assert result.account_balance == pytest.approx(float(engine.broker.account_balance), rel=1e-9)
+    assert result.margin == pytest.approx(float(engine.broker.get_total_margin()), rel=1e-9)
+
+
+def test_reused_snapshots_give_same_trades(tmp_path):
+    write_bars(tmp_path, n=3000)
+
+    def run(reuse):
+        engine = BacktestEngine(
+            strategy_cls=lambda: SimpleRSIStrategy(symbol="BTCUSDT", sl_pct=0.05, tp_pct=0.1),
+            symbol="BTCUSDT",
+            timeframe="1m",
+            account_balance=10000,
+            indicators={"rsi": RSIIndicator(period=14)},
+            loader=ColumnarOHLCVLoader("BTCUSDT", "1m", data_path=tmp_path),
+            reuse_snapshots=reuse,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.run()
+        return [(t.timestamp, t.execution_price, t.quantity) for t in engine.broker.trades], engine.broker.account_balance
+
+    assert run(True) == run(False)
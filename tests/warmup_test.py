@@ -0,0 +1,107 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from backtest.snapshot import MarketSnapshot
+from indicators.rsi import CUTLER, RSIIndicator
+from live.engine import LiveEngine
+from live.warmup import load_history, required_history
+from services.broker import Broker
+from services.event_sink import SilentSink
+from services.trade_logger import TradeLogger
+
+MINUTE = 60_000
+NOW = int(pd.Timestamp("2024-01-02 00:00:30").value // 1_000_000)  # 30s into a forming candle
+
+
+def history(n=1000, now_ms=NOW):
+    first = now_ms // MINUTE * MINUTE - n * MINUTE
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=n))
+    return [[first + i * MINUTE, c, c + 1, c - 1, c, 1.0] for i, c in enumerate(close.tolist())]
+
+
+class PagedExchange:
+    """REST stand-in returning at most `limit` candles per call, plus the forming one."""
+
+    def __init__(self, rows, limit=100, forming=True):
+        self.rows = rows + [[rows[-1][0] + MINUTE, 1, 1, 1, 1, 1]] * forming
+        self.limit = limit
+        self.calls = []
+
+    async def __call__(self, symbol, timeframe, since_ms):
+        self.calls.append(since_ms)
+        return [r for r in self.rows if r[0] >= since_ms][:self.limit]
+
+
+class IdleFeed:
+    def __init__(self, backfill):
+        self.backfill = backfill
+        self.last_open_ms = None
+
+    async def snapshots(self):
+        return
+        yield
+
+
+class NoOrders:
+    def on_data(self, data):
+        return []
+
+
+class NullExecutor:
+    def __init__(self):
+        self.broker = Broker(account_balance=Decimal("1000"), logger=TradeLogger(SilentSink()))
+
+    def check_exit_triggers(self, snapshot):
+        pass
+
+
+def streamed_rsi(rows, **kwargs):
+    ind = RSIIndicator(**kwargs)
+    for row in rows:
+        ind.update(MarketSnapshot("BTC/USDT", datetime.utcfromtimestamp(row[0] / 1000), *row[1:]))
+    return ind.get()
+
+
+def test_lookback_sizes_the_fetch():
+    assert RSIIndicator(period=14, mode=CUTLER).lookback == 15
+    assert required_history([RSIIndicator(period=14), RSIIndicator(period=7, mode=CUTLER)]) == 141
+
+    rows = history()
+    exchange = PagedExchange(rows)
+    fetched = asyncio.run(load_history("BTC/USDT", "1m", 141, fetch=exchange, now_ms=NOW))
+    assert fetched == rows[-141:]
+    assert len(exchange.calls) == 2  # paginated, and the forming candle is left out
+
+
+def test_engine_warms_indicators_before_first_tick():
+    # The engine runs on the wall clock
+    rows = history(now_ms=int(time.time() * 1000))
+    feed = IdleFeed(PagedExchange(rows, forming=False))
+    rsi = RSIIndicator(period=14)
+    engine = LiveEngine(NoOrders, NullExecutor(), indicators={"rsi": rsi}, feed=feed)
+
+    candles = asyncio.run(engine.warm_up())
+    assert candles == 141 == rsi.lookback
+    assert feed.last_open_ms == rows[-1][0]
+    # Ten periods of history put the seeded RMA within ~1e-3 RSI points of the full-history value
+    assert abs(rsi.get() - streamed_rsi(rows)) < 1e-2
+    assert rsi.get() == streamed_rsi(rows[-141:])
+
+
+def test_archive_is_topped_up_from_the_exchange(tmp_path):
+    rows = history()
+    archived = pd.DataFrame(rows[:-20], columns=["timestamp", "open", "high", "low", "close", "volume"])
+    archived["timestamp"] = pd.to_datetime(archived.timestamp, unit="ms")
+    path = tmp_path / "BTCUSDT" / "BTCUSDT_1m.parquet"
+    path.parent.mkdir()
+    archived.to_parquet(path, index=False, coerce_timestamps="ms")
+
+    exchange = PagedExchange(rows)
+    loaded = asyncio.run(load_history("BTC/USDT", "1m", 50, fetch=exchange, data_path=tmp_path, now_ms=NOW))
+    assert [r[0] for r in loaded] == [r[0] for r in rows[-50:]]
+    assert exchange.calls == [rows[-20][0]]
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from decimal import Decimal
+
+from live.engine import LiveEngine
+from live.replay_server import ReplayServer
+from live.ws_feed import BinanceKlineStream
+from services.broker import Broker
+from services.event_sink import SilentSink
+from services.mock_executor import MockExecutor
+from services.trade_logger import TradeLogger
+
+MINUTE = 60_000
+T0 = 1_700_000_040_000  # a minute boundary
+
+
+def kline(i, closed=True, close=None):
+    price = str(close if close is not None else 100 + i)
+    return json.dumps({"e": "kline", "s": "BTCUSDT", "k": {
+        "t": T0 + i * MINUTE, "T": T0 + (i + 1) * MINUTE - 1, "i": "1m",
+        "o": price, "h": price, "l": price, "c": price, "v": "1", "x": closed,
+    }})
+
+
+def with_server(server, fn):
+    async def run():
+        async with server:
+            return await fn(server)
+    return asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+
+def test_emits_only_closed_candles_once():
+    frames = [kline(0, closed=False, close=99), kline(0), kline(0), kline(1, closed=False), kline(1), kline(2)]
+
+    async def run(server):
+        feed = BinanceKlineStream("BTC/USDT", "1m", url=server.url)
+        out = []
+        async for snapshot in feed.snapshots():
+            out.append(snapshot)
+            if len(out) == 3:
+                feed.stop()
+        assert server.paths == ["/btcusdt@kline_1m"]
+        return out
+
+    out = with_server(ReplayServer(frames), run)
+    assert [s.close for s in out] == [Decimal("100"), Decimal("101"), Decimal("102")]
+    assert out[0].timestamp < out[1].timestamp < out[2].timestamp
+
+
+def test_reconnects_and_backfills_the_gap():
+    frames = [kline(i) for i in range(10)]
+    requested = []
+
+    async def backfill(symbol, timeframe, since_ms):
+        requested.append(since_ms)
+        first = (since_ms - T0) // MINUTE
+        return [[T0 + i * MINUTE, 100 + i, 100 + i, 100 + i, 100 + i, 1] for i in range(first, 10)]
+
+    async def run(server):
+        feed = BinanceKlineStream("BTC/USDT", "1m", url=server.url, backfill=backfill, reconnect_delay=0.01)
+        out = []
+        async for snapshot in feed.snapshots():
+            out.append(snapshot)
+            if len(out) == 10:
+                feed.stop()
+        return feed, out
+
+    server = ReplayServer(frames, disconnect_after=3, skip_on_reconnect=2)
+    feed, out = with_server(server, run)
+    assert [int(s.close) for s in out] == list(range(100, 110))
+    assert feed.reconnects >= 1 and server.connections >= 2
+    assert requested[0] == T0 + 3 * MINUTE
+
+
+def test_backfill_pages_through_a_long_outage():
+    frames = [kline(i) for i in range(20)]
+    requested = []
+
+    async def backfill(symbol, timeframe, since_ms):
+        # The exchange caps each REST page, as fetch_ohlcv does
+        requested.append(since_ms)
+        first = (since_ms - T0) // MINUTE
+        return [[T0 + i * MINUTE, 100 + i, 100 + i, 100 + i, 100 + i, 1] for i in range(first, min(first + 4, 20))]
+
+    async def run(server):
+        feed = BinanceKlineStream("BTC/USDT", "1m", url=server.url, backfill=backfill, reconnect_delay=0.01)
+        out = []
+        async for snapshot in feed.snapshots():
+            out.append(snapshot)
+            if len(out) == 20:
+                feed.stop()
+        return out
+
+    out = with_server(ReplayServer(frames, disconnect_after=3, skip_on_reconnect=12), run)
+    assert [int(s.close) for s in out] == list(range(100, 120))
+    assert requested[:5] == [T0 + i * MINUTE for i in (3, 7, 11, 15, 19)]
+
+
+def test_trade_stream_aggregates_candles():
+    def trade(ts, price, qty="1"):
+        return json.dumps({"e": "trade", "s": "BTCUSDT", "T": ts, "p": price, "q": qty})
+
+    frames = [
+        trade(T0 + 30_000, "99"),               # joined mid-candle: dropped
+        trade(T0 + MINUTE, "100"), trade(T0 + MINUTE + 10, "104"), trade(T0 + MINUTE + 20, "98", "2"),
+        trade(T0 + 2 * MINUTE + 5, "101"),      # closes candle 1
+        trade(T0 + 3 * MINUTE, "102"),          # closes candle 2
+    ]
+
+    async def run(server):
+        feed = BinanceKlineStream("BTC/USDT", "1m", url=server.url, stream="trade",
+                                  backfill=lambda *a: asyncio.sleep(0, []))
+        out = []
+        async for snapshot in feed.snapshots():
+            out.append(snapshot)
+            if len(out) == 2:
+                feed.stop()
+        return out
+
+    first, second = with_server(ReplayServer(frames), run)
+    assert (first.open, first.high, first.low, first.close, first.volume) == (100, 104, 98, 98, 4)
+    assert second.close == 101
+
+
+def test_live_engine_consumes_stream_without_polling():
+    feed = None
+
+    class CountingStrategy:
+        def __init__(self):
+            self.seen = []
+
+        def on_data(self, data):
+            self.seen.append(data.close)
+            if len(self.seen) == 5:
+                feed.stop()
+            return []
+
+    broker = Broker(account_balance=Decimal("1000"), logger=TradeLogger(SilentSink()))
+    executor = MockExecutor(broker)
+
+    async def run(server):
+        nonlocal feed
+        feed = BinanceKlineStream("BTC/USDT", "1m", url=server.url)
+        engine = LiveEngine(CountingStrategy, executor, symbol="BTC/USDT", feed=feed, poll_interval=3600)
+        await engine.run_async()
+        return engine.strategy.seen
+
+    seen = with_server(ReplayServer([kline(i) for i in range(8)]), run)
+    assert seen[:5] == [Decimal(100 + i) for i in range(5)]